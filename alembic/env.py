@@ -9,19 +9,25 @@ from alembic import context
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. When the application migrates on startup and
+# passes its own connection, its logging is left alone.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-from app.database import Base
+from app.database import SQLALCHEMY_DATABASE_URL, Base
 from app.models import TodoDB
 
 target_metadata = Base.metadata
 
+# The application's DATABASE_URL takes precedence over sqlalchemy.url in alembic.ini,
+# and `alembic -x url=...` over both.
+url = context.get_x_argument(as_dictionary=True).get("url", SQLALCHEMY_DATABASE_URL)
+config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -59,6 +65,14 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # app.migrations.ensure_schema runs the upgrade on the application's engine.
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,58 @@
+"""Create the lists and todos tables
+
+Revision ID: 0f2a6c4d8b13
+Revises: 
+Create Date: 2026-10-18 20:48:19.520337
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f2a6c4d8b13'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases set up by create_all before the schema was fully migrated already have these tables.
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table('lists'):
+        return
+
+    op.create_table(
+        'lists',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_lists_id', 'lists', ['id'], unique=False)
+    op.create_index('ix_lists_title', 'lists', ['title'], unique=False)
+    op.create_table(
+        'todos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('details', sa.String(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('list_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['list_id'], ['lists.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_todos_id', 'todos', ['id'], unique=False)
+    op.create_index('ix_todos_title', 'todos', ['title'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_title', table_name='todos')
+    op.drop_index('ix_todos_id', table_name='todos')
+    op.drop_table('todos')
+    op.drop_index('ix_lists_title', table_name='lists')
+    op.drop_index('ix_lists_id', table_name='lists')
+    op.drop_table('lists')
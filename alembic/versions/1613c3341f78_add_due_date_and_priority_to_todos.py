@@ -1,28 +1,40 @@
 """Add due_date and priority to todos
 
 Revision ID: 1613c3341f78
-Revises: 
+Revises: 0f2a6c4d8b13
 Create Date: 2024-09-30 16:04:14.572753
 
 """
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
 revision: str = '1613c3341f78'
-down_revision: Union[str, None] = None
+down_revision: Union[str, None] = '0f2a6c4d8b13'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    op.add_column('todos', sa.Column('due_date', sa.DateTime(), nullable=True))
-    op.add_column('todos', sa.Column('priority', sa.Enum('low', 'medium', 'high', name='priority'), nullable=False, server_default='medium'))
+    # Databases set up by create_all before this revision was applied already have the columns.
+    existing = set()
+    if not context.is_offline_mode():
+        existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('todos')}
+
+    if 'due_date' not in existing:
+        op.add_column('todos', sa.Column('due_date', sa.DateTime(), nullable=True))
+    if 'priority' not in existing:
+        # add_column does not create the enum type that Postgres needs for the column.
+        if op.get_context().dialect.name == 'postgresql':
+            op.execute("CREATE TYPE priority AS ENUM ('low', 'medium', 'high')")
+        op.add_column('todos', sa.Column('priority', sa.Enum('low', 'medium', 'high', name='priority'), nullable=False, server_default='medium'))
 
 
 def downgrade() -> None:
     op.drop_column('todos', 'priority')
     op.drop_column('todos', 'due_date')
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute('DROP TYPE priority')
@@ -0,0 +1,36 @@
+"""Add updated_at to todos and version counters to todos and lists
+
+Revision ID: 5d6f8a2b1c90
+Revises: e07a3b5c9d14
+Create Date: 2026-10-18 16:25:13.904771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d6f8a2b1c90'
+down_revision: Union[str, None] = 'e07a3b5c9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite cannot add a column with a non-constant default; the model sets updated_at on insert.
+        op.add_column('todos', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    else:
+        op.add_column('todos', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.execute('UPDATE todos SET updated_at = created_at')
+
+    op.add_column('todos', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('lists', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('lists', 'version')
+    op.drop_column('todos', 'version')
+    op.drop_column('todos', 'updated_at')
@@ -0,0 +1,45 @@
+"""Add priority_rank and composite indexes for todo filters and sorts
+
+Revision ID: 9b81d0e5c6f2
+Revises: 4c2e9f1d7a3b
+Create Date: 2026-10-18 11:40:07.518902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b81d0e5c6f2'
+down_revision: Union[str, None] = '4c2e9f1d7a3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIORITY_RANK = "CASE priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END"
+
+INDEXES = {
+    'ix_todos_created_at': ['created_at'],
+    'ix_todos_due_date': ['due_date'],
+    'ix_todos_priority_rank': ['priority_rank'],
+    'ix_todos_completed_created_at': ['completed', 'created_at'],
+    'ix_todos_completed_due_date': ['completed', 'due_date'],
+    'ix_todos_completed_priority_rank': ['completed', 'priority_rank'],
+}
+
+
+def upgrade() -> None:
+    # SQLite can only add VIRTUAL generated columns; indexing it stores the rank anyway.
+    persisted = op.get_bind().dialect.name != 'sqlite'
+    op.add_column('todos', sa.Column('priority_rank', sa.Integer(), sa.Computed(PRIORITY_RANK, persisted=persisted), nullable=False))
+
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'todos', columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name='todos')
+
+    op.drop_column('todos', 'priority_rank')
@@ -0,0 +1,66 @@
+"""Add per-list todo counters maintained by triggers
+
+Revision ID: a3c71f2e8b45
+Revises: 5d6f8a2b1c90
+Create Date: 2026-10-18 17:52:06.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c71f2e8b45'
+down_revision: Union[str, None] = '5d6f8a2b1c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIORITIES = ('low', 'medium', 'high')
+
+
+def counters(row: str, sign: str) -> str:
+    priorities = ', '.join(f"{p} = {p} {sign} ({row}.priority = '{p}')" for p in PRIORITIES)
+    return (
+        f'UPDATE todo_stats SET total = total {sign} 1, completed = completed {sign} {row}.completed, {priorities} '
+        f'WHERE list_id = coalesce({row}.list_id, 0);'
+    )
+
+
+def upgrade() -> None:
+    op.create_index('ix_todos_list_id_completed_due_date', 'todos', ['list_id', 'completed', 'due_date'], unique=False)
+
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    add = f"INSERT OR IGNORE INTO todo_stats (list_id) VALUES (coalesce(new.list_id, 0)); {counters('new', '+')}"
+    op.execute(
+        'CREATE TABLE todo_stats (list_id INTEGER PRIMARY KEY, total INTEGER NOT NULL DEFAULT 0, '
+        'completed INTEGER NOT NULL DEFAULT 0, low INTEGER NOT NULL DEFAULT 0, medium INTEGER NOT NULL DEFAULT 0, '
+        'high INTEGER NOT NULL DEFAULT 0)'
+    )
+    op.execute(f'CREATE TRIGGER todo_stats_ai AFTER INSERT ON todos BEGIN {add} END')
+    op.execute(f"CREATE TRIGGER todo_stats_ad AFTER DELETE ON todos BEGIN {counters('old', '-')} END")
+    op.execute(
+        f"CREATE TRIGGER todo_stats_au AFTER UPDATE OF list_id, completed, priority ON todos BEGIN "
+        f"{counters('old', '-')} {add} END"
+    )
+    op.execute(
+        'CREATE TRIGGER todo_stats_list_ad AFTER DELETE ON lists BEGIN '
+        'DELETE FROM todo_stats WHERE list_id = old.id; END'
+    )
+    priorities = ', '.join(f"sum(priority = '{p}')" for p in PRIORITIES)
+    op.execute(
+        f'INSERT INTO todo_stats (list_id, total, completed, {", ".join(PRIORITIES)}) '
+        f'SELECT coalesce(list_id, 0), count(*), sum(completed), {priorities} FROM todos GROUP BY coalesce(list_id, 0)'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('todo_stats_ai', 'todo_stats_ad', 'todo_stats_au', 'todo_stats_list_ad'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS todo_stats')
+
+    op.drop_index('ix_todos_list_id_completed_due_date', table_name='todos')
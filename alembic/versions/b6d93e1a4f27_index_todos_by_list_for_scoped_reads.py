@@ -0,0 +1,36 @@
+"""Index todos by list_id first for the sort orders of GET /lists/{id}/todos
+
+Revision ID: b6d93e1a4f27
+Revises: f38dc82e62f5
+Create Date: 2026-10-19 09:41:52.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d93e1a4f27'
+down_revision: Union[str, None] = 'f38dc82e62f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ix_todos_list_id_created_at and ix_todos_list_id_completed_due_date already exist.
+INDEXES = {
+    'ix_todos_list_id_due_date': ['list_id', 'due_date'],
+    'ix_todos_list_id_priority_rank': ['list_id', 'priority_rank'],
+    'ix_todos_list_id_completed_created_at': ['list_id', 'completed', 'created_at'],
+    'ix_todos_list_id_completed_priority_rank': ['list_id', 'completed', 'priority_rank'],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'todos', columns, unique=False)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name='todos')
@@ -0,0 +1,37 @@
+"""Delete todos whose list no longer exists
+
+Revision ID: d2a8f5c3e714
+Revises: 7e5a0c2d9f31
+Create Date: 2026-10-20 10:12:08.331947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8f5c3e714'
+down_revision: Union[str, None] = '7e5a0c2d9f31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite connections did not enforce foreign keys before, so deleting a list left its todos behind.
+ORPHANED = 'list_id IS NULL OR list_id NOT IN (SELECT id FROM lists)'
+
+
+def upgrade() -> None:
+    # Logged as deletes, so clients that synced them drop them too.
+    op.execute(
+        "INSERT INTO changes (entity, entity_id, op, list_id) "
+        f"SELECT 'todo', id, 'deleted', list_id FROM todos WHERE {ORPHANED} ORDER BY id"
+    )
+    op.execute(f'DELETE FROM todos WHERE {ORPHANED}')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DELETE FROM todo_stats WHERE list_id NOT IN (SELECT id FROM lists)')
+
+
+def downgrade() -> None:
+    # The deleted todos cannot be restored.
+    pass
@@ -0,0 +1,26 @@
+"""Add (list_id, created_at) index for embedded list todos
+
+Revision ID: e07a3b5c9d14
+Revises: 9b81d0e5c6f2
+Create Date: 2026-10-18 14:03:52.661047
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e07a3b5c9d14'
+down_revision: Union[str, None] = '9b81d0e5c6f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_todos_list_id_created_at', 'todos', ['list_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_list_id_created_at', table_name='todos')
@@ -0,0 +1,29 @@
+"""Store todo due dates with their time zone
+
+Revision ID: ea0430c6126b
+Revises: d2a8f5c3e714
+Create Date: 2026-10-21 09:40:12.183351
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ea0430c6126b'
+down_revision: Union[str, None] = 'd2a8f5c3e714'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1613c3341f78 added due_date without a time zone. SQLite stores both the same way.
+    if op.get_context().dialect.name == 'postgresql':
+        op.alter_column('todos', 'due_date', type_=sa.DateTime(timezone=True), existing_type=sa.DateTime(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        op.alter_column('todos', 'due_date', type_=sa.DateTime(), existing_type=sa.DateTime(timezone=True), existing_nullable=True)
@@ -0,0 +1,27 @@
+"""Index todos by (due_date, completed) for due date ranges and the agenda
+
+Revision ID: f38dc82e62f5
+Revises: f41b9c6e2d87
+Create Date: 2026-10-18 22:04:17.218431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f38dc82e62f5'
+down_revision: Union[str, None] = 'f41b9c6e2d87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ix_todos_due_date stays: its implicit trailing rowid serves sorting by (due_date, id).
+    op.create_index('ix_todos_due_date_completed', 'todos', ['due_date', 'completed'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_due_date_completed', table_name='todos')
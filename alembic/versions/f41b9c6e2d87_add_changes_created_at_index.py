@@ -0,0 +1,26 @@
+"""Index the change log by age for compaction
+
+Revision ID: f41b9c6e2d87
+Revises: c8e24d7f1a06
+Create Date: 2026-10-18 20:11:52.406178
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41b9c6e2d87'
+down_revision: Union[str, None] = 'c8e24d7f1a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_changes_created_at', 'changes', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_changes_created_at', table_name='changes')
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.database import WEB_CONCURRENCY
+from app.metrics import serialization_timer
+from app.singleflight import SingleFlight
+
+# The default LRUCache lives in one process and is only invalidated by that process's writes,
+# so it is off by default when several workers serve the same database.
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1" if WEB_CONCURRENCY == 1 else "0") == "1"
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Concurrent misses on the same key share one query. This also applies when the cache is off.
+COALESCE_READS = os.getenv("COALESCE_READS", "1") == "1"
+
+
+# Storage for cached response bodies. Implement it on a shared store to share the cache between workers.
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LRUCache(CacheBackend):
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = self.expirations = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+# Keys embed generation tokens for the namespaces they depend on, so a mutation invalidates
+# every affected entry by dropping a token instead of scanning keys. An evicted token is
+# simply regenerated, which only causes misses.
+class ResponseCache:
+    def __init__(
+        self, backend: CacheBackend, ttl: float = CACHE_TTL, enabled: bool = CACHE_ENABLED, coalesce: bool = COALESCE_READS
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.flights = SingleFlight() if coalesce else None
+        self.hits = self.misses = 0
+
+    def _generation(self, namespace: str) -> str:
+        key = f"gen:{namespace}"
+        token = self.backend.get(key)
+        if token is None:
+            token = uuid.uuid4().hex[:12].encode()
+            self.backend.set(key, token)
+        return token.decode()
+
+    def _bump(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.backend.delete(f"gen:{namespace}")
+
+    def _key(self, name: str, namespaces: tuple, params: dict) -> str:
+        generations = ":".join(self._generation(namespace) for namespace in namespaces)
+        query = "&".join(f"{key}={value}" for key, value in sorted(params.items()) if value is not None)
+        return f"{name}:{generations}?{query}"
+
+    def todo_key(self, todo_id: int, version: int) -> str:
+        return self._key(f"todo:{todo_id}", ("todo",), {"version": version})
+
+    def todos_key(self, **params) -> str:
+        return self._key("todos", ("todos",), params)
+
+    def agenda_key(self, **params) -> str:
+        return self._key("agenda", ("todos",), params)
+
+    def list_key(self, list_id: int, **params) -> str:
+        return self._key(f"list:{list_id}", ("list", f"list:{list_id}"), params)
+
+    def list_todos_key(self, list_id: int, **params) -> str:
+        return self._key(f"list:{list_id}:todos", ("todos", f"list:{list_id}"), params)
+
+    def lists_key(self, **params) -> str:
+        return self._key("lists", ("lists",), params)
+
+    def _lookup(self, key: str) -> bytes | None:
+        body = self.backend.get(key)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    def _serialize(self, model: BaseModel, serialize=None) -> bytes:
+        with serialization_timer():
+            return serialize(model) if serialize else model.model_dump_json().encode()
+
+    def _store(self, key: str, model: BaseModel, serialize=None) -> bytes:
+        body = self._serialize(model, serialize)
+        self.backend.set(key, body, self.ttl)
+        return body
+
+    def _produce(self, key: str, produce, serialize=None) -> bytes:
+        if not self.enabled:
+            return self._serialize(produce(), serialize)
+        return self._store(key, produce(), serialize)
+
+    async def _produce_async(self, key: str, produce, serialize=None) -> bytes:
+        if not self.enabled:
+            return self._serialize(await produce(), serialize)
+        return self._store(key, await produce(), serialize)
+
+    # `serialize` turns what `produce` returns into the body; by default it is a pydantic model.
+    # Keys carry the generation tokens, so a read that starts after a write never joins a
+    # flight that started before it.
+    def get_or_set(self, key: str, produce, serialize=None) -> Response:
+        if not self.enabled or (body := self._lookup(key)) is None:
+            if self.flights is None:
+                body = self._produce(key, produce, serialize)
+            else:
+                body = self.flights.do(key, lambda: self._produce(key, produce, serialize))
+        return Response(content=body, media_type="application/json")
+
+    async def get_or_set_async(self, key: str, produce, serialize=None) -> Response:
+        if not self.enabled or (body := self._lookup(key)) is None:
+            if self.flights is None:
+                body = await self._produce_async(key, produce, serialize)
+            else:
+                body = await self.flights.do_async(key, lambda: self._produce_async(key, produce, serialize))
+        return Response(content=body, media_type="application/json")
+
+    # Todo keys carry the row version, so a changed todo is never served from an older entry.
+    def todo_changed(self, todo_id: int, *list_ids: int) -> None:
+        self._bump("todos", "lists", *(f"list:{list_id}" for list_id in list_ids if list_id is not None))
+
+    def todos_changed(self) -> None:
+        self._bump("todo", "todos", "list", "lists")
+
+    def list_changed(self, list_id: int) -> None:
+        self._bump(f"list:{list_id}", "lists")
+
+    def lists_changed(self) -> None:
+        self._bump("lists")
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = self.misses = 0
+        if self.flights is not None:
+            self.flights.shared = 0
+
+    def stats(self) -> dict:
+        coalesced = self.flights.shared if self.flights is not None else 0
+        return {"hits": self.hits, "misses": self.misses, "coalesced": coalesced, **self.backend.stats()}
+
+
+response_cache = ResponseCache(LRUCache())
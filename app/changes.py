@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import os
+from enum import Enum
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import ChangeDB
+
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
+# How often the broker looks for changes committed by other workers; commits in this
+# worker wake it up straight away.
+CHANGES_POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", "1.0"))
+# Live changes buffered per subscriber before it falls back to reading the log.
+CHANGES_QUEUE_SIZE = int(os.getenv("CHANGES_QUEUE_SIZE", "1000"))
+HEARTBEAT_INTERVAL = 15.0
+CHANGE_LOG_LOCK_ID = 0x746F646F
+
+logger = logging.getLogger("app.changes")
+
+
+class ChangeEntityEnum(str, Enum):
+    TODO = "todo"
+    LIST = "list"
+
+class ChangeOpEnum(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+def record_changes(db: Session, entity: ChangeEntityEnum, op: ChangeOpEnum, rows) -> None:
+    # Appended in the mutation's own transaction, so a change is logged exactly when it commits.
+    # rows are (entity_id, list_id) pairs; a list's list_id is its own id.
+    values = [{"entity": entity.value, "entity_id": id, "op": op.value, "list_id": list_id} for id, list_id in rows]
+    if values:
+        if db.get_bind().dialect.name == "postgresql":
+            # Postgres hands out sequence numbers before commit, so concurrent writers could
+            # commit out of order and a reader could skip past a change. The lock, held until
+            # commit, makes sequence order and commit order the same.
+            db.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_ID)))
+        db.execute(insert(ChangeDB), values)
+        db.info["changes_recorded"] = True
+
+
+def read_changes(db: Session, since: int, limit: int = MAX_CHANGES_LIMIT) -> list[dict]:
+    query = select(ChangeDB.__table__).where(ChangeDB.seq > since).order_by(ChangeDB.seq).limit(limit)
+    return [row._asdict() for row in db.execute(query)]
+
+
+def latest_seq(db: Session) -> int:
+    return db.scalar(select(func.max(ChangeDB.seq))) or 0
+
+
+def encode_change(change: dict) -> str:
+    return json.dumps({**change, "created_at": change["created_at"].isoformat()})
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.lagging = False
+
+
+class ChangeBroker:
+    # One poller per worker reads each new change from the log once, encodes it once and
+    # fans it out to the subscribers' queues. Reading the log rather than relaying commits
+    # in memory means changes made by other workers reach subscribers too.
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        poll_interval: float = CHANGES_POLL_INTERVAL,
+        queue_size: int = CHANGES_QUEUE_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.subscribers: set[Subscriber] = set()
+        self.overflows = 0
+        self._seq = 0
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+
+    def read(self, since: int, limit: int = MAX_CHANGES_LIMIT) -> list[dict]:
+        with self.session_factory() as db:
+            return read_changes(db, since, limit)
+
+    def latest(self) -> int:
+        with self.session_factory() as db:
+            return latest_seq(db)
+
+    def notify(self) -> None:
+        # Called after a commit, usually from a threadpool worker.
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    def _running(self, loop) -> bool:
+        return self._task is not None and not self._task.done() and self._loop is loop
+
+    async def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._running(loop):
+            return
+        # Changes up to here are left to each subscriber's catch-up read.
+        seq = await run_in_threadpool(self.latest)
+        if self._running(loop):
+            return
+        if self._loop is not loop:
+            self.subscribers = set()
+        self._seq, self._loop, self._wakeup = seq, loop, asyncio.Event()
+        self._task = loop.create_task(self._poll())
+
+    def _stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._task = self._loop = self._wakeup = None
+
+    async def _poll(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                changes = await run_in_threadpool(self.read, self._seq)
+            except SQLAlchemyError:
+                logger.exception("Reading the change log failed.")
+                changes = []
+            for change in changes:
+                self._publish((change["seq"], encode_change(change)))
+            if changes:
+                self._seq = changes[-1]["seq"]
+            if len(changes) < MAX_CHANGES_LIMIT:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except TimeoutError:
+                    pass
+
+    def _publish(self, message: tuple[int, str]) -> None:
+        for subscriber in self.subscribers:
+            if subscriber.lagging:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A slow subscriber neither holds up the others nor buffers without bound:
+                # it stops receiving live changes and catches up from the log instead.
+                subscriber.lagging = True
+                self.overflows += 1
+
+    async def stream(self, since: int, heartbeat: float = HEARTBEAT_INTERVAL):
+        # Yields (seq, json) for every change after `since`, in order and without duplicates:
+        # the backlog from the log first, then live changes. Yields None after `heartbeat`
+        # seconds without changes so callers can keep idle connections open.
+        await self._start()
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        try:
+            while True:
+                while backlog := await run_in_threadpool(self.read, since):
+                    for change in backlog:
+                        yield change["seq"], encode_change(change)
+                    since = backlog[-1]["seq"]
+
+                while not subscriber.lagging:
+                    try:
+                        seq, data = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                    except TimeoutError:
+                        yield None
+                        continue
+                    # Changes read during catch-up can also be waiting in the queue.
+                    if seq > since:
+                        yield seq, data
+                        since = seq
+
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.lagging = False
+        finally:
+            self.subscribers.discard(subscriber)
+            if not self.subscribers and self._loop is asyncio.get_running_loop():
+                self._stop()
+
+
+change_broker = ChangeBroker()
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop("changes_recorded", False):
+        change_broker.notify()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("changes_recorded", None)
+
+
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
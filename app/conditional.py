@@ -0,0 +1,78 @@
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+# Items are tagged by their row version, so checking a conditional request costs one indexed
+# lookup of (version, updated_at). Collections are tagged by a hash of the response body.
+
+
+def version_etag(kind: str, id: int, version: int) -> str:
+    return f'"{kind}-{id}-{version}"'
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _is_fresh(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    # If-None-Match uses the weak comparison and takes precedence over If-Modified-Since.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.removeprefix("W/") for tag in _etags(if_none_match)}
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+
+
+def set_validators(response: Response, etag: str, last_modified: datetime | None = None) -> Response:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> Response | None:
+    if not _is_fresh(request, etag, last_modified):
+        return None
+    return set_validators(Response(status_code=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+
+def conditional(request: Request, response: Response, last_modified: datetime | None = None) -> Response:
+    # For responses without a cheap validator: tag the (usually cached) body and drop it if the client has it.
+    etag = body_etag(response.body)
+    return not_modified(request, etag, last_modified) or set_validators(response, etag, last_modified)
+
+
+def if_match_versions(request: Request, kind: str, id: int) -> list[int] | None:
+    # None when the request is unconditional. Otherwise the versions the client accepts; an
+    # empty list never matches. If-Match uses the strong comparison, so weak tags are ignored.
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return None
+    tags = _etags(if_match)
+    if "*" in tags:
+        return None
+    pattern = re.compile(rf'"{re.escape(kind)}-{id}-(\d+)"')
+    return [int(match.group(1)) for match in map(pattern.fullmatch, tags) if match]
@@ -1,11 +1,104 @@
-from sqlalchemy import create_engine
+import os
+from functools import cache
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./todo_list.db")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_url(SQLALCHEMY_DATABASE_URL))
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "0") == "1"
+
+# Every worker process has its own pool. DB_MAX_CONNECTIONS, when set, is the budget for all
+# WEB_CONCURRENCY workers together and is split evenly between them, without overflow.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+
+
+def worker_pool_size(max_connections: int = DB_MAX_CONNECTIONS, workers: int = WEB_CONCURRENCY) -> tuple[int, int]:
+    if not max_connections:
+        return 5, 10
+    return max(1, max_connections // max(1, workers)), 0
+
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", worker_pool_size()[0]))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", worker_pool_size()[1]))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the writer, and
+# synchronous=NORMAL only fsyncs at checkpoints, which is safe in WAL mode. SQLite only enforces
+# foreign keys, and runs their ON DELETE actions, on connections that turn them on.
+SQLITE_PRAGMAS = {
+    "foreign_keys": "ON",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+
+def _pragmas_from_env() -> dict:
+    # e.g. SQLITE_PRAGMAS="synchronous=FULL,cache_size=-16000"
+    overrides = os.getenv("SQLITE_PRAGMAS", "")
+    return dict(item.split("=", 1) for item in overrides.split(",") if "=" in item)
+
+
+def _set_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./todo_list.db"
+def _engine_options(url: str, options: dict) -> dict:
+    pool = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+    if make_url(url).get_backend_name() != "sqlite":
+        defaults = {**pool, "pool_pre_ping": True}
+    elif make_url(url).database in (None, "", ":memory:"):
+        # Every connection to an in-memory database would otherwise see its own empty database.
+        defaults = {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    else:
+        defaults = {"connect_args": {"check_same_thread": False}, **pool}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+    if "poolclass" in options:
+        defaults = {key: value for key, value in defaults.items() if key not in pool and key != "poolclass"}
+    return {**defaults, **options}
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas: dict | None = None, **options) -> Engine:
+    engine = create_engine(url, **_engine_options(url, options))
+    if engine.dialect.name == "sqlite":
+        _set_sqlite_pragmas(engine, {**SQLITE_PRAGMAS, **_pragmas_from_env(), **(pragmas or {})})
+    return engine
+
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL, pragmas: dict | None = None, **options) -> AsyncEngine:
+    options = _engine_options(url, options)
+    if "pool_size" in options and make_url(url).get_backend_name() == "sqlite":
+        # aiosqlite may default to NullPool for files, which takes no pool settings.
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+    if engine.dialect.name == "sqlite":
+        _set_sqlite_pragmas(engine.sync_engine, {**SQLITE_PRAGMAS, **_pragmas_from_env(), **(pragmas or {})})
+    return engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -15,4 +108,30 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@cache
+def get_async_engine() -> AsyncEngine:
+    # Created on first use so the async driver is only required when the async path is enabled.
+    return create_async_db_engine()
+
+
+@cache
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def _reset_pools_after_fork() -> None:
+    # A pre-forking server may have opened connections before forking; workers must not share them.
+    engine.dispose(close=False)
+    if get_async_engine.cache_info().currsize:
+        get_async_engine().sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
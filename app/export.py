@@ -0,0 +1,64 @@
+import csv
+import io
+from enum import Enum
+
+from fastapi.responses import StreamingResponse
+
+from app.schemas import Todo
+
+
+class ExportFormatEnum(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+MEDIA_TYPES = {ExportFormatEnum.NDJSON: "application/x-ndjson", ExportFormatEnum.CSV: "text/csv"}
+CSV_FIELDS = list(Todo.model_fields)
+
+
+# Each batch of rows becomes one chunk of the response, so only a single batch of ORM
+# objects and encoded text is alive at any time.
+def _encode(todos, format: ExportFormatEnum) -> str:
+    if format == ExportFormatEnum.NDJSON:
+        return "".join(Todo.model_validate(todo).model_dump_json() + "\n" for todo in todos)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_FIELDS)
+    writer.writerows(Todo.model_validate(todo).model_dump(mode="json") for todo in todos)
+    return buffer.getvalue()
+
+
+def _header(format: ExportFormatEnum) -> str:
+    if format == ExportFormatEnum.CSV:
+        return ",".join(CSV_FIELDS) + "\r\n"
+    return ""
+
+
+# Dependencies with yield are cleaned up before the body streams, so the export reopens the
+# session and closes it again once the last chunk is sent.
+def _stream(partitions, format: ExportFormatEnum, db):
+    try:
+        if header := _header(format):
+            yield header
+        for todos in partitions:
+            yield _encode(todos, format)
+    finally:
+        db.close()
+
+
+async def _stream_async(partitions, format: ExportFormatEnum, db):
+    try:
+        if header := _header(format):
+            yield header
+        async for todos in partitions:
+            yield _encode(todos, format)
+    finally:
+        await db.close()
+
+
+def export_response(partitions, format: ExportFormatEnum, db, filename: str) -> StreamingResponse:
+    stream = _stream_async if hasattr(partitions, "__aiter__") else _stream
+    return StreamingResponse(
+        stream(partitions, format, db),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format.value}"'},
+    )
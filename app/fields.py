@@ -0,0 +1,29 @@
+import orjson
+from fastapi import HTTPException, status
+
+from app.schemas import Todo
+
+TODO_FIELDS = tuple(Todo.model_fields)
+
+# Sparse fieldsets are served from column-only selects. The rows are encoded as they are: the
+# values come from typed columns, so no Todo is validated per row.
+
+
+def parse_fields(fields: str | None, allowed: tuple[str, ...] = TODO_FIELDS) -> tuple[str, ...] | None:
+    if fields is None:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid fields: {', '.join(unknown) or 'none given'}. Allowed fields: {', '.join(allowed)}.",
+        )
+    return names
+
+
+def dump_rows_page(page: dict, fields: tuple[str, ...]) -> bytes:
+    # The requested fields are the leading columns of each row; the rest only build the cursor.
+    items = [dict(zip(fields, row)) for row in page["items"]]
+    # OPT_UTC_Z writes UTC as "Z", as pydantic does.
+    return orjson.dumps({"items": items, "next_cursor": page["next_cursor"]}, option=orjson.OPT_UTC_Z)
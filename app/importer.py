@@ -0,0 +1,177 @@
+import csv
+import json
+import os
+from collections import deque
+from enum import Enum
+
+from fastapi import Request
+from pydantic import ValidationError
+
+from app.export import ExportFormatEnum
+from app.schemas import TodoCreate
+
+MAX_IMPORT_ERRORS = 1000
+# Longer lines, and CSV records spanning lines that add up to more, are rejected as they stream in.
+MAX_IMPORT_LINE_BYTES = int(os.getenv("MAX_IMPORT_LINE_BYTES", str(1024 * 1024)))
+
+
+def import_format(request: Request, format: ExportFormatEnum | None) -> ExportFormatEnum:
+    if format is None and request.headers.get("content-type", "").startswith("text/csv"):
+        return ExportFormatEnum.CSV
+    return format or ExportFormatEnum.NDJSON
+
+
+async def _lines(stream):
+    # Yields each line, or None for a line over MAX_IMPORT_LINE_BYTES, which is dropped as it
+    # arrives. Lines are split before decoding: a newline byte is never part of another character.
+    pending, too_long = b"", False
+    async for chunk in stream:
+        *lines, tail = chunk.split(b"\n")
+        for line in lines:
+            line, pending = pending + line, b""
+            yield None if too_long or len(line) > MAX_IMPORT_LINE_BYTES else (line + b"\n").decode("utf-8", errors="replace")
+            too_long = False
+        if not too_long:
+            pending += tail
+            if len(pending) > MAX_IMPORT_LINE_BYTES:
+                pending, too_long = b"", True
+    if too_long:
+        yield None
+    elif pending:
+        yield pending.decode("utf-8", errors="replace")
+
+
+class _Queue:
+    # The lines queued so far, as an iterator for csv.reader.
+    def __init__(self, lines: deque):
+        self.lines = lines
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+class _CsvState(Enum):
+    START = "start"
+    FIELD = "field"
+    QUOTED = "quoted"
+    QUOTE_IN_QUOTED = "quote_in_quoted"
+
+
+_QUOTE_TRANSITIONS = {
+    _CsvState.START: {'"': _CsvState.QUOTED, ",": _CsvState.START},
+    _CsvState.FIELD: {",": _CsvState.START},
+    _CsvState.QUOTED: {'"': _CsvState.QUOTE_IN_QUOTED},
+    _CsvState.QUOTE_IN_QUOTED: {'"': _CsvState.QUOTED, ",": _CsvState.START},
+}
+_QUOTE_DEFAULTS = {
+    _CsvState.START: _CsvState.FIELD,
+    _CsvState.FIELD: _CsvState.FIELD,
+    _CsvState.QUOTED: _CsvState.QUOTED,
+    _CsvState.QUOTE_IN_QUOTED: _CsvState.FIELD,
+}
+
+
+def _csv_state(line: str, state: _CsvState) -> _CsvState:
+    # Follows csv.reader's quoting rules over a line: a quote opens a quoted field only at the
+    # start of a field, so the record goes on past the line only if it ends inside one.
+    if state != _CsvState.QUOTED and '"' not in line:
+        return _CsvState.START
+    for char in line:
+        state = _QUOTE_TRANSITIONS[state].get(char, _QUOTE_DEFAULTS[state])
+    return state
+
+
+async def _records(stream, format: ExportFormatEnum):
+    # Yields (line number, item, error) for each record of the upload.
+    number = 0
+    if format == ExportFormatEnum.NDJSON:
+        async for line in _lines(stream):
+            number += 1
+            if line is None:
+                yield number, None, "Line too long."
+                continue
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield number, None, "Invalid JSON."
+                continue
+            yield number, item, None
+        return
+
+    # csv.reader parses the records and counts their lines. It is only asked for a record once
+    # the lines holding all of it have been queued, since it cannot wait for more of the upload.
+    lines = deque()
+    reader = csv.reader(_Queue(lines))
+    header, state, size = None, _CsvState.START, 0
+    async for line in _lines(stream):
+        if line is None or size + len(line) > MAX_IMPORT_LINE_BYTES:
+            # The record is dropped; the reader reads blank lines in its place to keep counting.
+            start, skipped = reader.line_num + 1, len(lines) + 1
+            lines.clear()
+            lines.extend("\n" * skipped)
+            for _ in range(skipped):
+                next(reader)
+            state, size = _CsvState.START, 0
+            yield start, None, "Line too long."
+            continue
+        lines.append(line)
+        size += len(line)
+        state = _csv_state(line, state)
+        if state == _CsvState.QUOTED:
+            continue
+        state, size, start = _CsvState.START, 0, reader.line_num + 1
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            yield start, None, f"Invalid CSV: {e}."
+            continue
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        if len(values) != len(header):
+            yield start, None, f"Expected {len(header)} fields, got {len(values)}."
+            continue
+        # Empty cells are left unset, so the schema defaults apply.
+        yield start, {key: value for key, value in zip(header, values) if value != ""}, None
+    if lines:
+        yield reader.line_num + 1, None, "Unterminated quoted field."
+
+
+async def import_todos(stream, format: ExportFormatEnum, insert_chunk, chunk_size: int) -> dict:
+    # Only one chunk of validated rows and at most MAX_IMPORT_ERRORS errors are held in memory.
+    summary = {"created": 0, "failed": 0, "errors": []}
+
+    def fail(errors: list) -> None:
+        summary["failed"] += len(errors)
+        summary["errors"].extend(errors[: MAX_IMPORT_ERRORS - len(summary["errors"])])
+
+    async def flush(chunk: list) -> None:
+        created, errors = await insert_chunk(chunk)
+        summary["created"] += created
+        fail(errors)
+
+    chunk = []
+    async for line, item, error in _records(stream, format):
+        if error is not None:
+            fail([{"line": line, "detail": error}])
+            continue
+        try:
+            chunk.append((line, TodoCreate.model_validate(item)))
+        except ValidationError as e:
+            fail([{"line": line, "detail": e.errors(include_url=False, include_context=False)}])
+            continue
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+    return summary
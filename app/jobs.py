@@ -0,0 +1,238 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+
+from sqlalchemy import Connection, and_, delete, or_, select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.cache import response_cache
+from app.changes import ChangeEntityEnum, ChangeOpEnum, record_changes
+from app.database import SessionLocal
+from app.models import JobDB, ListDB, TodoDB
+
+JOBS_WORKER_ENABLED = os.getenv("JOBS_WORKER_ENABLED", "1") == "1"
+# Jobs queued by this worker start straight away; the poll picks up those of other workers.
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "5"))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+# Seconds before the first retry; it doubles with every attempt.
+JOBS_RETRY_DELAY = float(os.getenv("JOBS_RETRY_DELAY", "10"))
+JOBS_LEASE = float(os.getenv("JOBS_LEASE", "600"))
+JOBS_RETENTION_DAYS = float(os.getenv("JOBS_RETENTION_DAYS", "7"))
+# Todos deleted per transaction; the write lock is released between chunks.
+DELETE_CHUNK_SIZE = int(os.getenv("DELETE_CHUNK_SIZE", "1000"))
+# Seconds to wait between chunks. SQLite writers waiting on the lock retry with a backoff, so
+# without a pause the next chunk usually takes the lock before they do.
+DELETE_CHUNK_PAUSE = float(os.getenv("DELETE_CHUNK_PAUSE", "0.01"))
+
+logger = logging.getLogger("app.jobs")
+
+
+class JobStatusEnum(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobKindEnum(str, Enum):
+    DELETE_LIST = "delete_list"
+    VACUUM = "vacuum"
+    ANALYZE = "analyze"
+
+class MaintenanceJobEnum(str, Enum):
+    VACUUM = JobKindEnum.VACUUM.value
+    ANALYZE = JobKindEnum.ANALYZE.value
+
+
+# Handlers take a session and the job's params and return a JSON-serializable result. A job
+# may be run again after a failure or a crash, so handlers must be safe to repeat.
+JOB_HANDLERS = {}
+
+
+def job_handler(kind: JobKindEnum):
+    def register(handler):
+        JOB_HANDLERS[kind.value] = handler
+        return handler
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue(db: Session, kind: JobKindEnum, params: dict, key: str | None = None) -> JobDB:
+    # Added to the caller's transaction: the job exists exactly when the caller commits.
+    if key is not None:
+        pending = db.scalars(
+            select(JobDB).where(JobDB.key == key, JobDB.status.in_([JobStatusEnum.QUEUED.value, JobStatusEnum.RUNNING.value]))
+        ).first()
+        if pending is not None:
+            return pending
+    job = JobDB(kind=kind.value, params=params, key=key, status=JobStatusEnum.QUEUED.value, max_attempts=JOBS_MAX_ATTEMPTS)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def _due(now: datetime):
+    return or_(
+        and_(JobDB.status == JobStatusEnum.QUEUED.value, JobDB.run_after <= now),
+        and_(JobDB.status == JobStatusEnum.RUNNING.value, JobDB.locked_until < now),
+    )
+
+
+class JobWorker:
+    # One thread per process. Jobs are claimed with a conditional UPDATE, so workers in other
+    # processes can share the table without running a job twice.
+    def __init__(self, session_factory=SessionLocal, poll_interval: float = JOBS_POLL_INTERVAL):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._purged_at = None
+
+    def wake(self) -> None:
+        # Called after a commit that queued a job.
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        # A job that is running is finished first.
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                if not self.run_pending():
+                    self._purge()
+            except SQLAlchemyError:
+                logger.exception("Running jobs failed.")
+            self._wakeup.wait(self.poll_interval)
+
+    def run_pending(self) -> int:
+        ran = 0
+        while not self._stopping.is_set() and (job_id := self._claim()) is not None:
+            self._run(job_id)
+            ran += 1
+        return ran
+
+    def _claim(self) -> int | None:
+        with self.session_factory() as db:
+            now = _now()
+            candidates = db.scalars(select(JobDB.id).where(_due(now)).order_by(JobDB.id).limit(10)).all()
+            for job_id in candidates:
+                claimed = db.execute(
+                    update(JobDB)
+                    .where(JobDB.id == job_id, _due(now))
+                    .values(
+                        status=JobStatusEnum.RUNNING.value,
+                        attempts=JobDB.attempts + 1,
+                        locked_until=now + timedelta(seconds=JOBS_LEASE),
+                    )
+                ).rowcount
+                db.commit()
+                if claimed:
+                    return job_id
+        return None
+
+    def _run(self, job_id: int) -> None:
+        with self.session_factory() as db:
+            job = db.get(JobDB, job_id)
+            kind, params, attempts, max_attempts = job.kind, job.params, job.attempts, job.max_attempts
+            handler = JOB_HANDLERS.get(kind)
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler for jobs of kind {kind!r}.")
+                result = handler(db, **params)
+            except Exception as e:
+                db.rollback()
+                logger.exception("Job %s (%s) failed on attempt %s.", job_id, kind, attempts)
+                values = {"error": str(e) or type(e).__name__, "locked_until": None}
+                if handler is None or attempts >= max_attempts:
+                    values["status"] = JobStatusEnum.FAILED.value
+                else:
+                    delay = JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+                    values.update(status=JobStatusEnum.QUEUED.value, run_after=_now() + timedelta(seconds=delay))
+            else:
+                values = {"status": JobStatusEnum.SUCCEEDED.value, "result": result, "error": None, "locked_until": None}
+            db.execute(update(JobDB).where(JobDB.id == job_id).values(**values))
+            db.commit()
+
+    def _purge(self) -> None:
+        # Finished jobs are kept for status polling, then purged about once an hour when idle.
+        now = _now()
+        if self._purged_at is not None and now - self._purged_at < timedelta(hours=1):
+            return
+        self._purged_at = now
+        with self.session_factory() as db:
+            db.execute(
+                delete(JobDB).where(
+                    JobDB.status.in_([JobStatusEnum.SUCCEEDED.value, JobStatusEnum.FAILED.value]),
+                    JobDB.updated_at < now - timedelta(days=JOBS_RETENTION_DAYS),
+                )
+            )
+            db.commit()
+
+
+job_worker = JobWorker()
+
+
+@job_handler(JobKindEnum.DELETE_LIST)
+def delete_list(db: Session, list_id: int, chunk_size: int = DELETE_CHUNK_SIZE, pause: float = DELETE_CHUNK_PAUSE) -> dict:
+    # Set-based deletes in short transactions, so other writers get the lock between chunks,
+    # instead of loading every todo into the session and deleting them in one transaction.
+    # The last chunk is deleted in the same transaction as the list, so a todo added meanwhile is
+    # either deleted and logged here or rejected by the foreign key.
+    chunk = select(TodoDB.id).where(TodoDB.list_id == list_id).limit(chunk_size).scalar_subquery()
+    todos = 0
+    while True:
+        deleted = db.execute(delete(TodoDB).where(TodoDB.id.in_(chunk)).returning(TodoDB.id, TodoDB.list_id)).all()
+        record_changes(db, ChangeEntityEnum.TODO, ChangeOpEnum.DELETED, deleted)
+        todos += len(deleted)
+        if len(deleted) < chunk_size:
+            break
+        db.commit()
+        response_cache.todos_changed()
+        time.sleep(pause)
+
+    if db.execute(delete(ListDB).where(ListDB.id == list_id)).rowcount:
+        record_changes(db, ChangeEntityEnum.LIST, ChangeOpEnum.DELETED, [(list_id, list_id)])
+    db.commit()
+    response_cache.list_changed(list_id)
+    response_cache.todos_changed()
+    return {"todos_deleted": todos}
+
+
+def _run_outside_transaction(db: Session, statement: str) -> None:
+    # VACUUM cannot run inside a transaction on SQLite or Postgres; ANALYZE is run the same way.
+    bind = db.get_bind()
+    engine = bind.engine if isinstance(bind, Connection) else bind
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(statement))
+
+
+@job_handler(JobKindEnum.VACUUM)
+def vacuum(db: Session) -> dict:
+    _run_outside_transaction(db, "VACUUM")
+    return {}
+
+
+@job_handler(JobKindEnum.ANALYZE)
+def analyze(db: Session) -> dict:
+    _run_outside_transaction(db, "ANALYZE")
+    return {}
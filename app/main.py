@@ -1,18 +1,94 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
-from app.database import engine
-from app.models import Base
-from app.routers import list, todo
+from fastapi import Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-print("Creating database tables...")
-Base.metadata.create_all(bind=engine)
-print("Database tables created.")
+from app.cache import response_cache
+from app.database import DATABASE_ASYNC, engine, get_async_db, get_db
+from app.jobs import JOBS_WORKER_ENABLED, job_worker
+from app.metrics import METRICS_ENABLED, SLOW_QUERY_MS, MetricsMiddleware, instrument, metrics_registry
+from app.migrations import SCHEMA_AUTO_MIGRATE, ensure_schema
+from app.ratelimit import RATE_LIMIT_ENABLED, RateLimitMiddleware
+from app.schemas import TodoStats
+from app.todo_manager import AsyncTodoManager, TodoManager
 
-app = FastAPI()
+# The schema is managed by Alembic. Importing the app touches no database; on startup the
+# lifespan compares the schema version with the Alembic head and only migrates when it is behind.
 
-app.include_router(list.router)
-app.include_router(todo.router)
 
-@app.get("/")
-def read_root():
-    return {"Hello": "World"} 
\ No newline at end of file
+def create_app(
+    async_db: bool = DATABASE_ASYNC,
+    metrics_enabled: bool = METRICS_ENABLED,
+    auto_migrate: bool = SCHEMA_AUTO_MIGRATE,
+    rate_limit_enabled: bool = RATE_LIMIT_ENABLED,
+    jobs_worker_enabled: bool = JOBS_WORKER_ENABLED,
+) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await run_in_threadpool(ensure_schema, engine, auto_migrate)
+        if jobs_worker_enabled:
+            job_worker.start()
+        try:
+            yield
+        finally:
+            if jobs_worker_enabled:
+                await run_in_threadpool(job_worker.stop)
+
+    app = FastAPI(lifespan=lifespan)
+
+    if metrics_enabled or SLOW_QUERY_MS:
+        instrument()
+    # Added first, so the metrics middleware wraps it and counts rejected requests.
+    if rate_limit_enabled:
+        app.add_middleware(RateLimitMiddleware)
+    if metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+    # Only the routers for the chosen database mode are imported.
+    if async_db:
+        from app.routers import async_list, async_todo
+
+        app.include_router(async_list.router)
+        app.include_router(async_todo.router)
+        app.include_router(async_todo.agenda_router)
+    else:
+        from app.routers import list, todo
+
+        app.include_router(list.router)
+        app.include_router(todo.router)
+        app.include_router(todo.agenda_router)
+    from app.routers import changes, jobs, sync
+
+    app.include_router(changes.router)
+    app.include_router(jobs.router)
+    app.include_router(sync.router)
+
+    @app.get("/")
+    def read_root():
+        return {"Hello": "World"}
+
+    @app.get("/cache/stats")
+    def read_cache_stats() -> dict:
+        return response_cache.stats()
+
+    if async_db:
+        @app.get("/stats")
+        async def read_stats(db: AsyncSession = Depends(get_async_db)) -> TodoStats:
+            return await AsyncTodoManager(db).get_stats()
+    else:
+        @app.get("/stats")
+        def read_stats(db: Session = Depends(get_db)) -> TodoStats:
+            return TodoManager(db).get_stats()
+
+    if metrics_enabled:
+        @app.get("/metrics", response_class=PlainTextResponse)
+        def read_metrics() -> PlainTextResponse:
+            return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,186 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, event
+
+from app.database import Base
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Queries slower than this are logged with their SQL and parameters; 0 disables the log.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "rows", "serialization_time")
+
+    def __init__(self):
+        self.queries = self.rows = 0
+        self.db_time = self.serialization_time = 0.0
+
+
+# Set by the middleware for the duration of a request. Sync endpoints run in the threadpool
+# with a copy of the context, so they update the same RequestStats.
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class RouteMetrics:
+    def __init__(self, buckets: int):
+        self.buckets = [0] * buckets
+        self.duration = 0.0
+        self.statuses: dict[int, int] = {}
+        self.queries = self.rows = 0
+        self.db_time = self.serialization_time = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.bounds = buckets
+        self._routes: dict[tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status_code: int, duration: float, stats: RequestStats) -> None:
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics(len(self.bounds) + 1)
+            metrics.buckets[next((i for i, bound in enumerate(self.bounds) if duration <= bound), len(self.bounds))] += 1
+            metrics.duration += duration
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+            metrics.queries += stats.queries
+            metrics.db_time += stats.db_time
+            metrics.rows += stats.rows
+            metrics.serialization_time += stats.serialization_time
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP todo_api_request_duration_seconds Request latency by route template.",
+                "# TYPE todo_api_request_duration_seconds histogram",
+            ]
+            for (method, route), metrics in routes:
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, count in zip((*map(str, self.bounds), "+Inf"), metrics.buckets):
+                    cumulative += count
+                    lines.append(f'todo_api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"todo_api_request_duration_seconds_sum{{{labels}}} {metrics.duration}")
+                lines.append(f"todo_api_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+            lines += ["# HELP todo_api_requests_total Responses by route template and status.", "# TYPE todo_api_requests_total counter"]
+            for (method, route), metrics in routes:
+                for status_code, count in sorted(metrics.statuses.items()):
+                    lines.append(f'todo_api_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {count}')
+
+            counters = (
+                ("db_queries_total", "Database queries executed.", "queries"),
+                ("db_query_duration_seconds_total", "Time spent executing database queries.", "db_time"),
+                ("db_rows_total", "Rows loaded into ORM objects.", "rows"),
+                ("serialization_duration_seconds_total", "Time spent serializing response bodies.", "serialization_time"),
+            )
+            for name, description, attribute in counters:
+                lines += [f"# HELP todo_api_{name} {description}", f"# TYPE todo_api_{name} counter"]
+                for (method, route), metrics in routes:
+                    lines.append(f'todo_api_{name}{{method="{method}",route="{route}"}} {getattr(metrics, attribute)}')
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    # A plain ASGI middleware: BaseHTTPMiddleware would add a task and a stream per request.
+    def __init__(self, app, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            _request_stats.reset(token)
+            # The router stores the matched route in the scope; label by its template to bound cardinality.
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            self.registry.observe(scope["method"], route, status_code, duration, stats)
+
+
+@contextmanager
+def serialization_timer():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if (stats := _request_stats.get()) is not None:
+            stats.serialization_time += time.perf_counter() - start
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    if (stats := _request_stats.get()) is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_query_logger.warning("%.1f ms: %s %r", elapsed * 1000, statement, parameters)
+
+
+def _handle_error(exception_context):
+    if exception_context.connection is not None:
+        started = exception_context.connection.info.get("query_start_time")
+        if started:
+            started.pop()
+
+
+def _load(target, context):
+    if (stats := _request_stats.get()) is not None:
+        stats.rows += 1
+
+
+_LISTENERS = (
+    (Engine, "before_cursor_execute", _before_cursor_execute, {}),
+    (Engine, "after_cursor_execute", _after_cursor_execute, {}),
+    (Engine, "handle_error", _handle_error, {}),
+    (Base, "load", _load, {"propagate": True}),
+)
+
+
+def instrument() -> None:
+    # Listens on every engine, including the sync engine behind the async one.
+    for target, name, listener, options in _LISTENERS:
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener, **options)
+
+
+def uninstrument() -> None:
+    for target, name, listener, _ in _LISTENERS:
+        if event.contains(target, name, listener):
+            event.remove(target, name, listener)
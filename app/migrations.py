@@ -0,0 +1,85 @@
+import ast
+import logging
+import os
+from functools import cache
+from pathlib import Path
+
+from sqlalchemy import Engine, column, inspect, select, table
+
+from app.database import WEB_CONCURRENCY
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+VERSIONS_DIR = ALEMBIC_INI.parent / "alembic" / "versions"
+# Upgrading on startup is only safe when a single worker does it; with several workers the
+# schema is migrated before they start and each worker only checks it.
+SCHEMA_AUTO_MIGRATE = os.getenv("SCHEMA_AUTO_MIGRATE", "1" if WEB_CONCURRENCY == 1 else "0") == "1"
+# The last revision released before Alembic owned the whole schema. Databases that release
+# created with create_all on import already have its tables and columns.
+LEGACY_REVISION = "1613c3341f78"
+
+logger = logging.getLogger("app.migrations")
+
+_alembic_version = table("alembic_version", column("version_num"))
+
+
+# Importing Alembic takes longer than the rest of startup, so it is only imported to migrate.
+# Checking the version reads the revision ids from the scripts and the version table directly.
+def _config():
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    # alembic.ini names the scripts relative to the working directory, which may be anywhere.
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return config
+
+
+def _revision_ids(path: Path) -> tuple[str, tuple[str, ...]]:
+    ids = {}
+    for node in ast.parse(path.read_text()).body:
+        if isinstance(node, ast.AnnAssign | ast.Assign) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                    ids[target.id] = ast.literal_eval(node.value)
+    down = ids.get("down_revision") or ()
+    return ids["revision"], (down,) if isinstance(down, str) else tuple(down)
+
+
+@cache
+def alembic_heads() -> frozenset[str]:
+    revisions, parents = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        revision, down = _revision_ids(path)
+        revisions.add(revision)
+        parents.update(down)
+    return frozenset(revisions - parents)
+
+
+def current_heads(engine: Engine) -> frozenset[str]:
+    with engine.connect() as connection:
+        if not inspect(connection).has_table("alembic_version"):
+            return frozenset()
+        return frozenset(connection.scalars(select(_alembic_version.c.version_num)))
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool = SCHEMA_AUTO_MIGRATE) -> bool:
+    # Returns whether a migration ran. At the head, startup costs one SELECT and no DDL.
+    current = current_heads(engine)
+    if current == alembic_heads():
+        return False
+
+    if not auto_migrate:
+        if not current and inspect(engine).has_table("lists"):
+            hint = f"run `alembic stamp {LEGACY_REVISION}` and then `alembic upgrade head`, since the tables predate Alembic"
+        else:
+            hint = "run `alembic upgrade head`"
+        raise RuntimeError(f"The database schema is not up to date ({', '.join(current) or 'unversioned'}): {hint}.")
+
+    from alembic import command
+
+    logger.info("Upgrading the database schema from %s.", ", ".join(current) or "base")
+    config = _config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+    return True
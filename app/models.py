@@ -1,17 +1,28 @@
 from sqlalchemy import (
     Boolean,
     Column,
+    Computed,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
     func,
+    literal_column,
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
+# Matches SQLite's CURRENT_TIMESTAMP so bound values compare exactly with server defaults.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 
 class ListDB(Base):
     __tablename__ = "lists"
@@ -19,10 +30,13 @@ class ListDB(Base):
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(Timestamp, server_default=func.now(), nullable=False)
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False)
+    version = Column(Integer, server_default="1", default=1, onupdate=literal_column("version + 1"), nullable=False)
 
-    todos = relationship("TodoDB", back_populates="list")
+    # The database deletes a list's todos through the foreign key's ON DELETE CASCADE, so
+    # deleting a list does not load them first.
+    todos = relationship("TodoDB", back_populates="list", cascade="all, delete", passive_deletes=True)
 
 class TodoDB(Base):
     __tablename__ = "todos"
@@ -31,10 +45,75 @@ class TodoDB(Base):
     title = Column(String, index=True, nullable=False)
     details = Column(String, nullable=True)
     completed = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(Timestamp, server_default=func.now(), nullable=False)
+    updated_at = Column(Timestamp, server_default=func.now(), default=func.now(), onupdate=func.now(), nullable=False)
+    version = Column(Integer, server_default="1", default=1, onupdate=literal_column("version + 1"), nullable=False)
     due_date = Column(DateTime(timezone=True), nullable=True)
     priority = Column(Enum("low", "medium", "high", name="priority"), nullable=False, default="medium")
+    priority_rank = Column(
+        Integer,
+        Computed("CASE priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END", persisted=True),
+        nullable=False,
+    )
     list_id = Column(Integer, ForeignKey("lists.id", ondelete="CASCADE"))
 
     list = relationship("ListDB", back_populates="todos")
-    
\ No newline at end of file
+
+    __table_args__ = (
+        Index("ix_todos_created_at", "created_at"),
+        Index("ix_todos_due_date", "due_date"),
+        Index("ix_todos_due_date_completed", "due_date", "completed"),
+        Index("ix_todos_priority_rank", "priority_rank"),
+        Index("ix_todos_completed_created_at", "completed", "created_at"),
+        Index("ix_todos_completed_due_date", "completed", "due_date"),
+        Index("ix_todos_completed_priority_rank", "completed", "priority_rank"),
+        # The same access paths within one list, for GET /lists/{id}/todos.
+        Index("ix_todos_list_id_created_at", "list_id", "created_at"),
+        Index("ix_todos_list_id_due_date", "list_id", "due_date"),
+        Index("ix_todos_list_id_priority_rank", "list_id", "priority_rank"),
+        Index("ix_todos_list_id_completed_created_at", "list_id", "completed", "created_at"),
+        Index("ix_todos_list_id_completed_due_date", "list_id", "completed", "due_date"),
+        Index("ix_todos_list_id_completed_priority_rank", "list_id", "completed", "priority_rank"),
+    )
+    
+
+class ChangeDB(Base):
+    __tablename__ = "changes"
+
+    # AUTOINCREMENT keeps sequence numbers from being reused once the log is compacted.
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    list_id = Column(Integer, nullable=True)
+    created_at = Column(Timestamp, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_changes_created_at", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
+
+
+class JobDB(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    # Jobs with the same key are not queued twice while one is pending.
+    key = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    run_after = Column(Timestamp, server_default=func.now(), nullable=False)
+    # A running job whose lease has expired is taken over; its worker is presumed dead.
+    locked_until = Column(Timestamp, nullable=True)
+    created_at = Column(Timestamp, server_default=func.now(), nullable=False)
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_key", "key"),
+    )
@@ -0,0 +1,60 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(sort_key: str, value, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort_key, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, is_datetime: bool = False) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_key or not isinstance(payload["id"], int):
+            raise ValueError("cursor does not match the requested sort order")
+        value = payload["v"]
+        if is_datetime and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, payload["id"]
+    except (ValueError, KeyError, TypeError, binascii.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.") from e
+
+
+def keyset_order(column, id_column, descending: bool) -> tuple:
+    if descending:
+        return column.desc().nulls_last(), id_column.desc()
+    return column.asc().nulls_first(), id_column.asc()
+
+
+def keyset_filter(column, id_column, descending: bool, value, last_id: int, nullable: bool = False):
+    # NULLs sort lowest: first when ascending, last when descending. The leading
+    # range on the sort column keeps the predicate usable as an index seek.
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < last_id)
+        after = and_(column <= value, or_(column < value, id_column < last_id))
+        return or_(after, column.is_(None)) if nullable else after
+
+    if value is None:
+        return or_(and_(column.is_(None), id_column > last_id), column.is_not(None))
+    return and_(column >= value, or_(column > value, id_column > last_id))
+
+
+def paginate(query, limit: int, cursor_for) -> dict:
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = cursor_for(rows[-1])
+    return {"items": rows, "next_cursor": next_cursor}
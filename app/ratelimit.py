@@ -0,0 +1,99 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+
+# Buckets live in each worker's memory by default, so the effective limit is multiplied by the
+# number of workers unless a shared RateLimitStore is used.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "0") == "1"
+# Tokens added per second and the bucket size, per client and route.
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "10"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "20"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+
+
+# Token buckets by key. Implement it on a shared store to apply one limit across workers.
+class RateLimitStore(ABC):
+    # Takes a token from the bucket and returns 0, or the seconds until one is available.
+    @abstractmethod
+    def acquire(self, key: str, rate: float, burst: int) -> float: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            # The least recently used bucket is dropped first; it comes back full.
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+memory_rate_limit_store = MemoryRateLimitStore()
+
+
+def match_route(app, scope):
+    # The middleware runs before routing, so the route is matched here to key by its template.
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+        if match == Match.PARTIAL and partial is None:
+            partial = route
+    return partial
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app,
+        rate: float = RATE_LIMIT_RATE,
+        burst: int = RATE_LIMIT_BURST,
+        store: RateLimitStore = memory_rate_limit_store,
+    ):
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        client = scope["client"][0] if scope.get("client") else "-"
+        route = match_route(scope["app"], scope)
+        key = f"{client}:{scope['method']}:{getattr(route, 'path', '<unmatched>')}"
+        wait = self.store.acquire(key, self.rate, self.burst)
+        if wait:
+            # Rejected requests are labelled by their route in the metrics too.
+            scope["route"] = route
+            response = JSONResponse(
+                {"detail": "Too many requests."}, status_code=429, headers={"Retry-After": str(math.ceil(wait))}
+            )
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
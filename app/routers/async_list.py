@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.export import ExportFormatEnum, export_response
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.routers import list as sync_list
+from app.routers.list import DEFAULT_EMBEDDED_TODOS, MAX_EMBEDDED_TODOS, IncludeEnum
+from app.schemas import Job, List, ListCreate, ListWithoutTodos, Page, Todo, TodoStats
+from app.todo_manager import AsyncTodoManager, OrderEnum, PriorityEnum, SortByEnum
+
+router = APIRouter(prefix="/lists", tags=["Lists"])
+
+# The handlers in app.routers.list run on the async session's greenlet and return
+# validated models, so nothing is lazily loaded outside of it.
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_list(list: ListCreate, db: AsyncSession = Depends(get_async_db)) -> ListWithoutTodos:
+    return await db.run_sync(lambda session: ListWithoutTodos.model_validate(sync_list.create_list(list, session)))
+
+
+@router.get("/")
+async def read_lists(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort_by: str = "desc",
+    search: str = "",
+    include: IncludeEnum | None = None,
+    todos_limit: int = Query(DEFAULT_EMBEDDED_TODOS, ge=1, le=MAX_EMBEDDED_TODOS),
+    db: AsyncSession = Depends(get_async_db),
+) -> Page[ListWithoutTodos] | Page[List]:
+    return await db.run_sync(
+        lambda session: sync_list.read_lists(request, cursor, limit, sort_by, search, include, todos_limit, session)
+    )
+
+
+@router.get("/{id}")
+async def read_list(
+    id: int,
+    request: Request,
+    include: IncludeEnum | None = None,
+    todos_limit: int = Query(DEFAULT_EMBEDDED_TODOS, ge=1, le=MAX_EMBEDDED_TODOS),
+    db: AsyncSession = Depends(get_async_db),
+) -> ListWithoutTodos | List:
+    return await db.run_sync(lambda session: sync_list.read_list(id, request, include, todos_limit, session))
+
+
+@router.get("/{id}/todos")
+async def read_list_todos(
+    id: int,
+    request: Request,
+    due_date: datetime = None,
+    priority: PriorityEnum = None,
+    search: str = None,
+    sort_by: SortByEnum = SortByEnum.CREATED_AT,
+    order: OrderEnum = OrderEnum.DESC,
+    completed: bool | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    overdue: bool | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description="Comma-separated Todo fields to return, e.g. id,title,completed"),
+    db: AsyncSession = Depends(get_async_db),
+) -> Page[Todo]:
+    return await db.run_sync(lambda session: sync_list.read_list_todos(
+        id, request, due_date, priority, search, sort_by, order, completed,
+        due_before, due_after, overdue, cursor, limit, fields, session,
+    ))
+
+
+@router.get("/{id}/stats")
+async def read_list_stats(id: int, db: AsyncSession = Depends(get_async_db)) -> TodoStats:
+    return await db.run_sync(lambda session: sync_list.read_list_stats(id, session))
+
+
+@router.get("/{id}/export")
+async def export_list(
+    id: int,
+    format: ExportFormatEnum = ExportFormatEnum.NDJSON,
+    sort_by: SortByEnum = SortByEnum.CREATED_AT,
+    order: OrderEnum = OrderEnum.DESC,
+    completed: bool | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+    await db.run_sync(lambda session: sync_list._list_version(session, id))
+    partitions = AsyncTodoManager(db).export_todos(None, None, None, sort_by, order, completed, list_id=id)
+    return export_response(partitions, format, db, f"list-{id}")
+
+
+@router.put("/{id}")
+async def update_list(
+    id: int, list: ListCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+) -> ListWithoutTodos:
+    return await db.run_sync(
+        lambda session: ListWithoutTodos.model_validate(sync_list.update_list(id, list, request, response, session))
+    )
+
+
+@router.delete("/{id}", status_code=status.HTTP_202_ACCEPTED)
+async def delete_list(id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)) -> Job:
+    return await db.run_sync(lambda session: Job.model_validate(sync_list.delete_list(id, request, response, session)))
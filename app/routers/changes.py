@@ -0,0 +1,78 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.changes import DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT, change_broker, read_changes
+from app.database import get_db
+from app.schemas import ChangeFeed
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+# The change log is read through the sync engine in both database modes; the live streams
+# share one poller per worker through change_broker.
+
+
+@router.get("/")
+def read_change_log(
+    since: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_CHANGES_LIMIT, ge=1, le=MAX_CHANGES_LIMIT),
+    db: Session = Depends(get_db),
+) -> ChangeFeed:
+    try:
+        changes = read_changes(db, since, limit + 1)
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
+    changes, has_more = changes[:limit], len(changes) > limit
+    return {"changes": changes, "last_seq": changes[-1]["seq"] if changes else since, "has_more": has_more}
+
+
+async def _resume_point(since: int | None) -> int:
+    # Without a starting point a stream only carries changes made after it opens.
+    if since is not None:
+        return since
+    return await run_in_threadpool(change_broker.latest)
+
+
+async def _events(since: int):
+    async for message in change_broker.stream(since):
+        if message is None:
+            yield ": keepalive\n\n"
+        else:
+            seq, data = message
+            yield f"id: {seq}\nevent: change\ndata: {data}\n\n"
+
+
+@router.get("/stream")
+async def stream_changes(request: Request, since: int | None = Query(None, ge=0)) -> StreamingResponse:
+    # EventSource sends the id of the last event it received when it reconnects.
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        _events(await _resume_point(since)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def changes_websocket(websocket: WebSocket, since: int | None = Query(None, ge=0)):
+    await websocket.accept()
+    since = await _resume_point(since)
+
+    async def send_changes():
+        async for message in change_broker.stream(since):
+            if message is not None:
+                await websocket.send_text(message[1])
+
+    # Messages from the client are ignored; receiving only tells us when it goes away.
+    sender = asyncio.create_task(send_changes())
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        sender.cancel()
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.jobs import JobKindEnum, enqueue, job_worker
+from app.models import JobDB
+from app.schemas import Job, JobCreate
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+# Jobs run on the sync engine in both database modes, in each worker's job thread.
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+def create_job(job: JobCreate, response: Response, db: Session = Depends(get_db)) -> Job:
+    try:
+        # Maintenance runs once however often it is requested while it is pending.
+        job_db = enqueue(db, JobKindEnum(job.kind.value), {}, key=job.kind.value)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
+    job_worker.wake()
+    response.headers["Location"] = f"/jobs/{job_db.id}"
+    return job_db
+
+
+@router.get("/{job_id}")
+def read_job(job_id: int, db: Session = Depends(get_db)) -> Job:
+    try:
+        job = db.get(JobDB, job_id)
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with id no. {job_id} not found.")
+    return job
@@ -1,23 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+import os
+from collections import defaultdict
+from datetime import datetime
+from enum import Enum
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
-from sqlalchemy import or_
+from sqlalchemy import and_, func, select
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased, contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.exc import NoResultFound
 
+from app.cache import response_cache
+from app.changes import ChangeEntityEnum, ChangeOpEnum, record_changes
+from app.conditional import conditional, if_match_versions, not_modified, set_validators, version_etag
 from app.database import get_db
-from app.models import ListDB
-from app.schemas import List, ListCreate
+from app.export import ExportFormatEnum, export_response
+from app.fields import dump_rows_page, parse_fields
+from app.jobs import JobKindEnum, enqueue, job_worker
+from app.models import ListDB, TodoDB
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, keyset_filter, keyset_order, paginate
+from app.schemas import Job, List, ListCreate, ListWithoutTodos, Page, Todo, TodoStats
+from app.search import apply_search, search_rank
+from app.todo_manager import OrderEnum, PriorityEnum, SortByEnum, TodoManager
+
+
+class IncludeEnum(str, Enum):
+    TODOS = "todos"
+
+class TodosLoadingEnum(str, Enum):
+    SELECTIN = "selectin"
+    JOINED = "joined"
+
+TODOS_LOADING = TodosLoadingEnum(os.getenv("TODOS_LOADING", TodosLoadingEnum.SELECTIN.value))
+DEFAULT_EMBEDDED_TODOS = 20
+MAX_EMBEDDED_TODOS = 100
 
 router = APIRouter(prefix="/lists", tags=["Lists"])
 
+
+def _ranked_todos(*criteria):
+    rank = func.row_number().over(partition_by=TodoDB.list_id, order_by=(TodoDB.created_at.desc(), TodoDB.id.desc()))
+    ranked = select(TodoDB, rank.label("rank")).where(*criteria).subquery()
+    return ranked, aliased(TodoDB, ranked)
+
+
+def _embed_todos(db: Session, lists_db: list[ListDB], todos_limit: int) -> None:
+    # One windowed query for the whole page instead of a lazy load per list.
+    if not lists_db:
+        return
+    ranked, todo = _ranked_todos(TodoDB.list_id.in_([list_db.id for list_db in lists_db]))
+    todos_by_list = defaultdict(list)
+    for todo_db in db.query(todo).filter(ranked.c.rank <= todos_limit).order_by(ranked.c.list_id, ranked.c.rank):
+        todos_by_list[todo_db.list_id].append(todo_db)
+    for list_db in lists_db:
+        set_committed_value(list_db, "todos", todos_by_list[list_db.id])
+
+
+def _list_version(db: Session, id: int):
+    try:
+        return db.query(ListDB.version, ListDB.updated_at).filter(ListDB.id == id).one()
+    except NoResultFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"List with id no. {id} not found.")
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
+
+
+def _precondition_failed(id: int) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=f"List with id no. {id} has been modified.")
+
+
+def _read_list_joined(db: Session, id: int, todos_limit: int) -> ListDB:
+    ranked, todo = _ranked_todos(TodoDB.list_id == id)
+    return (
+        db.query(ListDB)
+        .outerjoin(todo, and_(todo.list_id == ListDB.id, ranked.c.rank <= todos_limit))
+        .options(contains_eager(ListDB.todos.of_type(todo)))
+        .filter(ListDB.id == id)
+        .order_by(ranked.c.rank)
+        .one()
+    )
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_list(list: ListCreate, db: Session = Depends(get_db)) -> List:
+def create_list(list: ListCreate, db: Session = Depends(get_db)) -> ListWithoutTodos:
     try:
         new_list = ListDB(**list.model_dump())
         db.add(new_list)
+        db.flush()
+        record_changes(db, ChangeEntityEnum.LIST, ChangeOpEnum.CREATED, [(new_list.id, new_list.id)])
         db.commit()
         db.refresh(new_list)
+        response_cache.lists_changed()
 
         return new_list
     except ValidationError as e:
@@ -28,48 +102,175 @@ def create_list(list: ListCreate, db: Session = Depends(get_db)) -> List:
 
 
 @router.get("/")
-def read_lists(skip: int = 0, limit: int = 10, sort_by: str = "desc", search: str = "", db: Session = Depends(get_db))   -> list[List]:
+def read_lists(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort_by: str = "desc",
+    search: str = "",
+    include: IncludeEnum | None = None,
+    todos_limit: int = Query(DEFAULT_EMBEDDED_TODOS, ge=1, le=MAX_EMBEDDED_TODOS),
+    db: Session = Depends(get_db),
+) -> Page[ListWithoutTodos] | Page[List]:
+    key = response_cache.lists_key(
+        cursor=cursor, limit=limit, sort_by=sort_by, search=search, include=include, todos_limit=todos_limit
+    )
+    response = response_cache.get_or_set(key, lambda: _read_lists(db, cursor, limit, sort_by, search, include, todos_limit))
+    return conditional(request, response)
+
+
+def _read_lists(db: Session, cursor, limit, sort_by, search, include, todos_limit):
+    descending = sort_by != "asc"
     try:
-        lists_db = db.query(ListDB)
+        rank = search_rank(db, ListDB, search) if sort_by == "relevance" else None
+        lists_db = db.query(ListDB) if rank is None else db.query(ListDB, rank.label("relevance"))
 
         if search:
-            lists_db = lists_db.filter(or_(ListDB.title.contains(search), ListDB.description.contains(search)))
+            lists_db = apply_search(db, lists_db, ListDB, search)
+
+        if rank is not None:
+            sort_key = "relevance"
+            if cursor:
+                value, last_id = decode_cursor(cursor, sort_key)
+                lists_db = lists_db.filter(keyset_filter(rank, ListDB.id, True, value, last_id))
 
-        if sort_by == "asc":
-            lists_db = lists_db.order_by(ListDB.updated_at.asc())
-        elif sort_by == "desc":
-            lists_db = lists_db.order_by(ListDB.updated_at.desc())
+            lists_db = lists_db.order_by(*keyset_order(rank, ListDB.id, True))
+            page = paginate(lists_db, limit, lambda row: encode_cursor(sort_key, row.relevance, row.ListDB.id))
+            page["items"] = [row.ListDB for row in page["items"]]
+        else:
+            sort_key = f"updated_at:{'desc' if descending else 'asc'}"
+            if cursor:
+                value, last_id = decode_cursor(cursor, sort_key, is_datetime=True)
+                lists_db = lists_db.filter(keyset_filter(ListDB.updated_at, ListDB.id, descending, value, last_id))
 
-        lists = lists_db.offset(skip).limit(limit).all()
+            lists_db = lists_db.order_by(*keyset_order(ListDB.updated_at, ListDB.id, descending))
+            page = paginate(lists_db, limit, lambda list_db: encode_cursor(sort_key, list_db.updated_at, list_db.id))
 
-        return lists
+        if include == IncludeEnum.TODOS:
+            _embed_todos(db, page["items"], todos_limit)
+            return Page[List].model_validate(page, from_attributes=True)
+        return Page[ListWithoutTodos].model_validate(page, from_attributes=True)
     except SQLAlchemyError:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
 
 
 @router.get("/{id}")
-def read_list(id: int, db: Session = Depends(get_db)) -> List:
+def read_list(
+    id: int,
+    request: Request,
+    include: IncludeEnum | None = None,
+    todos_limit: int = Query(DEFAULT_EMBEDDED_TODOS, ge=1, le=MAX_EMBEDDED_TODOS),
+    db: Session = Depends(get_db),
+) -> ListWithoutTodos | List:
+    if include == IncludeEnum.TODOS:
+        # The embedded todos change without touching the list row, so tag the body instead.
+        key = response_cache.list_key(id, include=include, todos_limit=todos_limit)
+        return conditional(request, response_cache.get_or_set(key, lambda: _read_list(db, id, include, todos_limit)))
+
+    version, updated_at = _list_version(db, id)
+    etag = version_etag("list", id, version)
+    if (response := not_modified(request, etag, updated_at)) is not None:
+        return response
+    key = response_cache.list_key(id, version=version)
+    return set_validators(response_cache.get_or_set(key, lambda: _read_list(db, id, include, todos_limit)), etag, updated_at)
+
+
+def _read_list(db: Session, id: int, include, todos_limit):
     try:
-        list_db = db.query(ListDB).filter(ListDB.id == id).one()
-        return list_db
+        if include != IncludeEnum.TODOS:
+            return ListWithoutTodos.model_validate(db.query(ListDB).filter(ListDB.id == id).one())
+
+        if TODOS_LOADING == TodosLoadingEnum.JOINED:
+            list_db = _read_list_joined(db, id, todos_limit)
+        else:
+            list_db = db.query(ListDB).filter(ListDB.id == id).one()
+            _embed_todos(db, [list_db], todos_limit)
+        return List.model_validate(list_db)
     except NoResultFound:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"List with id no. {id} not found.")
     except SQLAlchemyError:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
 
 
+@router.get("/{id}/todos")
+def read_list_todos(
+    id: int,
+    request: Request,
+    due_date: datetime = None,
+    priority: PriorityEnum = None,
+    search: str = None,
+    sort_by: SortByEnum = SortByEnum.CREATED_AT,
+    order: OrderEnum = OrderEnum.DESC,
+    completed: bool | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    overdue: bool | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description="Comma-separated Todo fields to return, e.g. id,title,completed"),
+    db: Session = Depends(get_db),
+) -> Page[Todo]:
+    fields = parse_fields(fields)
+    key = response_cache.list_todos_key(
+        id, due_date=due_date, priority=priority, search=search, sort_by=sort_by, order=order,
+        completed=completed, due_before=due_before, due_after=due_after, overdue=overdue,
+        cursor=cursor, limit=limit, fields=fields and ",".join(fields),
+    )
+
+    def produce():
+        page = TodoManager(db).get_todos(
+            due_date, priority, search, sort_by, order, completed, cursor, limit, fields, due_before, due_after, overdue, id
+        )
+        # A non-empty page proves the list exists; only an empty one costs a lookup.
+        if not page["items"]:
+            _list_version(db, id)
+        return page if fields is not None else Page[Todo].model_validate(page, from_attributes=True)
+
+    serialize = (lambda page: dump_rows_page(page, fields)) if fields is not None else None
+    return conditional(request, response_cache.get_or_set(key, produce, serialize))
+
+
+@router.get("/{id}/stats")
+def read_list_stats(id: int, db: Session = Depends(get_db)) -> TodoStats:
+    _list_version(db, id)
+    return TodoManager(db).get_stats(id)
+
+
+@router.get("/{id}/export")
+def export_list(
+    id: int,
+    format: ExportFormatEnum = ExportFormatEnum.NDJSON,
+    sort_by: SortByEnum = SortByEnum.CREATED_AT,
+    order: OrderEnum = OrderEnum.DESC,
+    completed: bool | None = None,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    _list_version(db, id)
+    partitions = TodoManager(db).export_todos(None, None, None, sort_by, order, completed, list_id=id)
+    return export_response(partitions, format, db, f"list-{id}")
+
+
 @router.put("/{id}")
-def update_list(id: int, list: ListCreate, db: Session = Depends(get_db))  -> List:
+def update_list(id: int, list: ListCreate, request: Request, response: Response, db: Session = Depends(get_db))  -> ListWithoutTodos:
     try:
         list_db = db.query(ListDB).filter(ListDB.id == id)
         list_to_update = list_db.one_or_none()
             
         if list_to_update is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"List with id no. {id} not found.")
+
+        versions = if_match_versions(request, "list", id)
+        if versions is not None:
+            list_db = list_db.filter(ListDB.version.in_(versions))
             
-        list_db.update(list.model_dump())
+        if list_db.update(list.model_dump()) == 0:
+            db.rollback()
+            raise _precondition_failed(id)
+        record_changes(db, ChangeEntityEnum.LIST, ChangeOpEnum.UPDATED, [(id, id)])
         db.commit()
         db.refresh(list_to_update)
+        response_cache.list_changed(id)
+        set_validators(response, version_etag("list", id, list_to_update.version), list_to_update.updated_at)
 
         return list_to_update
     except ValidationError as e:
@@ -79,18 +280,25 @@ def update_list(id: int, list: ListCreate, db: Session = Depends(get_db))  -> Li
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
 
 
-@router.delete("/{id}")
-def delete_list(id: int, db: Session = Depends(get_db)) -> Response:
+@router.delete("/{id}", status_code=status.HTTP_202_ACCEPTED)
+def delete_list(id: int, request: Request, response: Response, db: Session = Depends(get_db)) -> Job:
     try:
-        list_db = db.query(ListDB).filter(ListDB.id == id).one_or_none()
+        version = db.scalar(select(ListDB.version).where(ListDB.id == id))
 
-        if list_db is None:
+        if version is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"List with id no. {id} not found.")
-        
-        db.delete(list_db)
-        db.commit()
 
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
+        versions = if_match_versions(request, "list", id)
+        if versions is not None and version not in versions:
+            raise _precondition_failed(id)
+
+        # The list and its todos are deleted by the job worker, in chunks. Until then the list
+        # is still readable; poll the job for completion.
+        job = enqueue(db, JobKindEnum.DELETE_LIST, {"list_id": id}, key=f"delete_list:{id}")
+        db.commit()
+        job_worker.wake()
+        response.headers["Location"] = f"/jobs/{job.id}"
+        return job
     except SQLAlchemyError:
         db.rollback()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.")
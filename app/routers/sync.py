@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas import SyncDelta
+from app.sync import DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT, sync
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get("/")
+def read_sync(
+    since: int | None = Query(None, ge=0),
+    limit: int = Query(DEFAULT_SYNC_LIMIT, ge=1, le=MAX_SYNC_LIMIT),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+) -> SyncDelta:
+    # Without since, a snapshot of every list and todo, in pages continued with cursor.
+    return sync(db, since, limit, cursor)
@@ -1,13 +1,34 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.cache import response_cache
+from app.conditional import conditional, if_match_versions, not_modified, set_validators, version_etag
 from app.database import get_db
-from app.schemas import Todo, TodoCreate
-from app.todo_manager import OrderEnum, PriorityEnum, SortByEnum, TodoManager
+from app.export import ExportFormatEnum, export_response
+from app.fields import dump_rows_page, parse_fields
+from app.importer import import_format, import_todos as import_stream
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.routers.list import IncludeEnum
+from app.schemas import Agenda, BulkResult, ImportSummary, Page, Todo, TodoBulkUpdate, TodoCreate, TodoUpdate, validate_bulk
+from app.todo_manager import (
+    BULK_CHUNK_SIZE,
+    DEFAULT_AGENDA_TODOS,
+    MAX_AGENDA_TODOS,
+    MAX_BULK_ITEMS,
+    BucketEnum,
+    OrderEnum,
+    PriorityEnum,
+    SortByEnum,
+    TodoManager,
+)
 
 router = APIRouter(prefix="/todos", tags=["Todos"])
+agenda_router = APIRouter(tags=["Todos"])
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 def create_todo(todo: TodoCreate, db: Session = Depends(get_db)) -> Todo:
@@ -15,28 +36,161 @@ def create_todo(todo: TodoCreate, db: Session = Depends(get_db)) -> Todo:
 
 @router.get("/")
 def get_todos(
+    request: Request,
     due_date: datetime = None,
     priority: PriorityEnum = None,
     search: str = None,
     sort_by: SortByEnum = SortByEnum.CREATED_AT,
     order: OrderEnum = OrderEnum.DESC,
     completed: bool | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    overdue: bool | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description="Comma-separated Todo fields to return, e.g. id,title,completed"),
     db: Session = Depends(get_db),
-)  -> list[Todo]:
-    return TodoManager(db).get_todos(due_date, priority, search, sort_by, order, completed)
+)  -> Page[Todo]:
+    fields = parse_fields(fields)
+    key = response_cache.todos_key(
+        due_date=due_date, priority=priority, search=search, sort_by=sort_by, order=order,
+        completed=completed, due_before=due_before, due_after=due_after, overdue=overdue,
+        cursor=cursor, limit=limit, fields=fields and ",".join(fields),
+    )
+
+    def produce():
+        page = TodoManager(db).get_todos(
+            due_date, priority, search, sort_by, order, completed, cursor, limit, fields, due_before, due_after, overdue
+        )
+        return page if fields is not None else Page[Todo].model_validate(page, from_attributes=True)
+
+    serialize = (lambda page: dump_rows_page(page, fields)) if fields is not None else None
+    return conditional(request, response_cache.get_or_set(key, produce, serialize))
+
+def merge_errors(result: dict, errors: list) -> dict:
+    result["errors"] = sorted(errors + result["errors"], key=lambda error: error["index"])
+    return result
+
+@router.post("/bulk")
+def create_todos(
+    todos: list[Any] = Body(..., max_length=MAX_BULK_ITEMS),
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+) -> BulkResult[Todo]:
+    valid, errors = validate_bulk(TodoCreate, todos)
+    return merge_errors(TodoManager(db).create_todos(valid, chunk_size), errors)
+
+@router.patch("/bulk")
+def update_todos(
+    todos: list[Any] = Body(..., max_length=MAX_BULK_ITEMS),
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+) -> BulkResult[Todo]:
+    valid, errors = validate_bulk(TodoBulkUpdate, todos)
+    return merge_errors(TodoManager(db).update_todos(valid, chunk_size), errors)
+
+@router.post("/import")
+async def import_todos(
+    request: Request,
+    format: ExportFormatEnum | None = None,
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+) -> ImportSummary:
+    # Reads the upload on the event loop and runs each chunk's transaction in the threadpool.
+    manager = TodoManager(db)
+    list_ids = await run_in_threadpool(manager.list_ids)
+    return await import_stream(
+        request.stream(),
+        import_format(request, format),
+        lambda chunk: run_in_threadpool(manager.import_todos, chunk, list_ids),
+        chunk_size,
+    )
+
+@router.delete("/bulk")
+def delete_todos(
+    todo_ids: list[int] = Body(..., max_length=MAX_BULK_ITEMS),
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+) -> BulkResult[int]:
+    return TodoManager(db).delete_todos(todo_ids, chunk_size)
+
+@router.get("/export")
+def export_todos(
+    format: ExportFormatEnum = ExportFormatEnum.NDJSON,
+    due_date: datetime = None,
+    priority: PriorityEnum = None,
+    search: str = None,
+    sort_by: SortByEnum = SortByEnum.CREATED_AT,
+    order: OrderEnum = OrderEnum.DESC,
+    completed: bool | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    overdue: bool | None = None,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    partitions = TodoManager(db).export_todos(
+        due_date, priority, search, sort_by, order, completed,
+        due_before=due_before, due_after=due_after, overdue=overdue,
+    )
+    return export_response(partitions, format, db, "todos")
 
 @router.get("/{todo_id}")
-def get_todo(todo_id: int, db: Session = Depends(get_db)) -> Todo:
-    return TodoManager(db).get_todo(todo_id)
+def get_todo(todo_id: int, request: Request, db: Session = Depends(get_db)) -> Todo:
+    version, updated_at = TodoManager(db).get_todo_version(todo_id)
+    etag = version_etag("todo", todo_id, version)
+    if (response := not_modified(request, etag, updated_at)) is not None:
+        return response
+    response = response_cache.get_or_set(
+        response_cache.todo_key(todo_id, version), lambda: Todo.model_validate(TodoManager(db).get_todo(todo_id))
+    )
+    return set_validators(response, etag, updated_at)
 
 @router.put("/{todo_id}")
-def update_todo(todo_id: int, todo: TodoCreate, db: Session = Depends(get_db)) -> Todo:
-    return TodoManager(db).update_todo(todo_id, todo)
+def update_todo(todo_id: int, todo: TodoCreate, request: Request, response: Response, db: Session = Depends(get_db)) -> Todo:
+    todo_db = TodoManager(db).update_todo(todo_id, todo, if_match_versions(request, "todo", todo_id))
+    set_validators(response, version_etag("todo", todo_id, todo_db.version), todo_db.updated_at)
+    return todo_db
     
+@router.patch("/{todo_id}")
+def patch_todo(todo_id: int, todo: TodoUpdate, request: Request, response: Response, db: Session = Depends(get_db)) -> Todo:
+    todo_db = TodoManager(db).patch_todo(todo_id, todo, if_match_versions(request, "todo", todo_id))
+    set_validators(response, version_etag("todo", todo_id, todo_db.version), todo_db.updated_at)
+    return todo_db
+
 @router.delete("/{todo_id}")
-def delete_todo(todo_id: int, db: Session = Depends(get_db)) -> Response:
-    return TodoManager(db).delete_todo(todo_id)
+def delete_todo(todo_id: int, request: Request, db: Session = Depends(get_db)) -> Response:
+    return TodoManager(db).delete_todo(todo_id, if_match_versions(request, "todo", todo_id))
 
 @router.patch("/{todo_id}/complete")
-def toggle_completed(todo_id: int, db: Session = Depends(get_db)) -> Todo:
-    return TodoManager(db).toggle_completed(todo_id)
\ No newline at end of file
+def toggle_completed(todo_id: int, response: Response, db: Session = Depends(get_db)) -> Todo:
+    todo_db = TodoManager(db).toggle_completed(todo_id)
+    set_validators(response, version_etag("todo", todo_id, todo_db.version), todo_db.updated_at)
+    return todo_db
+
+def check_agenda_window(start: date, end: date) -> None:
+    if end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="`to` must not be before `from`.")
+
+@agenda_router.get("/agenda")
+def get_agenda(
+    request: Request,
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    bucket: BucketEnum = BucketEnum.DAY,
+    completed: bool | None = None,
+    list_id: int | None = None,
+    include: IncludeEnum | None = None,
+    todos_limit: int = Query(DEFAULT_AGENDA_TODOS, ge=1, le=MAX_AGENDA_TODOS),
+    db: Session = Depends(get_db),
+) -> Agenda:
+    # Both ends are inclusive days. Todos are only embedded with include=todos, up to
+    # todos_limit per bucket in due date order.
+    check_agenda_window(start, end)
+    todos_limit = todos_limit if include == IncludeEnum.TODOS else None
+    key = response_cache.agenda_key(
+        start=start, end=end, bucket=bucket, completed=completed, list_id=list_id, todos_limit=todos_limit
+    )
+    response = response_cache.get_or_set(key, lambda: Agenda.model_validate(
+        {"buckets": TodoManager(db).get_agenda(start, end, bucket, completed, list_id, todos_limit)}, from_attributes=True
+    ))
+    return conditional(request, response)
@@ -1,9 +1,14 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Generic, TypeVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
+from app.changes import ChangeEntityEnum, ChangeOpEnum
+from app.jobs import JobStatusEnum, MaintenanceJobEnum
 from app.todo_manager import PriorityEnum
 
+T = TypeVar("T")
+
 
 class TodoBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
@@ -15,6 +20,18 @@ class TodoBase(BaseModel):
 class TodoCreate(TodoBase):
     list_id: int
 
+class TodoUpdate(BaseModel):
+    # Non-nullable columns default to None only to mark them unset; an explicit null is rejected.
+    title: str = Field(None, min_length=1, max_length=100)
+    details: str | None = None
+    completed: bool = None
+    due_date: datetime | None = None
+    priority: PriorityEnum = None
+    list_id: int = None
+
+class TodoBulkUpdate(TodoUpdate):
+    id: int
+
 class Todo(TodoBase):
     id: int
     created_at: datetime
@@ -42,4 +59,100 @@ class ListWithoutTodos(ListBase):
     created_at: datetime
     updated_at: datetime
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+
+
+class BulkError(BaseModel):
+    index: int
+    detail: str | list
+
+class BulkResult(BaseModel, Generic[T]):
+    items: list[T]
+    errors: list[BulkError] = []
+
+
+class TodoStats(BaseModel):
+    total: int
+    completed: int
+    pending: int
+    overdue: int
+    by_priority: dict[PriorityEnum, int]
+    completion_rate: float
+
+class AgendaBucket(BaseModel):
+    # The first day of the bucket: the day itself, or the Monday of the week.
+    start: date
+    total: int
+    completed: int
+    todos: list[Todo] = []
+
+class Agenda(BaseModel):
+    buckets: list[AgendaBucket]
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: str | list
+
+class ImportSummary(BaseModel):
+    created: int
+    failed: int
+    # Capped at MAX_IMPORT_ERRORS; failed counts every rejected line.
+    errors: list[ImportLineError] = []
+
+
+class Change(BaseModel):
+    seq: int
+    entity: ChangeEntityEnum
+    entity_id: int
+    op: ChangeOpEnum
+    list_id: int | None = None
+    created_at: datetime
+
+class ChangeFeed(BaseModel):
+    changes: list[Change]
+    # Pass back as `since` to continue from here.
+    last_seq: int
+    has_more: bool
+
+class Tombstones(BaseModel):
+    lists: list[int] = []
+    todos: list[int] = []
+
+class SyncDelta(BaseModel):
+    lists: list[ListWithoutTodos]
+    todos: list[Todo]
+    deleted: Tombstones
+    # Pass back as `since` on the next sync.
+    token: int
+    has_more: bool
+    # Set while a snapshot has more pages: pass back as `cursor` for the next one.
+    next_cursor: str | None = None
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: JobStatusEnum
+    attempts: int
+    result: dict | None = None
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    class Config:
+        from_attributes = True
+
+class JobCreate(BaseModel):
+    kind: MaintenanceJobEnum
+
+
+def validate_bulk(model: type[BaseModel], items: list) -> tuple[dict, list]:
+    valid, errors = {}, []
+    for index, item in enumerate(items):
+        try:
+            valid[index] = model.model_validate(item)
+        except ValidationError as e:
+            errors.append({"index": index, "detail": e.errors(include_url=False, include_context=False)})
+    return valid, errors
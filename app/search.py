@@ -0,0 +1,72 @@
+import re
+
+from sqlalchemy import DDL, Float, Integer, column, event, inspect, literal_column, or_, table
+from sqlalchemy.orm import Session
+
+from app.models import ListDB, TodoDB
+
+FTS_TABLES = {
+    TodoDB: ("todos_fts", ("title", "details")),
+    ListDB: ("lists_fts", ("title", "description")),
+}
+
+_fts_selectables = {
+    model: table(name, column("rowid", Integer), column("rank", Float)) for model, (name, _) in FTS_TABLES.items()
+}
+
+_fts_support: dict[str, bool] = {}
+
+
+def _fts_ddl(source: str, fts: str, columns: tuple) -> list[str]:
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{source}', content_rowid='id', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+for _model, (_fts, _columns) in FTS_TABLES.items():
+    for _statement in _fts_ddl(_model.__tablename__, _fts, _columns):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(_model.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {_fts}").execute_if(dialect="sqlite"))
+
+
+def fts_query(search: str) -> str:
+    return " ".join(f'"{term}"*' for term in re.findall(r"\w+", search))
+
+
+def fts_enabled(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    key = str(bind.engine.url)
+    if key not in _fts_support:
+        inspector = inspect(bind)
+        _fts_support[key] = all(inspector.has_table(name) for name, _ in FTS_TABLES.values())
+    return _fts_support[key]
+
+
+def apply_search(db: Session, query, model, search: str):
+    fts_name, columns = FTS_TABLES[model]
+    match = fts_query(search)
+
+    if not match or not fts_enabled(db):
+        return query.filter(or_(*(getattr(model, c).contains(search) for c in columns)))
+
+    fts = _fts_selectables[model]
+    return query.join(fts, fts.c.rowid == model.id).filter(literal_column(fts_name).op("MATCH")(match))
+
+
+def search_rank(db: Session, model, search: str):
+    if not search or not fts_query(search) or not fts_enabled(db):
+        return None
+    # bm25 is lower for better matches; negate it so higher means more relevant.
+    return -_fts_selectables[model].c.rank
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = self.error = None
+
+
+class _Abandoned(Exception):
+    pass
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+# Concurrent calls with the same key share one run of `produce`: the first caller runs it and
+# the others wait for its result or exception. Nothing is kept once the call returns, so a
+# caller that arrives afterwards runs `produce` again.
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._futures: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key: str, produce):
+        if _on_event_loop():
+            # Sync code run on the event loop (through AsyncSession.run_sync) cannot wait
+            # without blocking the loop, so it is not coalesced.
+            return produce()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = produce()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: str, produce):
+        while (future := self._futures.get(key)) is not None:
+            self.shared += 1
+            try:
+                # Shielded, so a follower that is cancelled does not cancel the leader's result.
+                return await asyncio.shield(future)
+            except _Abandoned:
+                # The leader was cancelled before it finished; the next caller takes over.
+                self.shared -= 1
+
+        future = self._futures[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await produce()
+        except asyncio.CancelledError:
+            future.set_exception(_Abandoned())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._futures[key]
+            # Mark the exception as retrieved when nobody was waiting for it.
+            if future.done() and not future.cancelled():
+                future.exception()
@@ -0,0 +1,104 @@
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import DDL, Integer, and_, case, column, event, false, func, inspect, select, table
+from sqlalchemy.orm import Session
+
+from app.models import TodoDB
+
+STATS_SUMMARY = os.getenv("STATS_SUMMARY", "1") == "1"
+PRIORITIES = ("low", "medium", "high")
+
+# Per-list counters kept in step with todos by triggers, so reading them does not depend on
+# how many todos a list has. Todos without a list are counted under list_id 0.
+_summary = table(
+    "todo_stats", *(column(name, Integer) for name in ("list_id", "total", "completed", *PRIORITIES))
+)
+
+_summary_support: dict[str, bool] = {}
+
+
+def _counters(row: str, sign: str) -> str:
+    priorities = ", ".join(f"{p} = {p} {sign} ({row}.priority = '{p}')" for p in PRIORITIES)
+    return (
+        f"UPDATE todo_stats SET total = total {sign} 1, completed = completed {sign} {row}.completed, {priorities} "
+        f"WHERE list_id = coalesce({row}.list_id, 0);"
+    )
+
+
+_add = f"INSERT OR IGNORE INTO todo_stats (list_id) VALUES (coalesce(new.list_id, 0)); {_counters('new', '+')}"
+
+_SUMMARY_DDL = [
+    "CREATE TABLE IF NOT EXISTS todo_stats (list_id INTEGER PRIMARY KEY, total INTEGER NOT NULL DEFAULT 0, "
+    "completed INTEGER NOT NULL DEFAULT 0, low INTEGER NOT NULL DEFAULT 0, medium INTEGER NOT NULL DEFAULT 0, "
+    "high INTEGER NOT NULL DEFAULT 0)",
+    f"CREATE TRIGGER IF NOT EXISTS todo_stats_ai AFTER INSERT ON todos BEGIN {_add} END",
+    f"CREATE TRIGGER IF NOT EXISTS todo_stats_ad AFTER DELETE ON todos BEGIN {_counters('old', '-')} END",
+    f"CREATE TRIGGER IF NOT EXISTS todo_stats_au AFTER UPDATE OF list_id, completed, priority ON todos BEGIN "
+    f"{_counters('old', '-')} {_add} END",
+    "CREATE TRIGGER IF NOT EXISTS todo_stats_list_ad AFTER DELETE ON lists BEGIN "
+    "DELETE FROM todo_stats WHERE list_id = old.id; END",
+]
+
+for _statement in _SUMMARY_DDL:
+    event.listen(TodoDB.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(TodoDB.__table__, "before_drop", DDL("DROP TABLE IF EXISTS todo_stats").execute_if(dialect="sqlite"))
+
+
+def summary_enabled(db: Session) -> bool:
+    bind = db.get_bind()
+    if not STATS_SUMMARY or bind.dialect.name != "sqlite":
+        return False
+    key = str(bind.engine.url)
+    if key not in _summary_support:
+        _summary_support[key] = inspect(bind).has_table("todo_stats")
+    return _summary_support[key]
+
+
+def overdue_filter(now: datetime):
+    return and_(TodoDB.completed == false(), TodoDB.due_date < now)
+
+
+def _grouped_counts(db: Session, list_id: int | None) -> dict:
+    # One pass over the todos, grouped by the two dimensions the stats break down by.
+    query = select(
+        TodoDB.completed,
+        TodoDB.priority,
+        func.count(),
+        func.sum(case((overdue_filter(datetime.now(timezone.utc)), 1), else_=0)),
+    ).group_by(TodoDB.completed, TodoDB.priority)
+    if list_id is not None:
+        query = query.where(TodoDB.list_id == list_id)
+
+    counts = {"total": 0, "completed": 0, "overdue": 0, **{p: 0 for p in PRIORITIES}}
+    for completed, priority, count, overdue in db.execute(query):
+        counts["total"] += count
+        counts["completed"] += count if completed else 0
+        counts["overdue"] += overdue or 0
+        counts[priority] += count
+    return counts
+
+
+def _summary_counts(db: Session, list_id: int | None) -> dict:
+    columns = [func.coalesce(func.sum(_summary.c[name]), 0).label(name) for name in ("total", "completed", *PRIORITIES)]
+    query = select(*columns)
+    overdue = select(func.count()).select_from(TodoDB).where(overdue_filter(datetime.now(timezone.utc)))
+    if list_id is not None:
+        query = query.where(_summary.c.list_id == list_id)
+        overdue = overdue.where(TodoDB.list_id == list_id)
+
+    # Overdue depends on the current time, so it is counted from the (list_id, completed, due_date) index.
+    return {**db.execute(query).one()._asdict(), "overdue": db.scalar(overdue)}
+
+
+def todo_stats(db: Session, list_id: int | None = None) -> dict:
+    counts = (_summary_counts if summary_enabled(db) else _grouped_counts)(db, list_id)
+    total, completed = counts["total"], counts["completed"]
+    return {
+        "total": total,
+        "completed": completed,
+        "pending": total - completed,
+        "overdue": counts["overdue"],
+        "by_priority": {p: counts[p] for p in PRIORITIES},
+        "completion_rate": completed / total if total else 0.0,
+    }
@@ -0,0 +1,123 @@
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.changes import ChangeEntityEnum, latest_seq, read_changes
+from app.database import SessionLocal
+from app.models import ChangeDB, ListDB, TodoDB
+from app.pagination import decode_cursor, encode_cursor
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 5000
+# Changes, and with them the tombstones of deleted rows, are kept this long.
+SYNC_RETENTION_DAYS = float(os.getenv("SYNC_RETENTION_DAYS", "30"))
+
+# A sync token is a change log sequence number. The log doubles as the tombstone store:
+# rows are still deleted outright, and a changed id whose row is gone is reported as deleted.
+# A snapshot is paged by id, lists first and then todos, with a cursor that carries the token
+# read on its first page.
+
+
+def _horizon(db: Session) -> int:
+    # Changes up to here may have been compacted away. Compaction always keeps the newest change.
+    first = db.scalar(select(func.min(ChangeDB.seq)))
+    return first - 1 if first else 0
+
+
+def _rows(db: Session, model, ids) -> list:
+    return db.scalars(select(model).where(model.id.in_(ids)).order_by(model.id)).all() if ids else []
+
+
+def _snapshot_cursor(cursor: str) -> tuple[int, ChangeEntityEnum, int]:
+    value, last_id = decode_cursor(cursor, "snapshot")
+    try:
+        token, entity = value
+        if not isinstance(token, int):
+            raise ValueError("token is not a sequence number")
+        return token, ChangeEntityEnum(entity), last_id
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.") from e
+
+
+def _snapshot(db: Session, limit: int, cursor: str | None) -> dict:
+    # The token is read on the first page: rows changed while the pages are read are sent again next time.
+    if cursor is None:
+        token, entity, last_id = latest_seq(db), ChangeEntityEnum.LIST, 0
+    else:
+        token, entity, last_id = _snapshot_cursor(cursor)
+
+    lists = []
+    if entity == ChangeEntityEnum.LIST:
+        lists = db.scalars(select(ListDB).where(ListDB.id > last_id).order_by(ListDB.id).limit(limit + 1)).all()
+        if len(lists) > limit:
+            lists = lists[:limit]
+            next_cursor = encode_cursor("snapshot", [token, ChangeEntityEnum.LIST.value], lists[-1].id)
+            return {"lists": lists, "todos": [], "deleted": {}, "token": token, "has_more": True, "next_cursor": next_cursor}
+        last_id = 0
+
+    remaining = limit - len(lists)
+    todos = db.scalars(select(TodoDB).where(TodoDB.id > last_id).order_by(TodoDB.id).limit(remaining + 1)).all()
+    todos, has_more = todos[:remaining], len(todos) > remaining
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor("snapshot", [token, ChangeEntityEnum.TODO.value], todos[-1].id if todos else 0)
+    return {"lists": lists, "todos": todos, "deleted": {}, "token": token, "has_more": has_more, "next_cursor": next_cursor}
+
+
+def _delta(db: Session, since: int, limit: int) -> dict:
+    if since < _horizon(db):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Sync token has expired; sync again without since.")
+
+    changes = read_changes(db, since, limit + 1)
+    changes, has_more = changes[:limit], len(changes) > limit
+    list_ids = {change["entity_id"] for change in changes if change["entity"] == ChangeEntityEnum.LIST}
+    todo_ids = {change["entity_id"] for change in changes if change["entity"] == ChangeEntityEnum.TODO}
+    lists, todos = _rows(db, ListDB, list_ids), _rows(db, TodoDB, todo_ids)
+    return {
+        "lists": lists,
+        "todos": todos,
+        "deleted": {
+            "lists": sorted(list_ids - {list_db.id for list_db in lists}),
+            "todos": sorted(todo_ids - {todo_db.id for todo_db in todos}),
+        },
+        "token": changes[-1]["seq"] if changes else since,
+        "has_more": has_more,
+    }
+
+
+def sync(db: Session, since: int | None = None, limit: int = DEFAULT_SYNC_LIMIT, cursor: str | None = None) -> dict:
+    if since is not None and cursor is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pass either since or cursor, not both.")
+    try:
+        return _snapshot(db, limit, cursor) if since is None else _delta(db, since, limit)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+
+def compact_changes(db: Session, retention: timedelta = timedelta(days=SYNC_RETENTION_DAYS)) -> int:
+    # Tokens from before the oldest remaining change get 410 and fall back to a full sync.
+    cutoff = datetime.now(timezone.utc) - retention
+    try:
+        purged = db.execute(delete(ChangeDB).where(ChangeDB.created_at < cutoff, ChangeDB.seq < latest_seq(db))).rowcount
+        db.commit()
+        return purged
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Purge changes and tombstones older than the retention period.")
+    parser.add_argument("--retention-days", type=float, default=SYNC_RETENTION_DAYS)
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        print(f"Purged {compact_changes(db, timedelta(days=args.retention_days))} changes.")
+
+
+if __name__ == "__main__":
+    main()
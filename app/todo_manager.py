@@ -1,14 +1,19 @@
-from datetime import datetime
+from datetime import date, datetime, time, timedelta, timezone
 from enum import Enum
-from sqlite3 import IntegrityError
 
 from fastapi import HTTPException, Response, status
-from sqlalchemy import case, or_
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, DateTime, Integer, cast, delete, func, insert, not_, select, type_coerce, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.orm.exc import NoResultFound
 
+from app.cache import response_cache
+from app.changes import ChangeEntityEnum, ChangeOpEnum, record_changes
 from app.models import ListDB, TodoDB
+from app.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, keyset_filter, keyset_order, paginate
+from app.search import apply_search, search_rank
+from app.stats import overdue_filter, todo_stats
 
 
 class PriorityEnum(str, Enum):
@@ -20,37 +25,88 @@ class SortByEnum(str, Enum):
     DUE_DATE = "due_date"
     PRIORITY = "priority"
     CREATED_AT = "created_at"
+    RELEVANCE = "relevance"
 
 class OrderEnum(str, Enum):
     ASC = "asc"
     DESC = "desc"
 
+class BucketEnum(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+
+PRIORITY_RANK = {"high": 3, "medium": 2, "low": 1}
+BULK_CHUNK_SIZE = 500
+MAX_BULK_ITEMS = 10_000
+EXPORT_BATCH_SIZE = 1000
+DEFAULT_AGENDA_TODOS = 20
+MAX_AGENDA_TODOS = 100
+
+
+def due_bucket(db: Session, bucket: BucketEnum):
+    # The date a todo's due date falls in, or the Monday of its week.
+    if db.get_bind().dialect.name == "sqlite":
+        args = ("weekday 0", "-6 days") if bucket == BucketEnum.WEEK else ()
+        return type_coerce(func.date(TodoDB.due_date, *args), Date)
+    return cast(func.date_trunc(bucket.value, TodoDB.due_date), Date)
+
+
 class TodoManager:
     def __init__(self, db: Session):
         self.db = db
 
-    def _apply_filters(self, query, due_date: datetime = None, priority: PriorityEnum = None, search: str = None, completed: bool = None):
-        if search: 
-            query = query.filter(or_(TodoDB.title.contains(search), TodoDB.details.contains(search)))
+    def _apply_filters(
+        self,
+        query,
+        due_date: datetime = None,
+        priority: PriorityEnum = None,
+        search: str = None,
+        completed: bool = None,
+        due_before: datetime = None,
+        due_after: datetime = None,
+        overdue: bool = None,
+        list_id: int = None,
+    ):
+        if list_id is not None:
+            query = query.filter(TodoDB.list_id == list_id)
+        if search:
+            query = apply_search(self.db, query, TodoDB, search)
         if due_date:
             query = query.filter(TodoDB.due_date == due_date)
+        # A half-open range: due_after is inclusive, due_before exclusive.
+        if due_after:
+            query = query.filter(TodoDB.due_date >= due_after)
+        if due_before:
+            query = query.filter(TodoDB.due_date < due_before)
+        if overdue is not None:
+            is_overdue = overdue_filter(datetime.now(timezone.utc))
+            query = query.filter(is_overdue if overdue else not_(is_overdue) | TodoDB.due_date.is_(None))
         if priority:
-            query = query.filter(TodoDB.priority == priority)
-        if completed:
+            query = query.filter(TodoDB.priority_rank == PRIORITY_RANK[PriorityEnum(priority).value])
+        if completed is not None:
             query = query.filter(TodoDB.completed == completed)
         return query
 
-    def _apply_sorting(self, query, sort_by: SortByEnum, order: OrderEnum):
-        if sort_by == SortByEnum.DUE_DATE:
-            return query.order_by(TodoDB.due_date.desc() if order == OrderEnum.DESC else TodoDB.due_date.asc())
+    def _sort_key(self, sort_by: SortByEnum, search: str = None) -> tuple:
+        rank = search_rank(self.db, TodoDB, search) if sort_by == SortByEnum.RELEVANCE else None
+        if rank is not None:
+            return rank, False, lambda row: row.relevance
+        elif sort_by == SortByEnum.DUE_DATE:
+            return TodoDB.due_date, True, lambda todo: todo.due_date
         elif sort_by == SortByEnum.PRIORITY:
-            priority_order = case(
-                {"high": 3, "medium": 2, "low": 1},
-                value=TodoDB.priority
-            )
-            return query.order_by(priority_order.desc() if order == OrderEnum.DESC else priority_order.asc())
-        else:  
-            return query.order_by(TodoDB.created_at.desc() if order == OrderEnum.DESC else TodoDB.created_at.asc())
+            return TodoDB.priority_rank, False, lambda todo: todo.priority_rank
+        else:
+            return TodoDB.created_at, False, lambda todo: todo.created_at
+
+    def _apply_sorting(self, query, sort_by: SortByEnum, order: OrderEnum, search: str = None):
+        column, _, _ = self._sort_key(sort_by, search)
+        return query.order_by(*keyset_order(column, TodoDB.id, order == OrderEnum.DESC))
+
+    def _apply_cursor(self, query, sort_by: SortByEnum, order: OrderEnum, cursor: str, search: str = None):
+        column, nullable, _ = self._sort_key(sort_by, search)
+        is_datetime = isinstance(column.type, DateTime)
+        value, last_id = decode_cursor(cursor, f"{sort_by.value}:{order.value}", is_datetime=is_datetime)
+        return query.filter(keyset_filter(column, TodoDB.id, order == OrderEnum.DESC, value, last_id, nullable))
 
     def get_todos(
         self,
@@ -60,12 +116,120 @@ class TodoManager:
         sort_by: SortByEnum,
         order: OrderEnum,
         completed: bool,
-    ) -> list[TodoDB]:
+        cursor: str = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        fields: tuple[str, ...] = None,
+        due_before: datetime = None,
+        due_after: datetime = None,
+        overdue: bool = None,
+        list_id: int = None,
+    ) -> dict:
+        sort_key = f"{sort_by.value}:{order.value}"
+        try:
+            rank = search_rank(self.db, TodoDB, search) if sort_by == SortByEnum.RELEVANCE else None
+            column, _, value_of = self._sort_key(sort_by, search)
+            if fields is None:
+                query = self.db.query(TodoDB)
+            else:
+                # Column-only rows instead of entities: the requested fields first, then the
+                # id and sort column the cursor is built from.
+                names = dict.fromkeys([*fields, "id", *([column.key] if rank is None else [])])
+                query = self.db.query(*(TodoDB.__table__.c[name] for name in names))
+            if rank is not None:
+                query = query.add_columns(rank.label("relevance"))
+            query = self._apply_filters(
+                query, due_date, priority, search, completed, due_before, due_after, overdue, list_id
+            )
+            if cursor:
+                query = self._apply_cursor(query, sort_by, order, cursor, search)
+            query = self._apply_sorting(query, sort_by, order, search)
+
+            if rank is None or fields is not None:
+                return paginate(query, limit, lambda todo: encode_cursor(sort_key, value_of(todo), todo.id))
+
+            page = paginate(query, limit, lambda row: encode_cursor(sort_key, value_of(row), row.TodoDB.id))
+            page["items"] = [row.TodoDB for row in page["items"]]
+            return page
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+    def export_statement(
+        self,
+        due_date: datetime,
+        priority: PriorityEnum,
+        search: str,
+        sort_by: SortByEnum,
+        order: OrderEnum,
+        completed: bool,
+        list_id: int = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        due_before: datetime = None,
+        due_after: datetime = None,
+        overdue: bool = None,
+    ):
+        query = self._apply_filters(
+            select(TodoDB), due_date, priority, search, completed, due_before, due_after, overdue, list_id
+        )
+        return self._apply_sorting(query, sort_by, order, search).execution_options(yield_per=batch_size)
+
+    def export_todos(self, *args, **kwargs):
+        # yield_per streams the rows and hands them out one batch at a time. As a generator,
+        # the query only runs once the response starts streaming.
+        yield from self.db.scalars(self.export_statement(*args, **kwargs)).partitions()
+
+    def _agenda_criteria(self, start: date, end: date, completed: bool = None, list_id: int = None) -> list:
+        criteria = [
+            TodoDB.due_date >= datetime.combine(start, time.min),
+            TodoDB.due_date < datetime.combine(end + timedelta(days=1), time.min),
+        ]
+        if completed is not None:
+            criteria.append(TodoDB.completed == completed)
+        if list_id is not None:
+            criteria.append(TodoDB.list_id == list_id)
+        return criteria
+
+    def agenda_counts(self, start: date, end: date, bucket: BucketEnum, completed: bool = None, list_id: int = None):
+        # Grouped and counted in SQL over a range of (due_date, completed), so without a list
+        # the counts are read from the index alone.
+        key = due_bucket(self.db, bucket).label("start")
+        return (
+            select(key, func.count().label("total"), func.sum(TodoDB.completed.cast(Integer)).label("completed"))
+            .where(*self._agenda_criteria(start, end, completed, list_id))
+            .group_by(key)
+            .order_by(key)
+        )
+
+    def get_agenda(
+        self,
+        start: date,
+        end: date,
+        bucket: BucketEnum,
+        completed: bool = None,
+        list_id: int = None,
+        todos_limit: int = None,
+    ) -> list[dict]:
+        # Only buckets with todos due are returned. With todos_limit, the first todos of each
+        # bucket by due date are read in one windowed query.
         try:
-            query = self.db.query(TodoDB)
-            query = self._apply_filters(query, due_date, priority, search, completed)
-            query = self._apply_sorting(query, sort_by, order)
-            return query.all()
+            statement = self.agenda_counts(start, end, bucket, completed, list_id)
+            buckets = [{**row._asdict(), "todos": []} for row in self.db.execute(statement)]
+            if todos_limit and buckets:
+                by_start = {bucket["start"]: bucket["todos"] for bucket in buckets}
+                key = due_bucket(self.db, bucket).label("start")
+                rank = func.row_number().over(partition_by=key, order_by=(TodoDB.due_date, TodoDB.id))
+                criteria = self._agenda_criteria(start, end, completed, list_id)
+                ranked = select(TodoDB, key, rank.label("rank")).where(*criteria).subquery()
+                todo = aliased(TodoDB, ranked)
+                query = self.db.query(todo, ranked.c.start).filter(ranked.c.rank <= todos_limit)
+                for todo_db, start in query.order_by(ranked.c.start, ranked.c.rank):
+                    by_start[start].append(todo_db)
+            return buckets
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+    def get_stats(self, list_id: int = None) -> dict:
+        try:
+            return todo_stats(self.db, list_id)
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
 
@@ -78,12 +242,27 @@ class TodoManager:
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
 
+    def get_todo_version(self, todo_id: int):
+        try:
+            return self.db.query(TodoDB.version, TodoDB.updated_at).filter(TodoDB.id == todo_id).one()
+        except NoResultFound as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Todo with id no. {todo_id} not found.") from e
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+    def _precondition_failed(self, todo_id: int) -> HTTPException:
+        self.db.rollback()
+        return HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=f"Todo with id no. {todo_id} has been modified.")
+
     def create_todo(self, todo_data: dict)  -> TodoDB:
         try:
             new_todo = TodoDB(**todo_data.model_dump())
             self.db.add(new_todo)
+            self.db.flush()
+            record_changes(self.db, ChangeEntityEnum.TODO, ChangeOpEnum.CREATED, [(new_todo.id, new_todo.list_id)])
             self.db.commit()
             self.db.refresh(new_todo)
+            response_cache.todo_changed(new_todo.id, new_todo.list_id)
 
             return new_todo
         except IntegrityError:
@@ -93,29 +272,62 @@ class TodoManager:
             self.db.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
 
-    def update_todo(self, todo_id: int, todo_data: dict)  -> TodoDB:
+    def _update_todo(self, todo_id: int, values: dict, versions: list[int] | None = None) -> TodoDB:
+        # A single UPDATE ... RETURNING writes the todo and reads it back, and the foreign key
+        # checks the list. When list_id is written, as on every PUT, the previous list is read
+        # first to invalidate its cached pages, so those updates take two statements: SQLite's
+        # RETURNING only sees the new row, and so does a subquery inside it.
         try:
-            list_db = self.db.query(ListDB).filter(ListDB.id == todo_data.list_id).one_or_none()
-
-            if list_db is None:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"List with id no. {todo_data.list_id} not found.")
-
-            todo_db = self.db.query(TodoDB).filter(TodoDB.id == todo_id)
-            todo_to_update = todo_db.one() 
-            todo_db.update(todo_data.model_dump())
+            previous_list_id = None
+            if "list_id" in values:
+                previous_list_id = self.db.scalar(select(TodoDB.list_id).where(TodoDB.id == todo_id))
+            statement = update(TodoDB).where(TodoDB.id == todo_id).values(values).returning(TodoDB)
+            if versions is not None:
+                statement = statement.where(TodoDB.version.in_(versions))
+            todo_db = self.db.scalars(
+                statement, execution_options={"synchronize_session": False, "populate_existing": True}
+            ).one_or_none()
+            if todo_db is None:
+                if versions is not None and self.db.scalar(select(TodoDB.id).where(TodoDB.id == todo_id)) is not None:
+                    raise self._precondition_failed(todo_id)
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Todo with id no. {todo_id} not found.")
+            record_changes(self.db, ChangeEntityEnum.TODO, ChangeOpEnum.UPDATED, [(todo_id, todo_db.list_id)])
+            # Detached, so the commit does not expire what RETURNING loaded.
+            self.db.expunge(todo_db)
             self.db.commit()
-            self.db.refresh(todo_to_update)
-            return todo_to_update
-        except NoResultFound as e:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Todo with id no. {todo_id} not found.") from e
+            response_cache.todo_changed(todo_id, previous_list_id, todo_db.list_id)
+            return todo_db
+        except IntegrityError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"List with id no. {values['list_id']} not found.") from e
         except SQLAlchemyError as e:
+            self.db.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
 
-    def delete_todo(self, todo_id: int)  -> Response:
+    def update_todo(self, todo_id: int, todo_data: dict, versions: list[int] | None = None)  -> TodoDB:
+        return self._update_todo(todo_id, todo_data.model_dump(), versions)
+
+    def patch_todo(self, todo_id: int, todo_data: dict, versions: list[int] | None = None) -> TodoDB:
+        # Only the fields sent are written; an empty patch changes nothing, not even the version.
+        values = todo_data.model_dump(exclude_unset=True)
+        if not values:
+            todo_db = self.get_todo(todo_id)
+            if versions is not None and todo_db.version not in versions:
+                raise self._precondition_failed(todo_id)
+            return todo_db
+        return self._update_todo(todo_id, values, versions)
+
+    def delete_todo(self, todo_id: int, versions: list[int] | None = None)  -> Response:
         try:
-            todo_db = self.db.query(TodoDB).filter(TodoDB.id == todo_id).one()
-            self.db.delete(todo_db)
+            todo_db = self.db.query(TodoDB).filter(TodoDB.id == todo_id)
+            list_id = todo_db.one().list_id
+            if versions is not None:
+                todo_db = todo_db.filter(TodoDB.version.in_(versions))
+            if todo_db.delete() == 0:
+                raise self._precondition_failed(todo_id)
+            record_changes(self.db, ChangeEntityEnum.TODO, ChangeOpEnum.DELETED, [(todo_id, list_id)])
             self.db.commit()
+            response_cache.todo_changed(todo_id, list_id)
             return Response(status_code=status.HTTP_204_NO_CONTENT)
         except NoResultFound as e:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Todo with id no. {todo_id} not found.") from e
@@ -124,13 +336,174 @@ class TodoManager:
         
 
     def toggle_completed(self, todo_id: int)  -> TodoDB:
+        # Flipped in SQL, so concurrent toggles each apply instead of writing the same value.
+        return self._update_todo(todo_id, {"completed": not_(TodoDB.completed)})
+
+    def _existing_ids(self, column, ids) -> set[int]:
+        ids = {id for id in ids if id is not None}
+        if not ids:
+            return set()
+        return set(self.db.scalars(select(column).where(column.in_(ids))))
+
+    def create_todos(self, todos: dict, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        created, errors = [], []
         try:
-            todo_db = self.db.query(TodoDB).filter(TodoDB.id == todo_id).one()
-            todo_db.completed = not todo_db.completed
+            for chunk in _chunks(list(todos.items()), chunk_size):
+                list_ids = self._existing_ids(ListDB.id, (todo.list_id for _, todo in chunk))
+                rows = []
+                for index, todo in chunk:
+                    if todo.list_id in list_ids:
+                        rows.append(todo.model_dump())
+                    else:
+                        errors.append({"index": index, "detail": f"List with id no. {todo.list_id} not found."})
+                if rows:
+                    # Ids are assigned in insertion order; ordering RETURNING explicitly would force row-at-a-time inserts.
+                    new_todos = sorted(self.db.scalars(insert(TodoDB).returning(TodoDB), rows), key=lambda todo: todo.id)
+                    record_changes(self.db, ChangeEntityEnum.TODO, ChangeOpEnum.CREATED, [(todo.id, todo.list_id) for todo in new_todos])
+                    created.extend(new_todos)
             self.db.commit()
-            self.db.refresh(todo_db)
-            return todo_db
-        except NoResultFound as e:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Todo with id no. {todo_id} not found.") from e
+            response_cache.todos_changed()
+            return {"items": created, "errors": errors}
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+    def update_todos(self, todos: dict, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        updated_ids, errors = [], []
+        try:
+            for chunk in _chunks(list(todos.items()), chunk_size):
+                todo_ids = self._existing_ids(TodoDB.id, (todo.id for _, todo in chunk))
+                list_ids = self._existing_ids(ListDB.id, (todo.list_id for _, todo in chunk))
+                rows = []
+                for index, todo in chunk:
+                    values = todo.model_dump(exclude_unset=True)
+                    if todo.id not in todo_ids:
+                        errors.append({"index": index, "detail": f"Todo with id no. {todo.id} not found."})
+                    elif "list_id" in values and values["list_id"] not in list_ids:
+                        errors.append({"index": index, "detail": f"List with id no. {todo.list_id} not found."})
+                    else:
+                        if len(values) > 1:
+                            rows.append(values)
+                        updated_ids.append(todo.id)
+                if rows:
+                    self.db.execute(update(TodoDB), rows)
+                    changed = select(TodoDB.id, TodoDB.list_id).where(TodoDB.id.in_([row["id"] for row in rows]))
+                    record_changes(self.db, ChangeEntityEnum.TODO, ChangeOpEnum.UPDATED, self.db.execute(changed))
+            self.db.commit()
+            response_cache.todos_changed()
+
+            updated = {}
+            for chunk in _chunks(list(dict.fromkeys(updated_ids)), chunk_size):
+                query = self.db.query(TodoDB).filter(TodoDB.id.in_(chunk)).populate_existing()
+                updated.update((todo.id, todo) for todo in query)
+            return {"items": [updated[id] for id in updated_ids], "errors": errors}
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+    def list_ids(self) -> set[int]:
+        try:
+            return set(self.db.scalars(select(ListDB.id)))
         except SQLAlchemyError as e:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+    def import_todos(self, todos: list[tuple], list_ids: set[int]) -> tuple[int, list]:
+        # One transaction per chunk of (line, TodoCreate); list ids are checked against a preloaded set.
+        rows, errors = [], []
+        for line, todo in todos:
+            if todo.list_id in list_ids:
+                rows.append(todo.model_dump())
+            else:
+                errors.append({"line": line, "detail": f"List with id no. {todo.list_id} not found."})
+        try:
+            if rows:
+                new_todos = self.db.execute(insert(TodoDB).returning(TodoDB.id, TodoDB.list_id), rows)
+                record_changes(self.db, ChangeEntityEnum.TODO, ChangeOpEnum.CREATED, new_todos.all())
+                self.db.commit()
+                response_cache.todos_changed()
+            return len(rows), errors
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+    def delete_todos(self, todo_ids: list[int], chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        deleted_ids = set()
+        try:
+            for chunk in _chunks(list(set(todo_ids)), chunk_size):
+                deleted = self.db.execute(delete(TodoDB).where(TodoDB.id.in_(chunk)).returning(TodoDB.id, TodoDB.list_id)).all()
+                record_changes(self.db, ChangeEntityEnum.TODO, ChangeOpEnum.DELETED, deleted)
+                deleted_ids.update(todo_id for todo_id, _ in deleted)
+            self.db.commit()
+            response_cache.todos_changed()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred.") from e
+
+        errors = [
+            {"index": index, "detail": f"Todo with id no. {todo_id} not found."}
+            for index, todo_id in enumerate(todo_ids)
+            if todo_id not in deleted_ids
+        ]
+        return {"items": [todo_id for todo_id in dict.fromkeys(todo_ids) if todo_id in deleted_ids], "errors": errors}
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class AsyncTodoManager:
+    # Runs the TodoManager logic on the async session's greenlet, so the driver awaits I/O on the event loop.
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_todos(self, *args, **kwargs) -> dict:
+        return await self.db.run_sync(lambda session: TodoManager(session).get_todos(*args, **kwargs))
+
+    async def export_todos(self, *args, **kwargs):
+        statement = await self.db.run_sync(lambda session: TodoManager(session).export_statement(*args, **kwargs))
+        result = await self.db.stream_scalars(statement)
+        async for partition in result.partitions():
+            yield partition
+
+    async def get_agenda(self, *args, **kwargs) -> list[dict]:
+        return await self.db.run_sync(lambda session: TodoManager(session).get_agenda(*args, **kwargs))
+
+    async def get_stats(self, list_id: int = None) -> dict:
+        return await self.db.run_sync(lambda session: TodoManager(session).get_stats(list_id))
+
+    async def get_todo(self, todo_id: int) -> TodoDB:
+        return await self.db.run_sync(lambda session: TodoManager(session).get_todo(todo_id))
+
+    async def get_todo_version(self, todo_id: int):
+        return await self.db.run_sync(lambda session: TodoManager(session).get_todo_version(todo_id))
+
+    async def create_todo(self, todo_data: dict) -> TodoDB:
+        return await self.db.run_sync(lambda session: TodoManager(session).create_todo(todo_data))
+
+    async def update_todo(self, todo_id: int, todo_data: dict, versions: list[int] | None = None) -> TodoDB:
+        return await self.db.run_sync(lambda session: TodoManager(session).update_todo(todo_id, todo_data, versions))
+
+    async def patch_todo(self, todo_id: int, todo_data: dict, versions: list[int] | None = None) -> TodoDB:
+        return await self.db.run_sync(lambda session: TodoManager(session).patch_todo(todo_id, todo_data, versions))
+
+    async def delete_todo(self, todo_id: int, versions: list[int] | None = None) -> Response:
+        return await self.db.run_sync(lambda session: TodoManager(session).delete_todo(todo_id, versions))
+
+    async def toggle_completed(self, todo_id: int) -> TodoDB:
+        return await self.db.run_sync(lambda session: TodoManager(session).toggle_completed(todo_id))
+
+    async def create_todos(self, todos: dict, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        return await self.db.run_sync(lambda session: TodoManager(session).create_todos(todos, chunk_size))
+
+    async def update_todos(self, todos: dict, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        return await self.db.run_sync(lambda session: TodoManager(session).update_todos(todos, chunk_size))
+
+    async def list_ids(self) -> set[int]:
+        return await self.db.run_sync(lambda session: TodoManager(session).list_ids())
+
+    async def import_todos(self, todos: list[tuple], list_ids: set[int]) -> tuple[int, list]:
+        return await self.db.run_sync(lambda session: TodoManager(session).import_todos(todos, list_ids))
+
+    async def delete_todos(self, todo_ids: list[int], chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        return await self.db.run_sync(lambda session: TodoManager(session).delete_todos(todo_ids, chunk_size))
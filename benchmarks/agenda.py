@@ -0,0 +1,71 @@
+"""Agenda latency for wide date windows over large tables.
+
+The dataset's todos are created over a year and most fall due within it. For each table size
+and window, starting on the day the first todos were created, it times the agenda's per-day
+counts, the same counts without the (due_date, completed) index, the agenda with up to 20
+embedded todos per bucket, and fetching every todo in the window and counting in Python, as
+clients did before:
+
+    python -m benchmarks.agenda --sizes 10000 100000 1000000 --windows 7 90 365
+"""
+import argparse
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import TodoDB
+from app.todo_manager import BucketEnum, TodoManager
+from benchmarks.dataset import ANCHOR, lists_for, temporary_dataset
+
+START = (ANCHOR - timedelta(days=365)).date()
+
+
+def timed(run, repeat: int) -> float:
+    run()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def client_side(session, start: date, end: date) -> Counter:
+    window = (TodoDB.due_date >= start, TodoDB.due_date < end + timedelta(days=1))
+    return Counter(todo.due_date.date() for todo in session.scalars(select(TodoDB).where(*window)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--windows", type=int, nargs="+", default=[7, 90, 365], help="window widths in days")
+    parser.add_argument("--todos-per-list", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'days':>5} {'agenda ms':>10} {'no index ms':>12} {'+todos ms':>10} {'client ms':>10}")
+    for size in args.sizes:
+        with temporary_dataset(lists_for(size, args.todos_per_list), args.todos_per_list, args.seed) as engine:
+            session = sessionmaker(bind=engine)()
+            manager = TodoManager(session)
+
+            for days in args.windows:
+                end = START + timedelta(days=days - 1)
+
+                agenda_ms = timed(lambda: manager.get_agenda(START, end, BucketEnum.DAY), args.repeat)
+                todos_ms = timed(lambda: manager.get_agenda(START, end, BucketEnum.DAY, todos_limit=20), args.repeat)
+                client_ms = timed(lambda: (client_side(session, START, end), session.expunge_all()), args.repeat)
+
+                # Without it, the due_date index finds the rows and each row is read for `completed`.
+                session.execute(text("DROP INDEX ix_todos_due_date_completed"))
+                unindexed_ms = timed(lambda: manager.get_agenda(START, end, BucketEnum.DAY), args.repeat)
+                session.execute(text("CREATE INDEX ix_todos_due_date_completed ON todos (due_date, completed)"))
+
+                print(f"{size:>9} {days:>5} {agenda_ms:>10.2f} {unindexed_ms:>12.2f} {todos_ms:>10.2f} {client_ms:>10.2f}")
+
+            session.close()
+
+if __name__ == "__main__":
+    main()
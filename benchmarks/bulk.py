@@ -0,0 +1,57 @@
+"""Per-row TodoManager mutations vs. the chunked bulk methods.
+
+    python -m benchmarks.bulk --rows 1000 --chunk-size 500
+"""
+import argparse
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas import TodoBulkUpdate, TodoCreate
+from app.todo_manager import TodoManager
+from benchmarks.dataset import temporary_dataset
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    creates = [TodoCreate(title=f"Todo {i}", list_id=1, priority=("low", "medium", "high")[i % 3]) for i in range(args.rows)]
+
+    # Each way starts from one empty list of its own.
+    with temporary_dataset(1, 0) as engine, sessionmaker(bind=engine, autoflush=False)() as session:
+        manager = TodoManager(session)
+        per_row = {
+            "create": timed(lambda: [manager.create_todo(todo) for todo in creates]),
+            "update": timed(lambda: [manager.update_todo(i + 1, todo.model_copy(update={"completed": True})) for i, todo in enumerate(creates)]),
+            "delete": timed(lambda: [manager.delete_todo(i + 1) for i in range(args.rows)]),
+        }
+
+    with temporary_dataset(1, 0) as engine, sessionmaker(bind=engine, autoflush=False)() as session:
+        manager = TodoManager(session)
+        updates = {i: TodoBulkUpdate(id=i + 1, completed=True) for i in range(args.rows)}
+        bulk = {
+            "create": timed(lambda: manager.create_todos(dict(enumerate(creates)), args.chunk_size)),
+            "update": timed(lambda: manager.update_todos(updates, args.chunk_size)),
+            "delete": timed(lambda: manager.delete_todos(list(range(1, args.rows + 1)), args.chunk_size)),
+        }
+
+    print(f"{args.rows} rows, chunk size {args.chunk_size}")
+    print(f"{'operation':>10} {'per-row s':>10} {'bulk s':>10} {'rows/s bulk':>12} {'speedup':>8}")
+    for operation in per_row:
+        print(
+            f"{operation:>10} {per_row[operation]:>10.3f} {bulk[operation]:>10.3f} "
+            f"{args.rows / bulk[operation]:>12.0f} {per_row[operation] / bulk[operation]:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""How many change-feed subscribers one worker can keep up to date.
+
+Starts a single uvicorn worker, opens N Server-Sent Events streams from this process,
+then creates todos at a fixed rate and measures how many changes each subscriber received
+and how long after the write they arrived:
+
+    python -m benchmarks.changes --subscribers 10 100 500 1000 --rate 20 --duration 10
+
+The subscribers share this process's event loop, so at high fan-out the client can become
+the bottleneck before the server; compare the delivery latency with the write rate.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load import free_port, start_server, wait_until_ready
+
+
+async def subscribe(client: httpx.AsyncClient, ready: asyncio.Event, sent: dict, latencies: list, received: list) -> None:
+    async with client.stream("GET", "/changes/stream", params={"since": 0}) as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            change = json.loads(line[6:])
+            if change["entity"] == "list":
+                # The seeded list, replayed from the log: the stream is connected.
+                ready.set()
+            elif change["entity_id"] in sent:
+                latencies.append(time.perf_counter() - sent[change["entity_id"]])
+                received[0] += 1
+
+
+async def run(subscribers: int, args) -> dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(workdir, port, {"CHANGES_POLL_INTERVAL": "1.0"})
+        try:
+            limits = httpx.Limits(max_connections=subscribers + 10)
+            timeout = httpx.Timeout(30, read=None)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout) as client:
+                await wait_until_ready(client)
+                list_id = (await client.post("/lists/", json={"title": "Change feed"})).json()["id"]
+
+                sent, latencies, received = {}, [], [0]
+                ready = [asyncio.Event() for _ in range(subscribers)]
+                tasks = [asyncio.create_task(subscribe(client, event, sent, latencies, received)) for event in ready]
+                await asyncio.wait_for(asyncio.gather(*(event.wait() for event in ready)), 60)
+
+                writes = int(args.rate * args.duration)
+                start = time.perf_counter()
+                for i in range(writes):
+                    await asyncio.sleep(max(0.0, start + i / args.rate - time.perf_counter()))
+                    # Ids are sequential in the fresh database, and the change can arrive before the response.
+                    sent[i + 1] = time.perf_counter()
+                    await client.post("/todos/", json={"title": f"Todo {i}", "list_id": list_id})
+
+                # Give the last writes time to fan out.
+                deadline = time.perf_counter() + args.drain
+                while received[0] < writes * subscribers and time.perf_counter() < deadline:
+                    await asyncio.sleep(0.05)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    return {
+        "subscribers": subscribers,
+        "delivered": received[0] / (writes * subscribers),
+        "events_per_s": received[0] / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--rate", type=float, default=20.0, help="writes per second")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--drain", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'subscribers':>11} {'delivered':>10} {'events/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for subscribers in args.subscribers:
+        result = asyncio.run(run(subscribers, args))
+        print(
+            f"{result['subscribers']:>11} {result['delivered']:>10.1%} {result['events_per_s']:>10.0f} "
+            f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
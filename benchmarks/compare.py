@@ -0,0 +1,103 @@
+"""Flags regressions in benchmarks.suite results against a stored baseline.
+
+A scenario regressed when its latency grew by more than --threshold and by more than
+--min-delta-ms, so that noise on sub-millisecond requests is not reported. It exits with
+status 1 when anything regressed, so it can gate a CI job:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.compare benchmarks/baseline.json results.json --metric p50_ms --threshold 0.5
+
+Absolute latencies only compare on the same machine. So by default each runner's baseline is
+first scaled by the median ratio of current to baseline latency over all its scenarios: on a
+machine that runs the whole suite 40% slower, a route regressed when it got more than 50%
+slower than the others did. A change that slows every route alike does not show that way.
+Pass --absolute to compare the raw numbers of two runs from the same machine, e.g. against a
+baseline refreshed there with `python -m benchmarks.suite --output benchmarks/baseline.json`.
+"""
+import argparse
+import json
+import statistics
+import sys
+
+from benchmarks.suite import RESULTS_VERSION
+
+METRICS = ("mean_ms", "p50_ms", "p95_ms", "max_ms")
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        report = json.load(file)
+    if report.get("version") != RESULTS_VERSION:
+        sys.exit(f"{path}: results version {report.get('version')} is not {RESULTS_VERSION}.")
+    return report
+
+
+def scales(baseline: dict, current: dict, metric: str) -> dict[str, float]:
+    # How much slower (above 1) or faster each runner is now across the scenarios in both runs.
+    factors = {}
+    for runner, results in current["results"].items():
+        before = baseline["results"].get(runner, {})
+        ratios = [result[metric] / before[name][metric] for name, result in results.items() if before.get(name, {}).get(metric)]
+        factors[runner] = statistics.median(ratios) if ratios else 1.0
+    return factors
+
+
+def compare(
+    baseline: dict, current: dict, metric: str, threshold: float, min_delta_ms: float, scale: dict[str, float] | None = None
+) -> list[dict]:
+    rows = []
+    for runner, results in current["results"].items():
+        factor = (scale or {}).get(runner, 1.0)
+        for name, result in results.items():
+            before = baseline["results"].get(runner, {}).get(name)
+            if before is None:
+                rows.append({"runner": runner, "scenario": name, "before": None, "after": result[metric], "status": "new"})
+                continue
+            expected, after = before[metric] * factor, result[metric]
+            change = (after - expected) / expected if expected else 0.0
+            status = "ok"
+            if change > threshold and after - expected > min_delta_ms:
+                status = "REGRESSION"
+            elif change < -threshold and expected - after > min_delta_ms:
+                status = "improved"
+            rows.append({"runner": runner, "scenario": name, "before": expected, "after": after, "change": change, "status": status})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", choices=METRICS, default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=0.5, help="relative increase that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="smaller absolute increases are ignored")
+    parser.add_argument("--absolute", action="store_true", help="do not scale the baseline; for runs on the same machine")
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    for key in sorted(set(baseline["config"]) | set(current["config"])):
+        if baseline["config"].get(key) != current["config"].get(key):
+            print(f"warning: {key} differs: {baseline['config'].get(key)} in the baseline, {current['config'].get(key)} now")
+    if baseline["machine"] != current["machine"]:
+        print("warning: the results come from different machines")
+
+    scale = None
+    if not args.absolute:
+        scale = scales(baseline, current, args.metric)
+        for runner, factor in scale.items():
+            print(f"{runner}: the baseline is scaled by {factor:.2f}, the median change of its scenarios")
+    rows = compare(baseline, current, args.metric, args.threshold, args.min_delta_ms, scale)
+    width = max((len(row["scenario"]) for row in rows), default=8)
+    print(f"{'runner':<10} {'scenario':<{width}} {'before':>8} {'after':>8} {'change':>8}  status")
+    for row in rows:
+        before = f"{row['before']:>8.2f}" if row["before"] is not None else f"{'-':>8}"
+        change = f"{row['change']:>+8.1%}" if "change" in row else f"{'-':>8}"
+        print(f"{row['runner']:<10} {row['scenario']:<{width}} {before} {row['after']:>8.2f} {change}  {row['status']}")
+
+    regressions = [row for row in rows if row["status"] == "REGRESSION"]
+    print(f"\n{len(regressions)} of {len(rows)} scenarios regressed on {args.metric}.")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
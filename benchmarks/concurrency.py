@@ -0,0 +1,73 @@
+"""Mixed reader/writer throughput with the default SQLite engine vs. the tuned profile.
+
+    python -m benchmarks.concurrency --readers 8 --writers 2 --duration 5
+"""
+import argparse
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_db_engine
+from app.schemas import TodoCreate
+from app.todo_manager import OrderEnum, SortByEnum, TodoManager
+from benchmarks.dataset import temporary_dataset
+
+
+def run(engine, readers: int, writers: int, duration: float) -> dict:
+    Session = sessionmaker(bind=engine, autoflush=False)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def loop(operation, counter):
+        while time.perf_counter() < deadline:
+            with Session() as session:
+                try:
+                    operation(TodoManager(session))
+                    key = counter
+                except HTTPException:
+                    key = "errors"
+            with lock:
+                counts[key] += 1
+
+    def read(manager):
+        manager.get_todos(None, None, None, SortByEnum.CREATED_AT, OrderEnum.DESC, None)
+
+    def write(manager):
+        manager.create_todo(TodoCreate(title="Concurrent", list_id=1))
+
+    threads = [threading.Thread(target=loop, args=(read, "reads")) for _ in range(readers)]
+    threads += [threading.Thread(target=loop, args=(write, "writes")) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {key: value / duration for key, value in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--todos-per-list", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'reads/s':>9} {'writes/s':>9} {'errors/s':>9}")
+    profiles = {
+        "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "tuned": create_db_engine,
+    }
+    for name, factory in profiles.items():
+        with temporary_dataset(args.lists, args.todos_per_list, args.seed, engine_factory=factory) as engine:
+            result = run(engine, args.readers, args.writers, args.duration)
+            print(f"{name:>8} {result['reads']:>9.1f} {result['writes']:>9.1f} {result['errors']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Deterministic synthetic data for the benchmarks: N lists of M todos each.
+
+The same arguments always produce the same rows, so results from different runs and machines
+compare like for like. Titles and details are drawn from a small vocabulary so that searches
+match, and one todo in a thousand mentions RARE_WORD for selective ones. Priorities and
+completion follow fixed rates, and due dates fall around a fixed date in the past, so which
+todos are overdue does not change from one day to the next. The schema is built by the
+migrations, with the search index and stats triggers:
+
+    python -m benchmarks.dataset --lists 200 --todos-per-list 50 --seed 0 --output bench.db
+
+The other benchmarks build theirs with temporary_dataset, in a directory removed afterwards.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Engine, insert, text
+
+from app.database import create_db_engine
+from app.migrations import ensure_schema
+from app.models import ListDB, TodoDB
+
+PRIORITY_WEIGHTS = {"low": 0.3, "medium": 0.5, "high": 0.2}
+COMPLETED_RATE = 0.4
+DUE_DATE_RATE = 0.6
+# Todos are created over the year before ANCHOR and fall due up to 60 days after creation.
+ANCHOR = datetime(2025, 1, 1, tzinfo=timezone.utc)
+VERBS = ["call", "email", "review", "fix", "plan", "book", "buy", "write", "clean", "update", "pay", "renew"]
+NOUNS = [
+    "plumber", "report", "invoice", "kitchen", "meeting", "tickets", "groceries", "budget",
+    "garden", "insurance", "dentist", "presentation", "car", "passport", "newsletter", "backup",
+]
+RARE_WORD = "lighthouse"
+RARE_EVERY = 1000
+BATCH_SIZE = 10_000
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return " ".join([rng.choice(VERBS)] + [rng.choice(NOUNS) for _ in range(words - 1)])
+
+
+def lists_for(todos: int, todos_per_list: int) -> int:
+    # The number of lists that hold about this many todos in all.
+    return max(1, todos // todos_per_list)
+
+
+def list_rows(lists: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(f"lists:{seed}")
+    return [{"id": i, "title": f"{rng.choice(NOUNS).title()} {i}", "description": _phrase(rng, 4)} for i in range(1, lists + 1)]
+
+
+def todo_rows(lists: int, todos_per_list: int, seed: int = 0):
+    # Yields the todos in creation order, interleaved across the lists.
+    rng = random.Random(f"todos:{seed}")
+    priorities, weights = list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values())
+    total = lists * todos_per_list
+    for i in range(total):
+        created_at = ANCHOR - timedelta(days=365) + timedelta(seconds=int(i * 365 * 86400 / total))
+        due_date = created_at + timedelta(days=rng.randint(0, 60)) if rng.random() < DUE_DATE_RATE else None
+        title = _phrase(rng, rng.randint(2, 4)).capitalize()
+        details = _phrase(rng, rng.randint(3, 8)) if rng.random() < 0.7 else None
+        if i % RARE_EVERY == RARE_EVERY - 1:
+            details = f"{details or ''} {RARE_WORD}".lstrip()
+        yield {
+            "id": i + 1,
+            "list_id": 1 + i % lists,
+            "title": title,
+            "details": details,
+            "completed": rng.random() < COMPLETED_RATE,
+            "priority": rng.choices(priorities, weights)[0],
+            "due_date": due_date,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def populate(engine: Engine, lists: int, todos_per_list: int, seed: int = 0) -> None:
+    with engine.begin() as connection:
+        connection.execute(insert(ListDB), list_rows(lists, seed))
+        batch = []
+        for row in todo_rows(lists, todos_per_list, seed):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                connection.execute(insert(TodoDB), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(TodoDB), batch)
+    with engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def create_dataset(url: str, lists: int, todos_per_list: int, seed: int = 0, engine_factory=create_db_engine) -> Engine:
+    # Expects a new, empty database.
+    engine = engine_factory(url)
+    ensure_schema(engine, auto_migrate=True)
+    populate(engine, lists, todos_per_list, seed)
+    return engine
+
+
+@contextmanager
+def temporary_dataset(lists: int, todos_per_list: int, seed: int = 0, engine_factory=create_db_engine):
+    # A dataset in a SQLite file of its own, for a benchmark that changes or measures one database.
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_dataset(f"sqlite:///{os.path.join(directory, 'bench.db')}", lists, todos_per_list, seed, engine_factory)
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lists", type=int, default=200)
+    parser.add_argument("--todos-per-list", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench.db", help="SQLite file to create")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    create_dataset(f"sqlite:///{args.output}", args.lists, args.todos_per_list, args.seed).dispose()
+    print(f"{args.lists * args.todos_per_list} todos in {args.lists} lists written to {args.output} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Deleting a large list, while another connection keeps writing.
+
+The dataset holds two lists of the given size, and the first one is deleted. For each size it
+compares three ways of deleting a list. "orm" loads the todos into the session and deletes
+them one by one inside the request, as DELETE /lists/{id} did before. "cascade" deletes only
+the list row through the ORM; with passive_deletes, the todos are left to the foreign key's
+ON DELETE CASCADE and are never loaded. "job" is what the API does: the request only queues a
+job, and the worker deletes the todos in set-based chunks. A writer thread inserts a todo into
+the other list every millisecond meanwhile and records how long each insert waited for the
+write lock:
+
+    python -m benchmarks.delete_list --sizes 1000 10000 100000 --chunk-size 1000
+"""
+import argparse
+import threading
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.changes import ChangeEntityEnum, ChangeOpEnum, record_changes
+from app.jobs import JOB_HANDLERS, JobKindEnum, enqueue
+from app.models import ListDB, TodoDB
+from benchmarks.dataset import temporary_dataset
+
+
+def orm_delete(session) -> None:
+    list_db = session.get(ListDB, 1)
+    record_changes(session, ChangeEntityEnum.TODO, ChangeOpEnum.DELETED, [(todo.id, 1) for todo in list_db.todos])
+    session.delete(list_db)
+    session.commit()
+
+
+def cascade_delete(session) -> None:
+    session.delete(session.get(ListDB, 1))
+    session.commit()
+
+
+def job_delete(session, chunk_size: int) -> float:
+    # Returns the time the request takes; the job runs after it.
+    start = time.perf_counter()
+    enqueue(session, JobKindEnum.DELETE_LIST, {"list_id": 1})
+    session.commit()
+    request = time.perf_counter() - start
+    JOB_HANDLERS[JobKindEnum.DELETE_LIST.value](session, 1, chunk_size)
+    return request
+
+
+class Writer(threading.Thread):
+    def __init__(self, Session):
+        super().__init__(daemon=True)
+        self.Session = Session
+        self.waits = []
+        self.stopping = threading.Event()
+
+    def run(self) -> None:
+        with self.Session() as session:
+            while not self.stopping.is_set():
+                start = time.perf_counter()
+                session.execute(insert(TodoDB), [{"title": "Concurrent", "list_id": 2}])
+                session.commit()
+                self.waits.append(time.perf_counter() - start)
+                time.sleep(0.001)
+
+
+def measure(size: int, delete, seed: int) -> tuple[float, float, float]:
+    with temporary_dataset(2, size, seed) as engine:
+        Session = sessionmaker(bind=engine)
+        writer = Writer(Session)
+        writer.start()
+        time.sleep(0.05)
+        with Session() as session:
+            start = time.perf_counter()
+            request = delete(session)
+            total = time.perf_counter() - start
+        writer.stopping.set()
+        writer.join()
+    return (request if request is not None else total) * 1000, total * 1000, max(writer.waits) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'todos':>8} {'mode':>7} {'request ms':>11} {'total ms':>10} {'max writer wait ms':>19}")
+    for size in args.sizes:
+        modes = (("orm", orm_delete), ("cascade", cascade_delete), ("job", lambda session: job_delete(session, args.chunk_size)))
+        for mode, delete in modes:
+            request_ms, total_ms, wait_ms = measure(size, delete, args.seed)
+            print(f"{size:>8} {mode:>7} {request_ms:>11.1f} {total_ms:>10.1f} {wait_ms:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Database queries under thundering-herd traffic: waves of identical concurrent reads of one
+list and one page of todos, with the response cache off so every request reaches the database.
+
+Each mode runs in its own uvicorn process against a fresh SQLite file, and the queries are
+read from the server's /metrics:
+
+    python -m benchmarks.herd --concurrency 200 --waves 10
+
+- uncoalesced: every request runs its own queries (COALESCE_READS=0).
+- coalesced: concurrent identical reads share one query (the default).
+- rate limited: coalesced, with the token bucket limiter at its defaults; one client sends
+  every request, so most of each wave is turned away with 429.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load import free_port, seed, start_server, wait_until_ready
+
+MODES = {
+    "uncoalesced": {"COALESCE_READS": "0"},
+    "coalesced": {"COALESCE_READS": "1"},
+    "rate limited": {"COALESCE_READS": "1", "RATE_LIMIT_ENABLED": "1"},
+}
+ROUTES = {"/lists/{id}": "/lists/{list_id}?include=todos&todos_limit=100", "/todos/": "/todos/?limit=100&sort_by=priority"}
+
+
+def queries(metrics: str, route: str) -> float:
+    prefix = f'todo_api_db_queries_total{{method="GET",route="{route}"}} '
+    return next((float(line[len(prefix):]) for line in metrics.splitlines() if line.startswith(prefix)), 0.0)
+
+
+async def run_mode(env: dict, args) -> dict:
+    port = free_port()
+    env = {"METRICS_ENABLED": "1", "CACHE_ENABLED": "0", **env}
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(workdir, port, env)
+        try:
+            # Connections left idle between waves are not reused: uvicorn may be closing them.
+            limits = httpx.Limits(max_connections=args.concurrency, keepalive_expiry=1)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                await wait_until_ready(client)
+                list_id = await seed(client, args.todos)
+                before = (await client.get("/metrics")).text
+
+                results = {}
+                for route, path in ROUTES.items():
+                    url = path.format(list_id=list_id)
+                    statuses = []
+                    start = time.perf_counter()
+                    for _ in range(args.waves):
+                        responses = await asyncio.gather(*(client.get(url) for _ in range(args.concurrency)))
+                        statuses += [response.status_code for response in responses]
+                    results[route] = {
+                        "ok": statuses.count(200),
+                        "limited": statuses.count(429),
+                        "seconds": time.perf_counter() - start,
+                    }
+
+                after = (await client.get("/metrics")).text
+                for route, result in results.items():
+                    result["queries"] = queries(after, route) - queries(before, route)
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200, help="identical requests per wave")
+    parser.add_argument("--waves", type=int, default=10)
+    parser.add_argument("--todos", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'mode':>13} {'route':>12} {'200':>6} {'429':>6} {'queries':>8} {'per 200':>8} {'seconds':>8}")
+    for name, env in MODES.items():
+        for route, result in asyncio.run(run_mode(env, args)).items():
+            per_ok = result["queries"] / result["ok"] if result["ok"] else 0
+            print(
+                f"{name:>13} {route:>12} {result['ok']:>6} {result['limited']:>6} {result['queries']:>8.0f}"
+                f" {per_ok:>8.2f} {result['seconds']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
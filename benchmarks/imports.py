@@ -0,0 +1,96 @@
+"""Throughput of the streaming import for NDJSON and CSV uploads.
+
+Generates the upload on the fly and streams it in 64 KB chunks to an in-process app:
+
+    python -m benchmarks.imports --rows 200000 --chunk-size 500
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import resource
+import time
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import response_cache
+from app.database import get_db
+from app.main import create_app
+from benchmarks.dataset import temporary_dataset
+
+UPLOAD_CHUNK = 64 * 1024
+
+
+def todo(i: int) -> dict:
+    return {"title": f"Todo {i}", "details": "Imported", "list_id": i % 10 + 1, "priority": ("low", "medium", "high")[i % 3]}
+
+
+def ndjson_lines(rows: int):
+    for i in range(rows):
+        yield json.dumps(todo(i)) + "\n"
+
+
+def csv_lines(rows: int):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, list(todo(0)))
+    writer.writeheader()
+    for i in range(rows):
+        writer.writerow(todo(i))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def upload(lines):
+    pending = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= UPLOAD_CHUNK:
+            yield "".join(pending).encode()
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending).encode()
+
+
+async def run(args) -> None:
+    response_cache.enabled = False
+    print(f"{args.rows} rows, chunk size {args.chunk_size}")
+    print(f"{'format':>8} {'seconds':>8} {'rows/s':>9} {'created':>9}")
+    for format, lines in (("ndjson", ndjson_lines), ("csv", csv_lines)):
+        # Ten empty lists for the imported todos.
+        with temporary_dataset(10, 0) as engine:
+            Session = sessionmaker(bind=engine, autoflush=False)
+
+            def override_get_db():
+                with Session() as db:
+                    yield db
+
+            app = create_app(async_db=False, metrics_enabled=False)
+            app.dependency_overrides[get_db] = override_get_db
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None) as client:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/todos/import",
+                    content=upload(lines(args.rows)),
+                    params={"format": format, "chunk_size": args.chunk_size},
+                )
+                elapsed = time.perf_counter() - start
+            created = response.json()["created"]
+            print(f"{format:>8} {elapsed:>8.2f} {args.rows / elapsed:>9.0f} {created:>9}")
+
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""GET /lists/{id}/todos as the table grows across many lists.
+
+Each list holds the same number of todos while the number of lists grows. For one list, it
+times a page of open todos sorted by priority with the list_id-leading indexes, the same
+page with only the single-column indexes, and loading `ListDB.todos`, as clients did before:
+
+    python -m benchmarks.list_todos --sizes 10000 100000 1000000 --per-list 1000
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import ListDB
+from app.todo_manager import OrderEnum, SortByEnum, TodoManager
+from benchmarks.dataset import lists_for, temporary_dataset
+
+LIST_INDEXES = {
+    "ix_todos_list_id_created_at": "list_id, created_at",
+    "ix_todos_list_id_due_date": "list_id, due_date",
+    "ix_todos_list_id_priority_rank": "list_id, priority_rank",
+    "ix_todos_list_id_completed_created_at": "list_id, completed, created_at",
+    "ix_todos_list_id_completed_due_date": "list_id, completed, due_date",
+    "ix_todos_list_id_completed_priority_rank": "list_id, completed, priority_rank",
+}
+
+
+def timed(run, repeat: int) -> float:
+    run()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--per-list", type=int, default=1000, help="todos in each list")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'lists':>7} {'page ms':>8} {'no list index ms':>17} {'ListDB.todos ms':>16}")
+    for size in args.sizes:
+        lists = lists_for(size, args.per_list)
+        with temporary_dataset(lists, args.per_list, args.seed) as engine:
+            session = sessionmaker(bind=engine)()
+            manager = TodoManager(session)
+            list_id = lists // 2 or 1
+
+            def page():
+                manager.get_todos(None, None, None, SortByEnum.PRIORITY, OrderEnum.DESC, False, limit=args.limit, list_id=list_id)
+                session.expunge_all()
+
+            def relationship():
+                session.get(ListDB, list_id).todos
+                session.expunge_all()
+
+            page_ms = timed(page, args.repeat)
+            relationship_ms = timed(relationship, args.repeat)
+
+            for name in LIST_INDEXES:
+                session.execute(text(f"DROP INDEX {name}"))
+            session.execute(text("ANALYZE"))
+            unindexed_ms = timed(page, args.repeat)
+            for name, columns in LIST_INDEXES.items():
+                session.execute(text(f"CREATE INDEX {name} ON todos ({columns})"))
+
+            print(f"{size:>9} {lists:>7} {page_ms:>8.2f} {unindexed_ms:>17.2f} {relationship_ms:>16.2f}")
+
+            session.close()
+
+if __name__ == "__main__":
+    main()
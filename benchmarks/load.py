@@ -0,0 +1,118 @@
+"""Requests/sec and latency of the sync and async database paths under concurrent load.
+
+Each mode runs in its own uvicorn process against a fresh SQLite file:
+
+    python -m benchmarks.load --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir: str, port: int, env: dict, workers: int = 1) -> subprocess.Popen:
+    # DATABASE_URL from the environment (e.g. Postgres) wins over the fresh SQLite file.
+    env = {"DATABASE_URL": f"sqlite:///{workdir}/todo_list.db", **os.environ, "PYTHONPATH": str(ROOT), **env}
+    # The app does not create tables on import; migrate first, as a deployment would.
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, env=env, check=True, capture_output=True)
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--workers", str(workers),
+    ]
+    return subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+
+
+async def wait_until_ready(client: httpx.AsyncClient) -> None:
+    for _ in range(100):
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def seed(client: httpx.AsyncClient, todos: int) -> int:
+    list_id = (await client.post("/lists/", json={"title": "Load test"})).json()["id"]
+    for i in range(todos):
+        await client.post("/todos/", json={"title": f"Todo {i}", "list_id": list_id, "priority": ("low", "medium", "high")[i % 3]})
+    return list_id
+
+
+async def hammer(client: httpx.AsyncClient, paths: list[str], concurrency: int, duration: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int) -> None:
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            i += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies
+
+
+async def run_mode(name: str, env: dict, args) -> dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(workdir, port, env)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+                await wait_until_ready(client)
+                list_id = await seed(client, args.todos)
+                paths = [f"/lists/{list_id}", "/todos/?limit=50", "/todos/?sort_by=priority&limit=20", "/todos/1"]
+                latencies = await hammer(client, paths, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "rps": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--todos", type=int, default=200)
+    args = parser.parse_args()
+
+    modes = {
+        "sync": {"DATABASE_ASYNC": "0"},
+        "async": {"DATABASE_ASYNC": "1"},
+    }
+
+    print(f"{'mode':>6} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, env in modes.items():
+        result = asyncio.run(run_mode(name, env, args))
+        print(f"{name:>6} {result['requests']:>9} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
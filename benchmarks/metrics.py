@@ -0,0 +1,74 @@
+"""Per-request overhead of the metrics middleware and query instrumentation.
+
+Runs the same requests in-process against an app with metrics disabled and one with
+metrics enabled, alternating rounds so that both see the same machine state:
+
+    python -m benchmarks.metrics --requests 2000 --rounds 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import response_cache
+from app.database import get_db
+from app.main import create_app
+from app.metrics import instrument, uninstrument
+from benchmarks.dataset import temporary_dataset
+
+
+def client_for(engine, metrics_enabled: bool) -> httpx.AsyncClient:
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        with Session() as db:
+            yield db
+
+    app = create_app(async_db=False, metrics_enabled=metrics_enabled)
+    app.dependency_overrides[get_db] = override_get_db
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+
+
+async def per_request(client: httpx.AsyncClient, urls: list[str], requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        (await client.get(urls[i % len(urls)])).raise_for_status()
+    return (time.perf_counter() - start) / requests
+
+
+async def run(args) -> None:
+    # Measure the database and serialization work on every request rather than cache hits.
+    response_cache.enabled = False
+    scenarios = {
+        "GET /todos/": ["/todos/?limit=50"],
+        "GET /todos/{id}": [f"/todos/{i}" for i in range(1, args.todos + 1)],
+    }
+
+    with temporary_dataset(1, args.todos, args.seed) as engine:
+        clients = {False: client_for(engine, False), True: client_for(engine, True)}
+
+        print(f"{'scenario':>16} {'off us':>8} {'on us':>8} {'overhead':>9}")
+        for name, urls in scenarios.items():
+            timings = {False: [], True: []}
+            for _ in range(args.rounds):
+                for enabled, client in clients.items():
+                    (instrument if enabled else uninstrument)()
+                    timings[enabled].append(await per_request(client, urls, args.requests))
+            off, on = statistics.median(timings[False]), statistics.median(timings[True])
+            print(f"{name:>16} {off * 1e6:>8.0f} {on * 1e6:>8.0f} {(on - off) / off:>8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--todos", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
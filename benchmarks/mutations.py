@@ -0,0 +1,137 @@
+"""Toggling and updating a todo with one UPDATE ... RETURNING, against the statements they ran before.
+
+"select" reads the todo (and for an update, its list) into the session, changes it, commits
+and refreshes it, as TodoManager did before. "returning" is TodoManager now. Each operation
+runs in its own session, as a request does; the statements are counted with an event hook.
+Then several threads toggle the same todo at once, round after round. It counts the toggles
+that failed, and the rounds whose final value shows a toggle was lost (applied on top of a
+stale read):
+
+    python -m benchmarks.mutations --repeat 2000 --threads 8 --toggles 21 --rounds 50
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from fastapi import HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from app.changes import ChangeEntityEnum, ChangeOpEnum, record_changes
+from app.database import create_db_engine
+from app.models import ListDB, TodoDB
+from app.schemas import TodoCreate, TodoUpdate
+from app.todo_manager import TodoManager
+from benchmarks.dataset import temporary_dataset
+
+# Two lists of 500 todos each; PUT moves todos to the second one.
+LISTS = 2
+TODOS = 1000
+
+
+def select_toggle(session, todo_id: int) -> TodoDB:
+    todo = session.query(TodoDB).filter(TodoDB.id == todo_id).one()
+    todo.completed = not todo.completed
+    record_changes(session, ChangeEntityEnum.TODO, ChangeOpEnum.UPDATED, [(todo_id, todo.list_id)])
+    session.commit()
+    session.refresh(todo)
+    return todo
+
+
+def select_update(session, todo_id: int, data: TodoCreate) -> TodoDB:
+    session.query(ListDB).filter(ListDB.id == data.list_id).one()
+    query = session.query(TodoDB).filter(TodoDB.id == todo_id)
+    todo = query.one()
+    query.update(data.model_dump())
+    record_changes(session, ChangeEntityEnum.TODO, ChangeOpEnum.UPDATED, [(todo_id, data.list_id)])
+    session.commit()
+    session.refresh(todo)
+    return todo
+
+
+OPERATIONS = {
+    "select": {
+        "toggle": select_toggle,
+        "put": lambda session, todo_id: select_update(session, todo_id, TodoCreate(title="Put", list_id=2)),
+    },
+    "returning": {
+        "toggle": lambda session, todo_id: TodoManager(session).toggle_completed(todo_id),
+        "put": lambda session, todo_id: TodoManager(session).update_todo(todo_id, TodoCreate(title="Put", list_id=2)),
+        "patch": lambda session, todo_id: TodoManager(session).patch_todo(todo_id, TodoUpdate(title="Patch")),
+    },
+}
+
+
+def latency(Session, operation, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        with Session() as session:
+            operation(session, 1 + i % TODOS)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def race(Session, toggle, threads: int, toggles: int, rounds: int) -> tuple[int, int]:
+    # Returns the toggles that failed, and the rounds that ended with the wrong value. Versions
+    # are incremented in SQL, so a toggle applied on a stale read only shows in the value.
+    failed = wrong = 0
+
+    def run(_) -> bool:
+        with Session() as session:
+            try:
+                toggle(session, 1)
+                return True
+            except (SQLAlchemyError, HTTPException):
+                return False
+
+    for _ in range(rounds):
+        with Session() as session:
+            before = session.scalar(select(TodoDB.completed).where(TodoDB.id == 1))
+        with ThreadPoolExecutor(threads) as executor:
+            applied = sum(executor.map(run, range(toggles)))
+        with Session() as session:
+            after = session.scalar(select(TodoDB.completed).where(TodoDB.id == 1))
+        failed += toggles - applied
+        wrong += after != (before ^ (applied % 2 == 1))
+    return failed, wrong
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--toggles", type=int, default=21, help="concurrent toggles per round")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'mode':>9} {'operation':>9} {'statements':>10} {'ms':>6}")
+    engine_factory = partial(create_db_engine, pragmas={"busy_timeout": 1000})
+    with temporary_dataset(LISTS, TODOS // LISTS, args.seed, engine_factory=engine_factory) as engine:
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        executed = []
+
+        def record(conn, cursor, statement, *args) -> None:
+            executed.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        for mode, operations in OPERATIONS.items():
+            for name, operation in operations.items():
+                executed.clear()
+                with Session() as session:
+                    operation(session, 1)
+                statements = len(executed)
+                print(f"{mode:>9} {name:>9} {statements:>10} {latency(Session, operation, args.repeat):>6.2f}")
+        event.remove(engine, "before_cursor_execute", record)
+
+        print(f"\n{args.rounds} rounds of {args.toggles} toggles of one todo from {args.threads} threads")
+        print(f"{'mode':>9} {'failed':>7} {'wrong rounds':>13}")
+        for mode, operations in OPERATIONS.items():
+            failed, wrong = race(Session, operations["toggle"], args.threads, args.toggles, args.rounds)
+            print(f"{mode:>9} {failed:>7} {wrong:>13}")
+
+
+if __name__ == "__main__":
+    main()
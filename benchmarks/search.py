@@ -0,0 +1,44 @@
+"""Search latency against table size: FTS5 index vs. the LIKE fallback.
+
+    python -m benchmarks.search --sizes 1000 10000 100000
+"""
+import argparse
+import time
+from unittest import mock
+
+from sqlalchemy.orm import sessionmaker
+
+from app.todo_manager import OrderEnum, SortByEnum, TodoManager
+from benchmarks.dataset import RARE_WORD, lists_for, temporary_dataset
+
+
+def time_search(session, term: str, fts: bool, repeat: int) -> float:
+    manager = TodoManager(session)
+    with mock.patch("app.search.fts_enabled", return_value=fts):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            manager.get_todos(None, None, term, SortByEnum.CREATED_AT, OrderEnum.DESC, None)
+        return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--todos-per-list", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'like ms':>10} {'fts ms':>10}")
+    # RARE_WORD appears in one row per thousand, the selective case an index should win.
+    term = RARE_WORD[:5]
+    for size in args.sizes:
+        with temporary_dataset(lists_for(size, args.todos_per_list), args.todos_per_list, args.seed) as engine:
+            with sessionmaker(bind=engine)() as session:
+                like_ms = time_search(session, term, fts=False, repeat=args.repeat)
+                fts_ms = time_search(session, term, fts=True, repeat=args.repeat)
+            print(f"{size:>10} {like_ms:>10.2f} {fts_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
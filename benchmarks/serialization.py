@@ -0,0 +1,64 @@
+"""Building a GET /todos body from the database: ORM entities validated into Page[Todo]
+against column-only rows encoded with orjson, with every field and with a sparse fieldset.
+
+Each page holds every row of the table, so the per-row costs dominate:
+
+    python -m benchmarks.serialization --sizes 1000 10000 100000
+"""
+import argparse
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.fields import TODO_FIELDS, dump_rows_page
+from app.schemas import Page, Todo
+from app.todo_manager import OrderEnum, SortByEnum, TodoManager
+from benchmarks.dataset import lists_for, temporary_dataset
+
+SPARSE_FIELDS = ("id", "title", "completed")
+
+
+def entities(session, size: int) -> bytes:
+    page = TodoManager(session).get_todos(None, None, None, SortByEnum.CREATED_AT, OrderEnum.DESC, None, limit=size)
+    return Page[Todo].model_validate(page, from_attributes=True).model_dump_json().encode()
+
+
+def rows(session, size: int, fields: tuple[str, ...]) -> bytes:
+    page = TodoManager(session).get_todos(None, None, None, SortByEnum.CREATED_AT, OrderEnum.DESC, None, limit=size, fields=fields)
+    return dump_rows_page(page, fields)
+
+
+def timed(run, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--todos-per-list", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'entities ms':>12} {'rows ms':>10} {'sparse ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        with temporary_dataset(lists_for(size, args.todos_per_list), args.todos_per_list, args.seed) as engine:
+            # A fresh session per run, so entities are not served from the identity map.
+            def run(produce, *fields):
+                def once():
+                    with sessionmaker(bind=engine)() as db:
+                        produce(db, size, *fields)
+                return once
+
+            with sessionmaker(bind=engine)() as session:
+                assert rows(session, size, TODO_FIELDS) == entities(session, size)
+            entities_ms = timed(run(entities), args.repeat)
+            rows_ms = timed(run(rows, TODO_FIELDS), args.repeat)
+            sparse_ms = timed(run(rows, SPARSE_FIELDS), args.repeat)
+            print(f"{size:>10} {entities_ms:>12.1f} {rows_ms:>10.1f} {sparse_ms:>10.1f} {entities_ms / rows_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
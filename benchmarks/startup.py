@@ -0,0 +1,96 @@
+"""Application startup and test-suite time.
+
+Each measurement runs in a fresh interpreter, so nothing is cached between runs:
+
+    python -m benchmarks.startup --repeat 5
+
+- import: `import app.main` in each database mode, against importing every router and Alembic
+  up front, as the app did before routers were loaded lazily.
+- schema: the lifespan's schema check on a database at the Alembic head, against a
+  `create_all` that inspects every table, and a startup that has to migrate a fresh database.
+- suite: `pytest` with each test rolled back (TEST_ISOLATION=transaction) against dropping
+  and creating the tables for every test (TEST_ISOLATION=recreate). Skip it with --no-suite.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.load import ROOT
+
+IMPORTS = {
+    "import (sync)": ("import app.main", {}),
+    "import (async)": ("import app.main", {"DATABASE_ASYNC": "1"}),
+    "import (eager)": (
+        "import app.main, app.routers.async_list, app.routers.async_todo, alembic.command, alembic.script", {}
+    ),
+}
+
+SCHEMA = {
+    "schema at head": "from app.migrations import ensure_schema; ensure_schema(engine)",
+    "create_all at head": "from app.database import Base; import app.models; Base.metadata.create_all(engine)",
+    "migrate fresh database": "from app.migrations import ensure_schema; ensure_schema(fresh, auto_migrate=True)",
+}
+
+
+def timed(code: str, env: dict, setup: str = "") -> float:
+    # Prints the time of `code` alone, after `setup`, measured inside the child interpreter.
+    script = f"{setup}\nimport time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, env={**os.environ, **env}, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.split()[-1])
+
+
+def schema_timings(repeat: int) -> dict:
+    results = {name: [] for name in SCHEMA}
+    for _ in range(repeat):
+        for name, code in SCHEMA.items():
+            with tempfile.TemporaryDirectory() as workdir:
+                url = f"sqlite:///{workdir}/todo_list.db"
+                subprocess.run(
+                    [sys.executable, "-m", "alembic", "-x", f"url={url}", "upgrade", "head"],
+                    cwd=ROOT, check=True, capture_output=True,
+                )
+                setup = (
+                    "from sqlalchemy import create_engine\n"
+                    f"engine = create_engine({url!r})\n"
+                    f"fresh = create_engine('sqlite:///{workdir}/fresh.db')\n"
+                    # The import is measured on its own above.
+                    "import app.main\n"
+                )
+                results[name].append(timed(code, {"DATABASE_URL": url}, setup))
+    return results
+
+
+def suite_time(isolation: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider"],
+        cwd=ROOT, env={**os.environ, "TEST_ISOLATION": isolation}, check=True, capture_output=True,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-suite", action="store_true")
+    args = parser.parse_args()
+
+    results = {name: [timed(code, env) for _ in range(args.repeat)] for name, (code, env) in IMPORTS.items()}
+    results.update(schema_timings(args.repeat))
+    if not args.no_suite:
+        for isolation in ("transaction", "recreate"):
+            results[f"test suite ({isolation})"] = [suite_time(isolation) for _ in range(max(1, args.repeat // 2))]
+
+    print(f"{'':<28} {'median ms':>10} {'min ms':>10}")
+    for name, timings in results.items():
+        print(f"{name:<28} {statistics.median(timings) * 1000:>10.1f} {min(timings) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
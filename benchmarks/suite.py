@@ -0,0 +1,270 @@
+"""Latency of every route in the todo and list routers, on a generated dataset.
+
+Builds a dataset with benchmarks.dataset, then sends each scenario's requests one after the
+other, in-process through ASGITransport and to a uvicorn server, and records the latency of
+each. The response cache is off, so every request reaches the database, and jobs are not run.
+Reads run first, then writes, then deletes, which take their rows from the end of the dataset
+so that the rows read earlier are left alone:
+
+    python -m benchmarks.suite --lists 200 --todos-per-list 50 --requests 50 --output results.json
+    python -m benchmarks.compare benchmarks/baseline.json results.json
+
+A scenario is named after its route, e.g. "GET /todos/{todo_id}", followed by what sets it
+apart from the others on the same route. The results are written as JSON:
+
+    {"version": 1, "created_at": ..., "machine": {...}, "config": {...},
+     "results": {"in-process": {"GET /todos/": {"requests": 50, "mean_ms": ..., "p50_ms": ...,
+                                                "p95_ms": ..., "max_ms": ...}, ...},
+                 "uvicorn": {...}}}
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import response_cache
+from app.database import async_url, create_async_db_engine, create_db_engine, get_async_db, get_db
+from app.main import create_app
+from benchmarks.dataset import NOUNS, create_dataset
+from benchmarks.load import free_port, start_server, wait_until_ready
+
+RESULTS_VERSION = 1
+BULK_SIZE = 50
+RUNNERS = ("in-process", "uvicorn")
+
+
+class Context:
+    # Picks the ids each request works on, the same ones on every run with the same seed.
+    def __init__(self, lists: int, todos_per_list: int, seed: int = 0):
+        self.lists = lists
+        self.todos = lists * todos_per_list
+        self.rng = random.Random(f"suite:{seed}")
+        self._last_list = lists
+        self._last_todo = self.todos
+
+    def list_id(self) -> int:
+        return self.rng.randint(1, max(1, self.lists // 2))
+
+    def todo_id(self) -> int:
+        return self.rng.randint(1, max(1, self.todos // 2))
+
+    def take_list(self) -> int:
+        if self._last_list <= self.lists // 2:
+            raise RuntimeError("The dataset has too few lists for this many requests.")
+        self._last_list -= 1
+        return self._last_list + 1
+
+    def take_todos(self, count: int) -> list[int]:
+        if self._last_todo - count < self.todos // 2:
+            raise RuntimeError("The dataset has too few todos for this many requests.")
+        self._last_todo -= count
+        return list(range(self._last_todo + 1, self._last_todo + count + 1))
+
+    def todo(self) -> dict:
+        return {
+            "title": f"{self.rng.choice(NOUNS)} {self.rng.choice(NOUNS)}",
+            "list_id": self.list_id(),
+            "priority": self.rng.choice(("low", "medium", "high")),
+        }
+
+
+def _ndjson(ctx: Context, rows: int) -> bytes:
+    return "".join(json.dumps(ctx.todo()) + "\n" for _ in range(rows)).encode()
+
+
+# Each scenario returns the arguments of its next request; the method is the first word of its name.
+SCENARIOS = {
+    "GET /todos/": lambda ctx: {"url": "/todos/?limit=50"},
+    "GET /todos/ sort_by=priority completed=false": lambda ctx: {"url": "/todos/?sort_by=priority&completed=false&limit=50"},
+    "GET /todos/ search": lambda ctx: {"url": f"/todos/?search={ctx.rng.choice(NOUNS)}&limit=20"},
+    "GET /todos/ overdue": lambda ctx: {"url": "/todos/?overdue=true&sort_by=due_date&limit=50"},
+    "GET /todos/ fields": lambda ctx: {"url": "/todos/?fields=id,title,completed&limit=50"},
+    "GET /todos/{todo_id}": lambda ctx: {"url": f"/todos/{ctx.todo_id()}"},
+    "GET /todos/export": lambda ctx: {"url": "/todos/export?priority=high&completed=false"},
+    "GET /agenda": lambda ctx: {"url": "/agenda?from=2024-06-01&to=2024-06-30"},
+    "GET /agenda bucket=week include=todos": lambda ctx: {
+        "url": "/agenda?from=2024-01-01&to=2024-12-31&bucket=week&include=todos&todos_limit=5"
+    },
+    "GET /lists/": lambda ctx: {"url": "/lists/?limit=50"},
+    "GET /lists/ include=todos": lambda ctx: {"url": "/lists/?limit=20&include=todos&todos_limit=10"},
+    "GET /lists/{id}": lambda ctx: {"url": f"/lists/{ctx.list_id()}"},
+    "GET /lists/{id} include=todos": lambda ctx: {"url": f"/lists/{ctx.list_id()}?include=todos"},
+    "GET /lists/{id}/todos": lambda ctx: {"url": f"/lists/{ctx.list_id()}/todos?sort_by=due_date&limit=50"},
+    "GET /lists/{id}/stats": lambda ctx: {"url": f"/lists/{ctx.list_id()}/stats"},
+    "GET /lists/{id}/export": lambda ctx: {"url": f"/lists/{ctx.list_id()}/export"},
+    "POST /lists/": lambda ctx: {"url": "/lists/", "json": {"title": ctx.rng.choice(NOUNS), "description": "Benchmark"}},
+    "PUT /lists/{id}": lambda ctx: {"url": f"/lists/{ctx.list_id()}", "json": {"title": ctx.rng.choice(NOUNS)}},
+    "POST /todos/": lambda ctx: {"url": "/todos/", "json": ctx.todo()},
+    "PUT /todos/{todo_id}": lambda ctx: {"url": f"/todos/{ctx.todo_id()}", "json": ctx.todo()},
+    "PATCH /todos/{todo_id}": lambda ctx: {"url": f"/todos/{ctx.todo_id()}", "json": {"priority": "high"}},
+    "PATCH /todos/{todo_id}/complete": lambda ctx: {"url": f"/todos/{ctx.todo_id()}/complete"},
+    "POST /todos/bulk": lambda ctx: {"url": "/todos/bulk", "json": [ctx.todo() for _ in range(BULK_SIZE)]},
+    "PATCH /todos/bulk": lambda ctx: {
+        "url": "/todos/bulk", "json": [{"id": ctx.todo_id(), "completed": True} for _ in range(BULK_SIZE)]
+    },
+    "POST /todos/import": lambda ctx: {
+        "url": "/todos/import", "content": _ndjson(ctx, BULK_SIZE), "headers": {"Content-Type": "application/x-ndjson"}
+    },
+    "DELETE /todos/{todo_id}": lambda ctx: {"url": f"/todos/{ctx.take_todos(1)[0]}"},
+    "DELETE /todos/bulk": lambda ctx: {"url": "/todos/bulk", "json": ctx.take_todos(BULK_SIZE)},
+    "DELETE /lists/{id}": lambda ctx: {"url": f"/lists/{ctx.take_list()}"},
+}
+
+
+def summarize(latencies: list[float]) -> dict:
+    latencies = sorted(latency * 1000 for latency in latencies)
+    return {
+        "requests": len(latencies),
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)],
+        "max_ms": latencies[-1],
+    }
+
+
+async def run_scenarios(client: httpx.AsyncClient, ctx: Context, names: list[str], requests: int, warmup: int) -> dict:
+    results = {}
+    for name in names:
+        method, scenario = name.split()[0], SCENARIOS[name]
+        latencies = []
+        for i in range(warmup + requests):
+            request = scenario(ctx)
+            start = time.perf_counter()
+            response = await client.request(method, **request)
+            elapsed = time.perf_counter() - start
+            if not response.is_success:
+                raise RuntimeError(f"{name}: {request['url']} returned {response.status_code}: {response.text[:200]}")
+            if i >= warmup:
+                latencies.append(elapsed)
+        results[name] = summarize(latencies)
+    return results
+
+
+def in_process_client(url: str, async_db: bool) -> httpx.AsyncClient:
+    # jobs_worker_enabled does not matter here: ASGITransport does not run the lifespan.
+    app = create_app(async_db=async_db, metrics_enabled=False, jobs_worker_enabled=False)
+    if async_db:
+        Session = async_sessionmaker(bind=create_async_db_engine(async_url(url)), autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with Session() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+    else:
+        Session = sessionmaker(bind=create_db_engine(url), autoflush=False)
+
+        def override_get_db():
+            with Session() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+
+
+async def run_in_process(args, names: list[str]) -> dict:
+    response_cache.enabled = False
+    with tempfile.TemporaryDirectory() as workdir:
+        url = f"sqlite:///{os.path.join(workdir, 'todo_list.db')}"
+        create_dataset(url, args.lists, args.todos_per_list, args.seed).dispose()
+        async with in_process_client(url, args.async_db) as client:
+            return await run_scenarios(client, Context(args.lists, args.todos_per_list, args.seed), names, args.requests, args.warmup)
+
+
+async def run_uvicorn(args, names: list[str]) -> dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        url = f"sqlite:///{os.path.join(workdir, 'todo_list.db')}"
+        create_dataset(url, args.lists, args.todos_per_list, args.seed).dispose()
+        env = {
+            "DATABASE_URL": url,
+            "DATABASE_ASYNC": "1" if args.async_db else "0",
+            "CACHE_ENABLED": "0",
+            "METRICS_ENABLED": "0",
+            "JOBS_WORKER_ENABLED": "0",
+        }
+        server = start_server(workdir, port, env)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+                await wait_until_ready(client)
+                ctx = Context(args.lists, args.todos_per_list, args.seed)
+                return await run_scenarios(client, ctx, names, args.requests, args.warmup)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_results(runner: str, results: dict) -> None:
+    width = max(len(name) for name in results)
+    print(f"\n{runner}")
+    print(f"{'scenario':<{width}} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<{width}} {result['mean_ms']:>8.2f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['max_ms']:>8.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lists", type=int, default=200)
+    parser.add_argument("--todos-per-list", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests per scenario first")
+    parser.add_argument("--runners", nargs="+", choices=RUNNERS, default=list(RUNNERS))
+    parser.add_argument("--scenarios", nargs="+", metavar="PREFIX", help="only run scenarios whose names start with one of these")
+    parser.add_argument("--async-db", action="store_true", help="serve the async database path")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    names = [name for name in SCENARIOS if not args.scenarios or name.startswith(tuple(args.scenarios))]
+    if not names:
+        sys.exit("No scenario matches --scenarios.")
+    runners = {"in-process": run_in_process, "uvicorn": run_uvicorn}
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine(),
+        "config": {
+            "lists": args.lists,
+            "todos_per_list": args.todos_per_list,
+            "seed": args.seed,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "async_db": args.async_db,
+        },
+        "results": {},
+    }
+    for runner in args.runners:
+        report["results"][runner] = asyncio.run(runners[runner](args, names))
+        print_results(runner, report["results"][runner])
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,79 @@
+import os
 from datetime import datetime
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.database import Base, get_db
-from app.main import app
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.cache import response_cache
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db, get_db
+from app.jobs import JobWorker
+from app.main import app, create_app
 from app.models import ListDB, TodoDB
 from app.schemas import Todo
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# "transaction" rolls every test back; "recreate" drops and creates the tables for every test.
+TEST_ISOLATION = os.getenv("TEST_ISOLATION", "transaction")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-@pytest.fixture()
-def session():
+# pysqlite does not support SAVEPOINT inside the transactions it begins implicitly. The
+# rollback fixture's connection runs in pysqlite's autocommit mode and begins them here instead.
+@event.listens_for(engine, "begin")
+def emit_begin(connection):
+    if connection.get_execution_options().get("emit_begin"):
+        connection.exec_driver_sql("BEGIN")
+
+
+def recreate_schema():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+
+
+@pytest.fixture(scope="session")
+def schema():
+    recreate_schema()
+
+
+@pytest.fixture()
+def committed():
+    # Requested by tests that need real transactions: their data is read through other connections,
+    # such as the async engine or the change broker's, or they count the statements a request runs.
+    # Their commits are real, so the tables are recreated afterwards.
+    yield
+    recreate_schema()
+
+
+@pytest.fixture()
+def session(request, schema):
+    response_cache.clear()
+    if TEST_ISOLATION == "recreate" or "committed" in request.fixturenames:
+        if TEST_ISOLATION == "recreate":
+            recreate_schema()
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+
+    # Everything the test commits is released into one outer transaction that is rolled back.
+    connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT", emit_begin=True)
+    transaction = connection.begin()
+    db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture()
@@ -40,6 +88,58 @@ def client(session):
     yield TestClient(app)
 
 
+@pytest.fixture()
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # Transaction control from the rollback fixture is not part of what a test measures.
+        if not statement.startswith(("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture()
+def run_jobs(session):
+    # The job thread only runs in the app's lifespan; tests run queued jobs on their own session.
+    return JobWorker(session_factory=lambda: session).run_pending
+
+
+@pytest.fixture()
+def concurrent_client(committed, session):
+    # A session per request, so concurrent requests do not share one.
+    def override_get_db():
+        with TestingSessionLocal() as db:
+            yield db
+
+    concurrent_app = create_app()
+    concurrent_app.dependency_overrides[get_db] = override_get_db
+    return TestClient(concurrent_app)
+
+
+@pytest.fixture()
+def async_client(committed, session):
+    async_engine = create_async_db_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+    TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
+    # The /changes and /jobs routers have no async variants and still use the sync session.
+    def override_get_db():
+        with TestingSessionLocal() as db:
+            yield db
+
+    async_app = create_app(async_db=True)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    async_app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(async_app)
+
+
 @pytest.fixture()
 def list_data(session):
     data = [
@@ -0,0 +1,106 @@
+from app.schemas import List, Todo
+
+
+def test_create_and_read_list(async_client):
+    response = async_client.post("/lists/", json={"title": "Async", "description": "Async Description"})
+    assert response.status_code == 201
+
+    created_list = List(**response.json())
+    response = async_client.get(f"/lists/{created_list.id}")
+    assert response.status_code == 200
+    assert List(**response.json()) == created_list
+
+
+def test_read_lists(async_client, list_data):
+    response = async_client.get("/lists/", params={"limit": 5})
+    assert response.status_code == 200
+
+    page = response.json()
+    assert len(page["items"]) == 5
+    assert page["next_cursor"] is not None
+
+
+def test_read_list_with_todos(async_client, todo_data):
+    response = async_client.get(f"/lists/{todo_data[0].list_id}", params={"include": "todos"})
+    assert response.status_code == 200
+    assert len(response.json()["todos"]) == 3
+
+
+def test_read_list_todos(async_client, todo_data):
+    list_id = todo_data[0].list_id
+    response = async_client.get(f"/lists/{list_id}/todos", params={"completed": True})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [todo_data[0].id]
+
+    assert async_client.get("/lists/999/todos").status_code == 404
+
+
+def test_update_and_delete_list(async_client, list_data, run_jobs):
+    list_id = list_data[0].id
+    response = async_client.put(f"/lists/{list_id}", json={"title": "Updated Title"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Updated Title"
+
+    response = async_client.delete(f"/lists/{list_id}")
+    assert response.status_code == 202
+    assert run_jobs() == 1
+
+    response = async_client.get(f"/lists/{list_id}")
+    assert response.status_code == 404
+
+
+def test_get_todos(async_client, todo_data):
+    response = async_client.get("/todos/", params={"sort_by": "priority", "limit": 4})
+    assert response.status_code == 200
+
+    page = response.json()
+    assert len(page["items"]) == 4
+
+    response = async_client.get("/todos/", params={"sort_by": "priority", "cursor": page["next_cursor"]})
+    assert len(response.json()["items"]) == len(todo_data) - 4
+
+
+def test_get_todos_fields(async_client, todo_data):
+    page = async_client.get("/todos/", params={"sort_by": "priority", "limit": 4, "fields": "id,priority"}).json()
+    assert [set(todo) for todo in page["items"]] == [{"id", "priority"}] * 4
+    assert [todo["priority"] for todo in page["items"]][:3] == ["high"] * 3
+
+    response = async_client.get("/todos/", params={"sort_by": "priority", "cursor": page["next_cursor"], "fields": "id"})
+    assert len(response.json()["items"]) == len(todo_data) - 4
+
+
+def test_agenda(async_client, todo_data):
+    response = async_client.get("/agenda", params={"from": "2024-10-01", "to": "2024-10-31", "bucket": "week", "include": "todos"})
+    assert response.status_code == 200
+    assert [(bucket["start"], bucket["total"], len(bucket["todos"])) for bucket in response.json()["buckets"]] == [("2024-10-21", 3, 3)]
+
+
+def test_get_todos_search(async_client, todo_data):
+    response = async_client.get("/todos/", params={"search": "Two"})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+
+
+def test_todo_lifecycle(async_client, list_data):
+    response = async_client.post("/todos/", json={"title": "Async Todo", "list_id": list_data[0].id})
+    assert response.status_code == 201
+    todo = Todo(**response.json())
+
+    response = async_client.patch(f"/todos/{todo.id}/complete")
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+
+    response = async_client.put(f"/todos/{todo.id}", json={"title": "Renamed", "list_id": list_data[1].id})
+    assert response.status_code == 200
+    assert response.json()["list_id"] == list_data[1].id
+
+    response = async_client.patch(f"/todos/{todo.id}", json={"priority": "high"})
+    assert response.status_code == 200
+    assert (response.json()["title"], response.json()["priority"]) == ("Renamed", "high")
+    assert async_client.patch(f"/todos/{todo.id}", json={"list_id": 999}).status_code == 404
+
+    response = async_client.delete(f"/todos/{todo.id}")
+    assert response.status_code == 204
+
+    response = async_client.get(f"/todos/{todo.id}")
+    assert response.status_code == 404
@@ -1,5 +1,6 @@
 import pytest
 
+from app.routers import list as list_router
 from app.schemas import List
 
 
@@ -29,17 +30,39 @@ def test_read_lists(client, list_data):
     response = client.get("/lists/", params={"limit": 20})
     assert response.status_code == 200
 
-    lists = [List(**list_item) for list_item in response.json()]
+    lists = [List(**list_item) for list_item in response.json()["items"]]
     assert len(lists) == len(list_data)
 
 
-@pytest.mark.parametrize("skip", [1, 2, 3, 4, 5])
-def test_read_lists_skip(client, skip, list_data):
-    response = client.get("/lists/", params={"skip": skip})
-    assert response.status_code == 200
+@pytest.mark.parametrize("sort_by", ["asc", "desc"])
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 5])
+def test_read_lists_cursor(client, sort_by, limit, list_data):
+    seen = []
+    params = {"limit": limit, "sort_by": sort_by}
+
+    while True:
+        response = client.get("/lists/", params=params)
+        assert response.status_code == 200
+
+        page = response.json()
+        assert len(page["items"]) <= limit
+        seen.extend(list_item["id"] for list_item in page["items"])
+
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert sorted(seen) == sorted(list_item.id for list_item in list_data)
 
-    lists = [List(**list_item) for list_item in response.json()]
-    assert len(lists) == len(list_data) - skip
+
+def test_read_lists_invalid_cursor(client, list_data):
+    response = client.get("/lists/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_read_lists_limit_cap(client):
+    response = client.get("/lists/", params={"limit": 1000})
+    assert response.status_code == 422
 
 
 @pytest.mark.parametrize("limit", [1, 2, 3, 4, 5])
@@ -47,7 +70,7 @@ def test_read_lists_limit(client, limit, list_data):
     response = client.get("/lists/", params={"limit": limit})
     assert response.status_code == 200
 
-    lists = [List(**list_item) for list_item in response.json()]
+    lists = [List(**list_item) for list_item in response.json()["items"]]
     assert len(lists) == limit
 
 
@@ -56,7 +79,7 @@ def test_read_lists_sort(client, sort_by, list_data):
     response = client.get("/lists/", params={"sort_by": sort_by})
     assert response.status_code == 200
 
-    lists = [List(**list_item) for list_item in response.json()]
+    lists = [List(**list_item) for list_item in response.json()["items"]]
     assert all(lists[i].updated_at >= lists[i + 1].updated_at for i in range(len(lists) - 1) if sort_by == "desc")
     assert all(lists[i].updated_at <= lists[i + 1].updated_at for i in range(len(lists) - 1) if sort_by == "asc")
 
@@ -80,7 +103,7 @@ def test_read_lists_search(client, keyword, should_exist, list_data):
     response = client.get("/lists/", params={"search": keyword})
     assert response.status_code == 200
 
-    lists = [List(**list_item) for list_item in response.json()]
+    lists = [List(**list_item) for list_item in response.json()["items"]]
     
     if should_exist:
         assert len(lists) > 0
@@ -91,6 +114,16 @@ def test_read_lists_search(client, keyword, should_exist, list_data):
         assert len(lists) == 0
 
 
+def test_read_lists_search_relevance(client, list_data):
+    client.post("/lists/", json={"title": "Groceries", "description": "groceries for the week"})
+
+    response = client.get("/lists/", params={"search": "grocer", "sort_by": "relevance"})
+    assert response.status_code == 200
+
+    lists = [List(**list_item) for list_item in response.json()["items"]]
+    assert [list.title for list in lists] == ["Groceries"]
+
+
 def test_read_list(client, list_data):
     response = client.get(f"/lists/{list_data[0].id}")
     assert response.status_code == 200
@@ -103,6 +136,95 @@ def test_read_list(client, list_data):
     assert list.updated_at == list_data[0].updated_at
 
 
+def test_read_list_without_todos_by_default(client, todo_data):
+    response = client.get(f"/lists/{todo_data[0].list_id}")
+    assert response.status_code == 200
+    assert "todos" not in response.json()
+
+
+@pytest.mark.parametrize("loading", list(list_router.TodosLoadingEnum))
+def test_read_list_include_todos(client, todo_data, statements, monkeypatch, loading):
+    monkeypatch.setattr(list_router, "TODOS_LOADING", loading)
+    statements.clear()
+
+    response = client.get(f"/lists/{todo_data[0].list_id}", params={"include": "todos", "todos_limit": 2})
+    assert response.status_code == 200
+
+    todos = response.json()["todos"]
+    assert len(todos) == 2
+    assert all(todo["list_id"] == todo_data[0].list_id for todo in todos)
+    assert len(statements) == (1 if loading == list_router.TodosLoadingEnum.JOINED else 2)
+
+
+def test_read_lists_include_todos(client, todo_data, statements):
+    statements.clear()
+
+    response = client.get("/lists/", params={"include": "todos", "sort_by": "asc"})
+    assert response.status_code == 200
+
+    lists = [List(**list_item) for list_item in response.json()["items"]]
+    assert [len(list.todos) for list in lists[:4]] == [3, 3, 3, 0]
+    assert len(statements) == 2
+
+
+def test_read_lists_statement_count(client, todo_data, statements):
+    statements.clear()
+
+    response = client.get("/lists/")
+    assert response.status_code == 200
+    assert all("todos" not in list_item for list_item in response.json()["items"])
+    assert len(statements) == 1
+
+
+def test_read_list_todos(client, todo_data, statements):
+    list_id = todo_data[0].list_id
+    statements.clear()
+
+    response = client.get(f"/lists/{list_id}/todos")
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert sorted(item["id"] for item in items) == sorted(todo.id for todo in todo_data if todo.list_id == list_id)
+    # A non-empty page needs no separate lookup of the list.
+    assert len(statements) == 1
+
+
+def test_read_list_todos_filters_sorts_and_pages(client, todo_data):
+    list_id = todo_data[0].list_id
+    own = [todo for todo in todo_data if todo.list_id == list_id]
+
+    open_todos = client.get(f"/lists/{list_id}/todos", params={"completed": False}).json()["items"]
+    assert sorted(item["id"] for item in open_todos) == sorted(todo.id for todo in own if not todo.completed)
+
+    by_priority = client.get(f"/lists/{list_id}/todos", params={"sort_by": "priority", "order": "desc"}).json()["items"]
+    assert [item["priority"] for item in by_priority] == ["high", "medium", "low"]
+
+    first = client.get(f"/lists/{list_id}/todos", params={"limit": 2}).json()
+    second = client.get(f"/lists/{list_id}/todos", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert len(first["items"]) == 2 and len(second["items"]) == 1
+    assert second["next_cursor"] is None
+    assert {item["id"] for item in first["items"] + second["items"]} == {todo.id for todo in own}
+
+    sparse = client.get(f"/lists/{list_id}/todos", params={"fields": "id,title"}).json()["items"]
+    assert all(set(item) == {"id", "title"} for item in sparse)
+
+
+def test_read_list_todos_sees_new_todos(client, todo_data):
+    list_id = todo_data[0].list_id
+    before = len(client.get(f"/lists/{list_id}/todos").json()["items"])
+
+    client.post("/todos/", json={"title": "New", "list_id": list_id})
+    assert len(client.get(f"/lists/{list_id}/todos").json()["items"]) == before + 1
+
+
+def test_read_list_todos_of_an_empty_or_missing_list(client, todo_data, list_data):
+    empty = list_data[-1].id
+    response = client.get(f"/lists/{empty}/todos")
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
+
+    assert client.get("/lists/999/todos").status_code == 404
+
+
 def test_read_list_not_found(client):
     response = client.get("/lists/999")
     assert response.status_code == 404
@@ -127,11 +249,25 @@ def test_update_list_invalid(client, list_data):
     assert response.status_code == 422
     
 
-def test_delete_list(client, list_data):
-    response = client.delete(f"/lists/{list_data[2].id}")
-    assert response.status_code == 204
-
-    response = client.delete(f"/lists/{list_data[2].id}")
+def test_delete_list(client, todo_data, run_jobs):
+    list_id = todo_data[0].list_id
+    response = client.delete(f"/lists/{list_id}")
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["kind"], job["status"]) == ("delete_list", "queued")
+    assert response.headers["Location"] == f"/jobs/{job['id']}"
+
+    # Deleting again while the job is pending returns the same job.
+    assert client.delete(f"/lists/{list_id}").json()["id"] == job["id"]
+
+    assert run_jobs() == 1
+    job = client.get(f"/jobs/{job['id']}").json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"todos_deleted": 3}
+    assert client.get(f"/lists/{list_id}").status_code == 404
+    assert all(item["list_id"] != list_id for item in client.get("/todos/").json()["items"])
+
+    response = client.delete(f"/lists/{list_id}")
     assert response.status_code == 404
 
 
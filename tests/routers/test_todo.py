@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pytest
@@ -10,7 +11,7 @@ from app.schemas import Todo
     {"title": "Test Two", "details": "Test Details", "list_id": 1},
     {"title": "Test No Description", "details": "", "list_id": 1},
 ])
-def test_create_todo(client, data):
+def test_create_todo(client, list_data, data):
     response = client.post("/todos/", json=data)
     assert response.status_code == 201
 
@@ -23,6 +24,12 @@ def test_create_todo(client, data):
     assert created_todo.completed == data.get("completed", False)
 
 
+def test_create_todo_in_missing_list(client, list_data):
+    response = client.post("/todos/", json={"title": "Test One", "list_id": 999})
+    assert response.status_code == 400
+    assert client.get("/todos/").json()["items"] == []
+
+
 def test_create_todo_invalid(client):
     response = client.post("/todos/", json={"title": "", "details": "Test Details", "list_id": 1})
     assert response.status_code == 422
@@ -32,16 +39,17 @@ def test_get_todos(client, todo_data):
     response = client.get("/todos/")
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
     assert len(todos) == len(todo_data)
 
+    expected = sorted(todo_data, key=lambda todo: (todo.created_at, todo.id), reverse=True)
     for i, todo in enumerate(todos):
-        assert todo.id == todo_data[i].id
-        assert todo.title == todo_data[i].title
-        assert todo.details == todo_data[i].details
-        assert todo.list_id == todo_data[i].list_id
-        assert todo.completed == todo_data[i].completed
-        assert todo.created_at == todo_data[i].created_at
+        assert todo.id == expected[i].id
+        assert todo.title == expected[i].title
+        assert todo.details == expected[i].details
+        assert todo.list_id == expected[i].list_id
+        assert todo.completed == expected[i].completed
+        assert todo.created_at == expected[i].created_at
 
 
 @pytest.mark.parametrize("priority_level", ["high", "medium", "low"])
@@ -49,7 +57,7 @@ def test_get_todos_filter_by_priority(client, priority_level):
     response = client.get("/todos/", params={"priority": priority_level})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
 
     for todo in todos:
         assert todo.priority == priority_level
@@ -60,17 +68,44 @@ def test_get_todos_filter_by_due_date(client):
     response = client.get("/todos", params={"due_date": due_date})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
 
     for todo in todos:
         assert todo.due_date == due_date
 
 
+def test_get_todos_filter_by_due_range(client, list_data):
+    list_id = list_data[0].id
+    for day in (1, 2, 3, 4):
+        client.post("/todos/", json={"title": f"Day {day}", "list_id": list_id, "due_date": f"2030-01-0{day}T12:00:00"})
+    client.post("/todos/", json={"title": "Someday", "list_id": list_id})
+
+    def titles(**params) -> list[str]:
+        response = client.get("/todos/", params={"sort_by": "due_date", "order": "asc", **params})
+        assert response.status_code == 200
+        return [todo["title"] for todo in response.json()["items"]]
+
+    assert titles(due_after="2030-01-02T12:00:00") == ["Day 2", "Day 3", "Day 4"]
+    assert titles(due_before="2030-01-02T12:00:00") == ["Day 1"]
+    assert titles(due_after="2030-01-02", due_before="2030-01-04") == ["Day 2", "Day 3"]
+
+
+def test_get_todos_filter_by_overdue(client, todo_data):
+    client.post("/todos/", json={"title": "Future", "list_id": todo_data[0].list_id, "due_date": "2999-01-01T00:00:00"})
+
+    overdue = client.get("/todos/", params={"overdue": True}).json()["items"]
+    assert sorted(todo["id"] for todo in overdue) == [todo.id for todo in todo_data if todo.due_date and not todo.completed]
+
+    not_overdue = client.get("/todos/", params={"overdue": False}).json()["items"]
+    assert len(not_overdue) == len(todo_data) + 1 - len(overdue)
+    assert "Future" in [todo["title"] for todo in not_overdue]
+
+
 def test_get_todos_sort_by_due_date_asc(client, todo_data):
     response = client.get("/todos/", params={"sort_by": "due_date", "order": "asc"})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
     assert len(todos) == len(todo_data)
 
     for i in range(1, len(todos)):
@@ -87,7 +122,7 @@ def test_get_todos_sort_by_due_date_desc(client, todo_data):
     response = client.get("/todos/", params={"sort_by": "due_date"})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
     assert len(todos) == len(todo_data)
 
     for i in range(1, len(todos)):
@@ -104,7 +139,7 @@ def test_get_todos_sort_by_priority_asc(client, todo_data):
     response = client.get("/todos/", params={"sort_by": "priority", "order": "asc"})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
     assert len(todos) == len(todo_data)
 
     priority_order = {"high": 3, "medium": 2, "low": 1}
@@ -119,7 +154,7 @@ def test_get_todos_sort_by_priority_desc(client, todo_data):
     response = client.get("/todos/", params={"sort_by": "priority"})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
     assert len(todos) == len(todo_data)
 
     priority_order = {"high": 3, "medium": 2, "low": 1}
@@ -134,7 +169,7 @@ def test_get_todos_sort_by_created_at_asc(client, todo_data):
     response = client.get("/todos/", params={"sort_by": "created_at", "order": "asc"})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
     assert len(todos) == len(todo_data)
 
     for i in range(1, len(todos)):
@@ -145,13 +180,134 @@ def test_get_todos_sort_by_created_at_desc(client, todo_data):
     response = client.get("/todos/", params={"sort_by": "created_at", "order": "desc"})
     assert response.status_code == 200
 
-    todos = [Todo(**todo) for todo in response.json()]
+    todos = [Todo(**todo) for todo in response.json()["items"]]
     assert len(todos) == len(todo_data)
 
     for i in range(1, len(todos)):
         assert todos[i].created_at <= todos[i - 1].created_at
 
 
+@pytest.mark.parametrize("keyword, expected", [
+    ("Test", 9),
+    ("Descr", 3),
+    ("Two", 3),
+    ("test two", 3),
+    ("Eleven", 0),
+])
+def test_get_todos_search(client, todo_data, keyword, expected):
+    response = client.get("/todos/", params={"search": keyword})
+    assert response.status_code == 200
+
+    todos = [Todo(**todo) for todo in response.json()["items"]]
+    assert len(todos) == expected
+
+
+def test_get_todos_search_relevance(client, todo_data):
+    client.post("/todos/", json={"title": "Groceries", "details": "groceries groceries groceries", "list_id": 1})
+    client.post("/todos/", json={"title": "Shopping", "details": "groceries", "list_id": 1})
+
+    response = client.get("/todos/", params={"search": "grocer", "sort_by": "relevance"})
+    assert response.status_code == 200
+
+    todos = [Todo(**todo) for todo in response.json()["items"]]
+    assert [todo.title for todo in todos] == ["Groceries", "Shopping"]
+
+    response = client.get("/todos/", params={"search": "grocer", "sort_by": "relevance", "limit": 1})
+    next_page = client.get("/todos/", params={"search": "grocer", "sort_by": "relevance", "cursor": response.json()["next_cursor"]})
+    assert [todo["title"] for todo in next_page.json()["items"]] == ["Shopping"]
+
+
+def test_get_todos_search_follows_updates(client, todo_data):
+    data = {"title": "Renamed", "details": "Updated Details", "list_id": 1}
+    client.put(f"/todos/{todo_data[0].id}", json=data)
+    client.delete(f"/todos/{todo_data[1].id}")
+
+    renamed = client.get("/todos/", params={"search": "Renamed"}).json()["items"]
+    assert [todo["id"] for todo in renamed] == [todo_data[0].id]
+
+    remaining = client.get("/todos/", params={"search": "Test"}).json()["items"]
+    assert {todo["id"] for todo in remaining} == {todo.id for todo in todo_data[2:]}
+
+
+def test_get_todos_search_fallback(client, todo_data, monkeypatch):
+    monkeypatch.setattr("app.search.fts_enabled", lambda db: False)
+
+    response = client.get("/todos/", params={"search": "est On", "sort_by": "relevance"})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+
+
+@pytest.mark.parametrize("sort_by", ["due_date", "priority", "created_at"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_get_todos_cursor(client, todo_data, sort_by, order, limit):
+    expected = client.get("/todos/", params={"sort_by": sort_by, "order": order}).json()["items"]
+
+    seen = []
+    params = {"sort_by": sort_by, "order": order, "limit": limit}
+    while True:
+        response = client.get("/todos/", params=params)
+        assert response.status_code == 200
+
+        page = response.json()
+        assert len(page["items"]) <= limit
+        seen.extend(todo["id"] for todo in page["items"])
+
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert seen == [todo["id"] for todo in expected]
+
+
+def test_get_todos_cursor_sort_mismatch(client, todo_data):
+    cursor = client.get("/todos/", params={"sort_by": "priority", "limit": 1}).json()["next_cursor"]
+
+    response = client.get("/todos/", params={"sort_by": "due_date", "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_get_todos_limit_cap(client):
+    response = client.get("/todos/", params={"limit": 1000})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("sort_by", ["due_date", "priority", "created_at"])
+def test_get_todos_fields(client, todo_data, sort_by):
+    full = client.get("/todos/", params={"sort_by": sort_by, "limit": 4}).json()
+
+    response = client.get("/todos/", params={"sort_by": sort_by, "limit": 4, "fields": "id,title,completed"})
+    assert response.status_code == 200
+    page = response.json()
+    assert page["items"] == [{key: todo[key] for key in ("id", "title", "completed")} for todo in full["items"]]
+    assert page["next_cursor"] == full["next_cursor"]
+
+    rest = client.get("/todos/", params={"sort_by": sort_by, "cursor": page["next_cursor"], "fields": "title"}).json()
+    assert len(page["items"]) + len(rest["items"]) == len(todo_data)
+
+
+def test_get_todos_all_fields_match_the_default_body(client, todo_data):
+    default = client.get("/todos/", params={"sort_by": "due_date"})
+    sparse = client.get("/todos/", params={"sort_by": "due_date", "fields": ",".join(Todo.model_fields)})
+    assert sparse.content == default.content
+
+
+def test_get_todos_fields_with_relevance(client, todo_data):
+    client.post("/todos/", json={"title": "Groceries", "details": "groceries groceries groceries", "list_id": 1})
+    client.post("/todos/", json={"title": "Shopping", "details": "groceries", "list_id": 1})
+
+    params = {"search": "grocer", "sort_by": "relevance", "fields": "title", "limit": 1}
+    page = client.get("/todos/", params=params).json()
+    assert page["items"] == [{"title": "Groceries"}]
+    assert client.get("/todos/", params={**params, "cursor": page["next_cursor"]}).json()["items"] == [{"title": "Shopping"}]
+
+
+@pytest.mark.parametrize("fields", ["", "id,secret", "priority_rank"])
+def test_get_todos_invalid_fields(client, fields):
+    response = client.get("/todos/", params={"fields": fields})
+    assert response.status_code == 400
+
+
 @pytest.mark.parametrize("todo_index", [0, 1, 2])
 def test_get_todo(client, todo_data, todo_index):
     response = client.get(f"/todos/{todo_data[todo_index].id}")
@@ -188,6 +344,69 @@ def test_update_todo_not_found(client):
     assert response.status_code == 404
 
 
+def test_update_todo_runs_one_update(client, todo_data, statements):
+    todo = todo_data[0]
+    statements.clear()
+    response = client.put(f"/todos/{todo.id}", json={"title": "Moved", "list_id": todo_data[3].list_id})
+    assert response.status_code == 200
+    assert response.json()["list_id"] == todo_data[3].list_id
+
+    # The previous list is read for cache invalidation; the list itself is checked by the foreign key.
+    assert [statement.split()[0] for statement in statements] == ["SELECT", "UPDATE", "INSERT"]
+    assert "RETURNING" in statements[1]
+
+
+def test_update_todo_in_missing_list(client, todo_data):
+    response = client.put(f"/todos/{todo_data[0].id}", json={"title": "Moved", "list_id": 999})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "List with id no. 999 not found."
+    assert client.get(f"/todos/{todo_data[0].id}").json()["title"] == todo_data[0].title
+
+
+def test_patch_todo(client, todo_data):
+    todo = todo_data[1]
+    response = client.patch(f"/todos/{todo.id}", json={"completed": True, "due_date": None})
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"todo-{todo.id}-2"'
+
+    patched = response.json()
+    assert patched["completed"] is True
+    assert patched["due_date"] is None
+    assert (patched["title"], patched["details"], patched["priority"], patched["list_id"]) == (
+        todo.title, todo.details, todo.priority.value, todo.list_id
+    )
+
+
+def test_patch_todo_writes_only_the_fields_sent(client, todo_data, statements):
+    statements.clear()
+    assert client.patch(f"/todos/{todo_data[0].id}", json={"title": "Patched"}).status_code == 200
+
+    update, _ = statements
+    assert update.startswith("UPDATE todos SET title=?, updated_at=")
+    assert "list_id" not in update.split("RETURNING")[0]
+
+
+@pytest.mark.parametrize("data, status_code", [
+    ({"title": None}, 422),
+    ({"title": ""}, 422),
+    ({"list_id": 999}, 404),
+])
+def test_patch_todo_invalid(client, todo_data, data, status_code):
+    response = client.patch(f"/todos/{todo_data[0].id}", json=data)
+    assert response.status_code == status_code
+
+
+def test_patch_todo_not_found(client, todo_data):
+    assert client.patch("/todos/999", json={"title": "Missing"}).status_code == 404
+    assert client.patch("/todos/999", json={}).status_code == 404
+
+
+def test_empty_patch_changes_nothing(client, todo_data):
+    response = client.patch(f"/todos/{todo_data[0].id}", json={})
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"todo-{todo_data[0].id}-1"'
+
+
 def test_delete_todo(client, todo_data):
     response = client.delete(f"/todos/{todo_data[0].id}")
     assert response.status_code == 204
@@ -208,4 +427,86 @@ def test_toggle_completed(client, todo_data, todo_index):
 
 def test_toggle_completed_not_found(client):
     response = client.patch("/todos/999/complete")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+
+def test_toggle_completed_runs_one_update(client, todo_data, statements):
+    statements.clear()
+    assert client.patch(f"/todos/{todo_data[0].id}/complete").status_code == 200
+    assert [statement.split()[0] for statement in statements] == ["UPDATE", "INSERT"]
+
+
+def test_concurrent_toggles_are_not_lost(concurrent_client, todo_data):
+    todo = todo_data[1]
+    with ThreadPoolExecutor(8) as executor:
+        responses = list(executor.map(lambda _: concurrent_client.patch(f"/todos/{todo.id}/complete"), range(21)))
+
+    assert {response.status_code for response in responses} == {200}
+    # Each toggle saw the one before it: every version was handed out once.
+    assert sorted(int(response.headers["etag"].strip('"').split("-")[-1]) for response in responses) == list(range(2, 23))
+    assert concurrent_client.get(f"/todos/{todo.id}").json()["completed"] is not todo.completed
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 500])
+def test_create_todos_bulk(client, list_data, chunk_size):
+    data = [
+        {"title": "Bulk One", "list_id": list_data[0].id},
+        {"title": "", "list_id": list_data[0].id},
+        {"title": "Bulk Two", "list_id": 999, "priority": "high"},
+        {"title": "Bulk Three", "list_id": list_data[1].id, "priority": "low"},
+    ]
+    response = client.post("/todos/bulk", json=data, params={"chunk_size": chunk_size})
+    assert response.status_code == 200
+
+    result = response.json()
+    assert [todo["title"] for todo in result["items"]] == ["Bulk One", "Bulk Three"]
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+
+    todos = client.get("/todos/").json()["items"]
+    assert {todo["title"] for todo in todos} == {"Bulk One", "Bulk Three"}
+
+
+def test_create_todos_bulk_statement_count(client, list_data, statements):
+    data = [{"title": f"Bulk {i}", "list_id": list_data[0].id} for i in range(100)]
+    statements.clear()
+
+    response = client.post("/todos/bulk", json=data, params={"chunk_size": 50})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 100
+    assert len([statement for statement in statements if statement.startswith("INSERT INTO todos")]) == 2
+
+
+@pytest.mark.parametrize("chunk_size", [1, 500])
+def test_update_todos_bulk(client, todo_data, chunk_size):
+    data = [
+        {"id": todo_data[0].id, "title": "Bulk Updated"},
+        {"id": todo_data[1].id, "completed": True, "priority": "low"},
+        {"id": 999, "title": "Missing"},
+        {"id": todo_data[2].id, "list_id": 999},
+        {"id": todo_data[3].id, "title": None},
+    ]
+    response = client.patch("/todos/bulk", json=data, params={"chunk_size": chunk_size})
+    assert response.status_code == 200
+
+    result = response.json()
+    assert [todo["id"] for todo in result["items"]] == [todo_data[0].id, todo_data[1].id]
+    assert [error["index"] for error in result["errors"]] == [2, 3, 4]
+
+    first, second = result["items"]
+    assert first["title"] == "Bulk Updated"
+    assert first["details"] == todo_data[0].details
+    assert second["completed"] is True
+    assert second["priority"] == "low"
+    assert second["title"] == todo_data[1].title
+
+
+def test_delete_todos_bulk(client, todo_data):
+    ids = [todo_data[0].id, 999, todo_data[1].id]
+    response = client.request("DELETE", "/todos/bulk", json=ids)
+    assert response.status_code == 200
+
+    result = response.json()
+    assert result["items"] == [todo_data[0].id, todo_data[1].id]
+    assert [error["index"] for error in result["errors"]] == [1]
+
+    assert client.get(f"/todos/{todo_data[0].id}").status_code == 404
+    assert client.get(f"/todos/{todo_data[2].id}").status_code == 200
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture()
+def agenda_todos(client, list_data):
+    list_id, other_list_id = list_data[0].id, list_data[1].id
+    # 2030-01-07 is a Monday.
+    due = ["2030-01-07T09:00:00", "2030-01-07T18:00:00", "2030-01-09T10:00:00", "2030-01-13T23:00:00", "2030-01-14T08:00:00"]
+    ids = [client.post("/todos/", json={"title": f"Todo {i}", "list_id": list_id, "due_date": date}).json()["id"] for i, date in enumerate(due)]
+    client.patch(f"/todos/{ids[1]}/complete")
+    client.post("/todos/", json={"title": "Someday", "list_id": list_id})
+    client.post("/todos/", json={"title": "Other list", "list_id": other_list_id, "due_date": "2030-01-08T12:00:00"})
+    return list_id, ids
+
+
+def test_agenda_by_day(client, agenda_todos):
+    response = client.get("/agenda", params={"from": "2030-01-07", "to": "2030-01-13"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "buckets": [
+            {"start": "2030-01-07", "total": 2, "completed": 1, "todos": []},
+            {"start": "2030-01-08", "total": 1, "completed": 0, "todos": []},
+            {"start": "2030-01-09", "total": 1, "completed": 0, "todos": []},
+            {"start": "2030-01-13", "total": 1, "completed": 0, "todos": []},
+        ]
+    }
+
+
+def test_agenda_by_week(client, agenda_todos):
+    list_id, _ = agenda_todos
+    params = {"from": "2030-01-01", "to": "2030-01-31", "bucket": "week", "list_id": list_id}
+    buckets = client.get("/agenda", params=params).json()["buckets"]
+    assert [(bucket["start"], bucket["total"]) for bucket in buckets] == [("2030-01-07", 4), ("2030-01-14", 1)]
+
+    params["completed"] = False
+    assert [bucket["total"] for bucket in client.get("/agenda", params=params).json()["buckets"]] == [3, 1]
+
+
+def test_agenda_embeds_todos_in_due_order(client, agenda_todos):
+    list_id, ids = agenda_todos
+    params = {"from": "2030-01-07", "to": "2030-01-13", "bucket": "week", "list_id": list_id, "include": "todos"}
+    [week] = client.get("/agenda", params={**params, "todos_limit": 3}).json()["buckets"]
+    assert week["total"] == 4
+    assert [todo["id"] for todo in week["todos"]] == ids[:3]
+
+
+def test_agenda_follows_mutations(client, agenda_todos):
+    _, ids = agenda_todos
+    params = {"from": "2030-01-14", "to": "2030-01-14"}
+    assert client.get("/agenda", params=params).json()["buckets"][0]["total"] == 1
+    client.delete(f"/todos/{ids[4]}")
+    assert client.get("/agenda", params=params).json()["buckets"] == []
+
+
+@pytest.mark.parametrize("params", [{"from": "2030-01-02", "to": "2030-01-01"}, {"from": "2030-01-01"}, {"from": "2030-01-01", "to": "2030-01-02", "bucket": "month"}])
+def test_agenda_invalid_window(client, params):
+    assert client.get("/agenda", params=params).status_code in (400, 422)
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from app.cache import LRUCache, ResponseCache, response_cache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_bounds_total_bytes():
+    cache = LRUCache(max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"123")
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 8
+
+    cache.set("too-big", b"12345678901")
+    assert cache.get("too-big") is None
+
+
+def test_lru_expires_entries():
+    cache = LRUCache()
+    cache.set("a", b"1", ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_generation_bump_invalidates_collection_keys():
+    cache = ResponseCache(LRUCache())
+    todos_key = cache.todos_key(limit=10)
+    list_key = cache.list_key(1, include="todos")
+    other_list_key = cache.list_key(2, include="todos")
+
+    cache.todo_changed(5, 1)
+
+    assert cache.todos_key(limit=10) != todos_key
+    assert cache.list_key(1, include="todos") != list_key
+    assert cache.list_key(2, include="todos") == other_list_key
+
+
+@pytest.mark.parametrize("path", ["/todos/", "/todos/{todo_id}", "/lists/", "/lists/{list_id}?include=todos"])
+def test_cached_reads_skip_the_database(client, todo_data, statements, path):
+    url = path.format(todo_id=todo_data[0].id, list_id=todo_data[0].list_id)
+    first = client.get(url)
+    statements.clear()
+
+    second = client.get(url)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    # Item reads only look up the row version their ETag is built from.
+    assert len(statements) == (1 if path == "/todos/{todo_id}" else 0)
+    assert client.get("/cache/stats").json()["hits"] == 1
+
+
+def test_todo_mutations_invalidate_reads(client, todo_data):
+    todo = todo_data[1]
+    client.get(f"/todos/{todo.id}")
+    client.get("/todos/", params={"completed": True})
+    client.get(f"/lists/{todo.list_id}", params={"include": "todos"})
+
+    client.patch(f"/todos/{todo.id}/complete")
+
+    assert client.get(f"/todos/{todo.id}").json()["completed"] is True
+    completed = client.get("/todos/", params={"completed": True}).json()["items"]
+    assert todo.id in [item["id"] for item in completed]
+    embedded = client.get(f"/lists/{todo.list_id}", params={"include": "todos"}).json()["todos"]
+    assert next(item for item in embedded if item["id"] == todo.id)["completed"] is True
+
+
+def test_list_mutations_invalidate_reads(client, list_data, run_jobs):
+    list_id = list_data[0].id
+    client.get(f"/lists/{list_id}")
+    client.get("/lists/")
+
+    client.put(f"/lists/{list_id}", json={"title": "Renamed"})
+    assert client.get(f"/lists/{list_id}").json()["title"] == "Renamed"
+    assert "Renamed" in [item["title"] for item in client.get("/lists/").json()["items"]]
+
+    client.delete(f"/lists/{list_id}")
+    run_jobs()
+    assert client.get(f"/lists/{list_id}").status_code == 404
+
+
+def test_errors_are_not_cached(client):
+    assert client.get("/lists/999", params={"include": "todos"}).status_code == 404
+    assert client.get("/lists/999", params={"include": "todos"}).status_code == 404
+    assert response_cache.stats()["hits"] == 0
+    assert response_cache.stats()["misses"] == 2
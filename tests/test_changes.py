@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.changes import ChangeBroker, ChangeEntityEnum, ChangeOpEnum, change_broker, record_changes
+from app.routers.changes import _events, stream_changes
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture()
+def broker(committed, monkeypatch):
+    monkeypatch.setattr(change_broker, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(change_broker, "poll_interval", 0.05)
+    return change_broker
+
+
+def changes(client, since=0, **params) -> list[tuple]:
+    body = client.get("/changes/", params={"since": since, **params}).json()
+    return [(change["entity"], change["entity_id"], change["op"]) for change in body["changes"]]
+
+
+def collect(stream, count: int) -> list:
+    async def read():
+        messages = []
+        async for message in stream:
+            if message is not None:
+                messages.append(message)
+            if len(messages) == count:
+                await stream.aclose()
+                return messages
+
+    return asyncio.run(asyncio.wait_for(read(), 5))
+
+
+def test_mutations_are_logged_in_order(client, session, run_jobs):
+    list_id = client.post("/lists/", json={"title": "Groceries"}).json()["id"]
+    todo_id = client.post("/todos/", json={"title": "Milk", "list_id": list_id}).json()["id"]
+    client.put(f"/todos/{todo_id}", json={"title": "Oat milk", "list_id": list_id})
+    client.patch(f"/todos/{todo_id}/complete")
+    client.put(f"/lists/{list_id}", json={"title": "Shopping"})
+    client.delete(f"/todos/{todo_id}")
+    client.delete(f"/lists/{list_id}")
+    run_jobs()
+
+    assert changes(client) == [
+        ("list", list_id, "created"),
+        ("todo", todo_id, "created"),
+        ("todo", todo_id, "updated"),
+        ("todo", todo_id, "updated"),
+        ("list", list_id, "updated"),
+        ("todo", todo_id, "deleted"),
+        ("list", list_id, "deleted"),
+    ]
+    feed = client.get("/changes/").json()
+    assert [change["seq"] for change in feed["changes"]] == sorted(change["seq"] for change in feed["changes"])
+    assert feed["changes"][1]["list_id"] == list_id
+
+
+def test_changes_since(client, list_data):
+    list_id = list_data[0].id
+    for i in range(5):
+        client.post("/todos/", json={"title": f"Todo {i}", "list_id": list_id})
+
+    page = client.get("/changes/", params={"limit": 3}).json()
+    assert len(page["changes"]) == 3
+    assert page["has_more"]
+
+    rest = client.get("/changes/", params={"since": page["last_seq"]}).json()
+    assert len(rest["changes"]) == 2
+    assert not rest["has_more"]
+    assert client.get("/changes/", params={"since": rest["last_seq"]}).json() == {
+        "changes": [],
+        "last_seq": rest["last_seq"],
+        "has_more": False,
+    }
+
+
+def test_failed_mutations_are_not_logged(client, todo_data):
+    todo = todo_data[0]
+    stale = {"If-Match": f'"todo-{todo.id}-9"'}
+    assert client.put(f"/todos/{todo.id}", json={"title": "Lost", "list_id": todo.list_id}, headers=stale).status_code == 412
+    assert client.put(f"/todos/{todo.id}", json={"title": "Lost", "list_id": 999}).status_code == 404
+    assert client.delete("/todos/999").status_code == 404
+    assert changes(client) == []
+
+
+def test_bulk_mutations_are_logged(client, list_data):
+    list_id = list_data[0].id
+    created = client.post("/todos/bulk", json=[{"title": f"Todo {i}", "list_id": list_id} for i in range(3)]).json()["items"]
+    ids = [todo["id"] for todo in created]
+    client.patch("/todos/bulk", json=[{"id": ids[0], "completed": True}, {"id": 999, "completed": True}])
+    client.request("DELETE", "/todos/bulk", json=ids[1:])
+
+    assert changes(client) == [
+        *[("todo", id, "created") for id in ids],
+        ("todo", ids[0], "updated"),
+        *sorted(("todo", id, "deleted") for id in ids[1:]),
+    ]
+
+
+def test_import_is_logged(client, list_data):
+    list_id = list_data[0].id
+    body = "".join(f'{{"title": "Imported {i}", "list_id": {list_id}}}\n' for i in range(4))
+    client.post("/todos/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert [op for _, _, op in changes(client)] == ["created"] * 4
+
+
+def test_deleting_a_list_logs_its_deleted_todos(client, todo_data, session, run_jobs):
+    list_id = todo_data[0].list_id
+    todo_ids = [todo.id for todo in todo_data if todo.list_id == list_id]
+    client.delete(f"/lists/{list_id}")
+    run_jobs()
+
+    logged = client.get("/changes/").json()["changes"]
+    assert sorted(change["entity_id"] for change in logged if change["entity"] == "todo") == todo_ids
+    assert all((change["op"], change["list_id"]) == ("deleted", list_id) for change in logged if change["entity"] == "todo")
+    assert (logged[-1]["entity"], logged[-1]["op"]) == ("list", "deleted")
+
+
+def test_async_mutations_are_logged(async_client, client, list_data):
+    list_id = list_data[0].id
+    todo_id = async_client.post("/todos/", json={"title": "Async", "list_id": list_id}).json()["id"]
+    async_client.patch(f"/todos/{todo_id}/complete")
+    assert async_client.get("/changes/").status_code == 200
+    assert changes(client) == [("todo", todo_id, "created"), ("todo", todo_id, "updated")]
+
+
+def test_stream_replays_then_follows(client, list_data, broker):
+    list_id = list_data[0].id
+    client.post("/todos/", json={"title": "Before", "list_id": list_id})
+
+    async def follow():
+        stream = broker.stream(0)
+        first = await anext(stream)
+        await asyncio.to_thread(client.post, "/todos/", json={"title": "After", "list_id": list_id})
+        second = await anext(stream)
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(asyncio.wait_for(follow(), 5))
+    assert (first[0], second[0]) == (1, 2)
+    assert '"op": "created"' in second[1]
+    assert not broker.subscribers
+
+
+def test_slow_subscriber_catches_up_from_the_log(committed, session):
+    broker = ChangeBroker(TestingSessionLocal, poll_interval=0.01, queue_size=2)
+
+    def record(todo_id: int) -> None:
+        record_changes(session, ChangeEntityEnum.TODO, ChangeOpEnum.CREATED, [(todo_id, None)])
+        session.commit()
+
+    async def follow():
+        record(1)
+        stream = broker.stream(0)
+        received = [await anext(stream)]
+        # More changes than the queue holds are published while the subscriber is not reading.
+        for todo_id in range(2, 12):
+            record(todo_id)
+            await asyncio.sleep(0.03)
+        received += [await anext(stream) for _ in range(10)]
+        await stream.aclose()
+        return received
+
+    received = asyncio.run(asyncio.wait_for(follow(), 5))
+    assert [seq for seq, _ in received] == list(range(1, 12))
+    assert broker.overflows >= 1
+
+
+def test_sse_events(client, list_data, broker):
+    list_id = list_data[0].id
+    client.post("/todos/", json={"title": "One", "list_id": list_id})
+    client.post("/todos/", json={"title": "Two", "list_id": list_id})
+
+    events = collect(_events(0), 2)
+    assert events[0].startswith("id: 1\nevent: change\ndata: {")
+    assert events[1].startswith("id: 2\n")
+    assert events[1].endswith("\n\n")
+
+
+def test_sse_resumes_from_last_event_id(client, list_data, broker):
+    list_id = list_data[0].id
+    for title in ("One", "Two", "Three"):
+        client.post("/todos/", json={"title": title, "list_id": list_id})
+
+    def request(headers: dict) -> Request:
+        raw = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        return Request({"type": "http", "method": "GET", "path": "/changes/stream", "headers": raw, "query_string": b""})
+
+    async def first_event(headers: dict, since: int | None) -> str:
+        response = await stream_changes(request(headers), since)
+        assert response.media_type == "text/event-stream"
+        event = await anext(response.body_iterator)
+        await response.body_iterator.aclose()
+        return event
+
+    assert asyncio.run(first_event({"Last-Event-ID": "2"}, 0)).startswith("id: 3\n")
+    assert asyncio.run(first_event({}, 1)).startswith("id: 2\n")
+
+
+def test_websocket(client, list_data, broker):
+    list_id = list_data[0].id
+    client.post("/todos/", json={"title": "Before", "list_id": list_id})
+
+    with client.websocket_connect("/changes/ws?since=0") as websocket:
+        assert websocket.receive_json()["seq"] == 1
+        todo_id = client.post("/todos/", json={"title": "After", "list_id": list_id}).json()["id"]
+        change = websocket.receive_json()
+        assert (change["seq"], change["entity_id"], change["op"]) == (2, todo_id, "created")
@@ -0,0 +1,113 @@
+import pytest
+
+from app.conditional import http_date
+
+
+def test_todo_etag_tracks_version(client, todo_data):
+    todo = todo_data[0]
+    response = client.get(f"/todos/{todo.id}")
+    assert response.headers["etag"] == f'"todo-{todo.id}-1"'
+    assert "last-modified" in response.headers
+
+    client.patch(f"/todos/{todo.id}/complete")
+    assert client.get(f"/todos/{todo.id}").headers["etag"] == f'"todo-{todo.id}-2"'
+
+
+def test_if_none_match_skips_the_body(client, todo_data, statements):
+    url = f"/todos/{todo_data[0].id}"
+    etag = client.get(url).headers["etag"]
+    statements.clear()
+
+    response = client.get(url, headers={"If-None-Match": f'W/"other", {etag}'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert len(statements) == 1
+
+    client.put(url, json={"title": "Updated Title", "list_id": todo_data[0].list_id})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Updated Title"
+
+
+def test_if_modified_since(client, todo_data):
+    response = client.get(f"/todos/{todo_data[0].id}")
+    last_modified = response.headers["last-modified"]
+
+    response = client.get(f"/todos/{todo_data[0].id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    earlier = http_date(todo_data[0].created_at.replace(year=2000))
+    response = client.get(f"/todos/{todo_data[0].id}", headers={"If-Modified-Since": earlier})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/todos/", "/lists/", "/lists/{list_id}?include=todos"])
+def test_collection_etags(client, todo_data, path):
+    url = path.format(list_id=todo_data[0].list_id)
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.patch(f"/todos/{todo_data[0].id}/complete")
+    client.put(f"/lists/{todo_data[0].list_id}", json={"title": "Renamed"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_if_match_update_todo(client, todo_data):
+    url = f"/todos/{todo_data[0].id}"
+    data = {"title": "Updated Title", "list_id": todo_data[0].list_id}
+    etag = client.get(url).headers["etag"]
+
+    response = client.put(url, json=data, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"todo-{todo_data[0].id}-2"'
+
+    response = client.put(url, json={**data, "title": "Lost Update"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(url).json()["title"] == "Updated Title"
+
+
+@pytest.mark.parametrize("if_match", ['"todo-{id}-1"', "*", 'W/"todo-{id}-1", "todo-{id}-1"'])
+def test_if_match_delete_todo(client, todo_data, if_match):
+    todo = todo_data[0]
+    response = client.delete(f"/todos/{todo.id}", headers={"If-Match": if_match.format(id=todo.id)})
+    assert response.status_code == 204
+
+
+@pytest.mark.parametrize("if_match", ['"todo-{id}-2"', 'W/"todo-{id}-1"', '"todo-999-1"', "garbage"])
+def test_if_match_delete_todo_mismatch(client, todo_data, if_match):
+    todo = todo_data[0]
+    response = client.delete(f"/todos/{todo.id}", headers={"If-Match": if_match.format(id=todo.id)})
+    assert response.status_code == 412
+    assert client.get(f"/todos/{todo.id}").status_code == 200
+
+
+def test_if_match_list(client, list_data):
+    url = f"/lists/{list_data[0].id}"
+    etag = client.get(url).headers["etag"]
+    assert etag == f'"list-{list_data[0].id}-1"'
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.put(url, json={"title": "Updated Title"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"list-{list_data[0].id}-2"'
+
+    assert client.put(url, json={"title": "Lost Update"}, headers={"If-Match": etag}).status_code == 412
+    assert client.delete(url, headers={"If-Match": etag}).status_code == 412
+    assert client.delete(url, headers={"If-Match": response.headers["etag"]}).status_code == 202
+
+
+def test_async_conditional_requests(async_client, todo_data):
+    url = f"/todos/{todo_data[0].id}"
+    etag = async_client.get(url).headers["etag"]
+    assert async_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    data = {"title": "Updated Title", "list_id": todo_data[0].list_id}
+    assert async_client.put(url, json=data, headers={"If-Match": etag}).status_code == 200
+    assert async_client.delete(url, headers={"If-Match": etag}).status_code == 412
+
+    list_url = f"/lists/{todo_data[0].list_id}"
+    list_etag = async_client.get(list_url).headers["etag"]
+    assert async_client.get(list_url, headers={"If-None-Match": list_etag}).status_code == 304
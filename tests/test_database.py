@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.database import async_url, create_async_db_engine, create_db_engine, worker_pool_size
+from app.models import ListDB, TodoDB
+
+
+def pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_sqlite_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+
+    assert pragma(engine, "journal_mode") == "wal"
+    assert pragma(engine, "synchronous") == 1
+    assert pragma(engine, "cache_size") == -64000
+    assert pragma(engine, "busy_timeout") == 5000
+    assert pragma(engine, "temp_store") == 2
+    assert pragma(engine, "foreign_keys") == 1
+    assert isinstance(engine.pool, QueuePool)
+
+
+def test_sqlite_pragma_overrides(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_PRAGMAS", "synchronous=FULL,cache_size=-2000")
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", pragmas={"busy_timeout": 100})
+
+    assert pragma(engine, "synchronous") == 2
+    assert pragma(engine, "cache_size") == -2000
+    assert pragma(engine, "busy_timeout") == 100
+
+
+def test_sqlite_memory_engine_shares_one_connection():
+    engine = create_db_engine("sqlite://")
+
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE shared (id INTEGER)"))
+
+    assert isinstance(engine.pool, StaticPool)
+    assert pragma(engine, "table_info('shared')") is not None
+
+
+@pytest.mark.parametrize("pool_size, max_overflow", [(2, 0), (8, 4)])
+def test_pool_sizes(tmp_path, pool_size, max_overflow):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=pool_size, max_overflow=max_overflow)
+
+    assert engine.pool.size() == pool_size
+    assert engine.pool._max_overflow == max_overflow
+
+
+def test_async_file_engine_is_pooled(tmp_path):
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", pool_size=3)
+
+    assert engine.pool.size() == 3
+    asyncio.run(engine.dispose())
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./todo_list.db", "sqlite+aiosqlite:///./todo_list.db"),
+    ("postgresql://todo:secret@db:5432/todo", "postgresql+asyncpg://todo:secret@db:5432/todo"),
+    ("postgresql+psycopg2://todo@db/todo", "postgresql+asyncpg://todo@db/todo"),
+    ("mysql://todo@db/todo", "mysql://todo@db/todo"),
+])
+def test_async_url(url, expected):
+    assert async_url(url) == expected
+
+
+def test_worker_pool_size():
+    assert worker_pool_size(0, 4) == (5, 10)
+    assert worker_pool_size(100, 4) == (25, 0)
+    assert worker_pool_size(3, 8) == (1, 0)
+
+
+def test_deleting_a_list_cascades_without_loading_its_todos(session, todo_data, statements):
+    list_id = todo_data[0].list_id
+    statements.clear()
+
+    session.delete(session.get(ListDB, list_id))
+    session.commit()
+
+    assert not any("FROM todos" in statement for statement in statements)
+    assert session.scalar(select(func.count()).select_from(TodoDB).where(TodoDB.list_id == list_id)) == 0
+    assert session.scalar(select(func.count()).select_from(TodoDB)) == len(todo_data) - 3
+
+
+def test_todos_need_an_existing_list(session, list_data):
+    session.add(TodoDB(title="Orphan", list_id=999))
+    with pytest.raises(IntegrityError):
+        session.commit()
+    session.rollback()
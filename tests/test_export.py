@@ -0,0 +1,113 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import tracemalloc
+
+import pytest
+from sqlalchemy import text
+
+from app.export import ExportFormatEnum
+from app.models import ListDB
+from app.routers import todo
+
+
+def test_export_ndjson(client, todo_data):
+    response = client.get("/todos/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="todos.ndjson"'
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == client.get("/todos/", params={"limit": 100}).json()["items"]
+
+
+def test_export_csv(client, todo_data):
+    response = client.get("/todos/export", params={"format": "csv", "sort_by": "priority", "order": "asc"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    expected = client.get("/todos/", params={"sort_by": "priority", "order": "asc"}).json()["items"]
+    assert [int(row["id"]) for row in rows] == [todo["id"] for todo in expected]
+    assert {row["due_date"] for row in rows} == {"", "2024-10-21T00:00:00"}
+    assert {row["completed"] for row in rows} == {"True", "False"}
+
+
+def test_export_applies_filters(client, todo_data):
+    response = client.get("/todos/export", params={"completed": True, "search": "One"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3
+    assert all(row["completed"] and row["title"] == "Test One" for row in rows)
+
+
+def test_export_list(client, todo_data):
+    list_id = todo_data[0].list_id
+    response = client.get(f"/lists/{list_id}/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == f'attachment; filename="list-{list_id}.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert {int(row["list_id"]) for row in rows} == {list_id}
+
+
+def test_export_list_not_found(client):
+    assert client.get("/lists/999/export").status_code == 404
+
+
+def test_export_async(async_client, todo_data):
+    response = async_client.get(f"/lists/{todo_data[0].list_id}/export")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
+    assert len(async_client.get("/todos/export").text.splitlines()) == len(todo_data)
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        50_000,
+        pytest.param(
+            1_000_000,
+            marks=pytest.mark.skipif(not os.getenv("RUN_SLOW_TESTS"), reason="set RUN_SLOW_TESTS=1 to export a million rows"),
+        ),
+    ],
+)
+def test_export_memory_is_bounded(session, rows):
+    def consume(response) -> tuple[int, int]:
+        async def read():
+            lines = size = 0
+            async for chunk in response.body_iterator:
+                lines += chunk.count("\n")
+                size += len(chunk)
+            return lines, size
+
+        return asyncio.run(read())
+
+    # Warm up first, so that lazy imports and caches are not counted.
+    consume(todo.export_todos(format=ExportFormatEnum.NDJSON, db=session))
+
+    session.add(ListDB(title="Export"))
+    session.flush()
+    session.execute(
+        text(
+            "INSERT INTO todos (title, list_id, priority, completed, version, updated_at) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows) "
+            "SELECT 'Todo ' || i, 1, 'medium', 0, 1, CURRENT_TIMESTAMP FROM n"
+        ),
+        {"rows": rows},
+    )
+    session.commit()
+    response = todo.export_todos(format=ExportFormatEnum.NDJSON, db=session)
+
+    tracemalloc.start()
+    try:
+        lines, size = consume(response)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert lines == rows
+    # Only one batch of rows and encoded text is alive at a time, whatever the size of the export.
+    assert peak < 8 * 1024 * 1024
+    assert peak < size / 2
@@ -0,0 +1,122 @@
+import json
+
+from app import importer
+from app.models import TodoDB
+
+
+def ndjson(*items) -> str:
+    return "".join((item if isinstance(item, str) else json.dumps(item)) + "\n" for item in items)
+
+
+def test_import_ndjson(client, session, list_data):
+    body = ndjson(
+        {"title": "One", "list_id": list_data[0].id},
+        {"title": "Two", "list_id": list_data[1].id, "priority": "high", "due_date": "2024-10-21T00:00:00"},
+        "",
+        "{not json",
+        {"list_id": list_data[0].id},
+        {"title": "Orphan", "list_id": 999},
+        {"title": "Three", "list_id": list_data[0].id, "completed": True},
+    )
+    response = client.post("/todos/import", content=body, params={"chunk_size": 2})
+    assert response.status_code == 200
+
+    summary = response.json()
+    assert summary["created"] == 3
+    assert summary["failed"] == 3
+    assert [error["line"] for error in summary["errors"]] == [4, 5, 6]
+    assert summary["errors"][0]["detail"] == "Invalid JSON."
+    assert summary["errors"][1]["detail"][0]["loc"] == ["title"]
+    assert summary["errors"][2]["detail"] == "List with id no. 999 not found."
+
+    titles = [todo.title for todo in session.query(TodoDB).order_by(TodoDB.id)]
+    assert titles == ["One", "Two", "Three"]
+
+
+def test_import_csv_round_trip(client, session, list_data):
+    list_id = list_data[0].id
+    client.post("/todos/", json={"title": "Quoted", "details": 'A "quoted"\nmulti-line detail', "list_id": list_id})
+    client.post("/todos/", json={"title": "Plain", "list_id": list_id, "due_date": "2024-10-21T00:00:00"})
+    exported = client.get(f"/lists/{list_id}/export", params={"format": "csv"}).text
+
+    response = client.post("/todos/import", content=exported, headers={"Content-Type": "text/csv"})
+    assert response.json() == {"created": 2, "failed": 0, "errors": []}
+
+    todos = [(todo.title, todo.details, todo.due_date) for todo in session.query(TodoDB).order_by(TodoDB.id)]
+    assert sorted(todos[2:]) == sorted(todos[:2])
+
+
+def test_import_csv_errors(client, list_data):
+    list_id = list_data[0].id
+    body = f'title,list_id,priority\nGood,{list_id},low\nBad,{list_id},urgent\n"Open,{list_id}\n'
+    summary = client.post("/todos/import", content=body, params={"format": "csv"}).json()
+    assert summary["created"] == 1
+    assert [error["line"] for error in summary["errors"]] == [3, 4]
+    assert summary["errors"][1]["detail"] == "Unterminated quoted field."
+
+
+def test_import_csv_rejects_rows_with_the_wrong_number_of_fields(client, session, list_data):
+    list_id = list_data[0].id
+    body = f"title,details,list_id\nShort,{list_id}\nLong,x,{list_id},extra\nRight,y,{list_id}\n"
+    summary = client.post("/todos/import", content=body, params={"format": "csv"}).json()
+    assert summary["created"] == 1
+    assert summary["errors"] == [
+        {"line": 2, "detail": "Expected 3 fields, got 2."},
+        {"line": 3, "detail": "Expected 3 fields, got 4."},
+    ]
+    assert [title for title, in session.query(TodoDB.title)] == ["Right"]
+
+
+def test_import_csv_quotes_inside_unquoted_fields(client, session, list_data):
+    list_id = list_data[0].id
+    body = f'title,details,list_id\nBuy 2" pipe,x,{list_id}\n"Quoted ""and"" spanning\nlines",y,{list_id}\nthird,z,{list_id}\n'
+    summary = client.post("/todos/import", content=body, params={"format": "csv"}).json()
+    assert summary == {"created": 3, "failed": 0, "errors": []}
+    titles = [title for title, in session.query(TodoDB.title).order_by(TodoDB.id)]
+    assert titles == ['Buy 2" pipe', 'Quoted "and" spanning\nlines', "third"]
+
+
+def test_import_streams_chunked_upload(client, session, list_data):
+    body = ndjson(*({"title": f"Tödo {i}", "list_id": list_data[0].id} for i in range(50))).encode()
+    # Split inside multi-byte characters and lines.
+    chunks = (body[i:i + 7] for i in range(0, len(body), 7))
+
+    summary = client.post("/todos/import", content=chunks, params={"chunk_size": 8}).json()
+    assert summary == {"created": 50, "failed": 0, "errors": []}
+    assert session.query(TodoDB).filter(TodoDB.title == "Tödo 49").count() == 1
+
+
+def test_import_rejects_long_lines(client, list_data, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_IMPORT_LINE_BYTES", 60)
+    list_id = list_data[0].id
+    long = {"title": "x" * 80, "list_id": list_id}
+    body = ndjson({"title": "First", "list_id": list_id}, long, {"title": "Third", "list_id": list_id}).encode()
+    chunks = (body[i:i + 16] for i in range(0, len(body), 16))
+    summary = client.post("/todos/import", content=chunks).json()
+    assert summary == {"created": 2, "failed": 1, "errors": [{"line": 2, "detail": "Line too long."}]}
+
+    body = f'title,list_id\nFirst,{list_id}\n"Long\n{"x" * 40}\n{"x" * 40}",{list_id}\nLast,{list_id}\n{"y" * 80}'
+    summary = client.post("/todos/import", content=body, params={"format": "csv"}).json()
+    assert summary["created"] == 2
+    assert summary["errors"] == [{"line": 3, "detail": "Line too long."}, {"line": 7, "detail": "Line too long."}]
+
+
+def test_import_caps_reported_errors(client, list_data, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_IMPORT_ERRORS", 2)
+    summary = client.post("/todos/import", content=ndjson(*["{"] * 5)).json()
+    assert summary["failed"] == 5
+    assert len(summary["errors"]) == 2
+
+
+def test_import_invalidates_cache(client, list_data):
+    list_id = list_data[0].id
+    assert client.get("/todos/").json()["items"] == []
+    client.post("/todos/import", content=ndjson({"title": "Imported", "list_id": list_id}))
+    assert [todo["title"] for todo in client.get("/todos/").json()["items"]] == ["Imported"]
+
+
+def test_import_async(async_client, session, list_data):
+    body = ndjson({"title": "Async", "list_id": list_data[0].id}, {"title": "Orphan", "list_id": 999})
+    summary = async_client.post("/todos/import", content=body).json()
+    assert summary["created"] == 1
+    assert summary["errors"] == [{"line": 2, "detail": "List with id no. 999 not found."}]
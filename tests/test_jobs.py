@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app import jobs
+from app.jobs import JOB_HANDLERS, JobKindEnum, JobStatusEnum, JobWorker, enqueue
+from app.models import JobDB, TodoDB
+
+
+@pytest.fixture()
+def failing_handler(monkeypatch):
+    calls = []
+
+    def handler(db, fail_times: int):
+        calls.append(1)
+        if len(calls) <= fail_times:
+            raise RuntimeError("boom")
+        return {"calls": len(calls)}
+
+    monkeypatch.setitem(JOB_HANDLERS, "flaky", handler)
+    monkeypatch.setattr(jobs, "JOBS_RETRY_DELAY", 0)
+    return calls
+
+
+def queue(session, kind: str, **params) -> int:
+    job = JobDB(kind=kind, params=params, status=JobStatusEnum.QUEUED.value, max_attempts=jobs.JOBS_MAX_ATTEMPTS)
+    session.add(job)
+    session.commit()
+    return job.id
+
+
+def test_failed_jobs_are_retried(session, run_jobs, failing_handler):
+    job_id = queue(session, "flaky", fail_times=2)
+
+    assert run_jobs() == 3
+    job = session.get(JobDB, job_id)
+    assert (job.status, job.attempts, job.result, job.error) == ("succeeded", 3, {"calls": 3}, None)
+
+
+def test_jobs_fail_after_the_last_attempt(client, session, run_jobs, failing_handler):
+    job_id = queue(session, "flaky", fail_times=5)
+
+    assert run_jobs() == jobs.JOBS_MAX_ATTEMPTS
+    job = client.get(f"/jobs/{job_id}").json()
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", jobs.JOBS_MAX_ATTEMPTS, "boom")
+
+
+def test_retries_wait_for_their_delay(session, run_jobs, failing_handler, monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_RETRY_DELAY", 60)
+    job_id = queue(session, "flaky", fail_times=1)
+
+    assert run_jobs() == 1
+    assert session.get(JobDB, job_id).status == "queued"
+    assert run_jobs() == 0
+
+
+def test_expired_leases_are_taken_over(session, run_jobs, todo_data):
+    job_id = enqueue(session, JobKindEnum.DELETE_LIST, {"list_id": todo_data[0].list_id}).id
+    # Claimed by a worker that died without finishing.
+    session.execute(update(JobDB).values(status="running", attempts=1, locked_until=func.datetime("now", "-1 minute")))
+    session.commit()
+
+    assert run_jobs() == 1
+    job = session.get(JobDB, job_id)
+    assert (job.status, job.attempts) == ("succeeded", 2)
+
+
+def test_a_job_is_claimed_once(session, todo_data):
+    enqueue(session, JobKindEnum.DELETE_LIST, {"list_id": todo_data[0].list_id})
+    session.commit()
+
+    first, second = JobWorker(lambda: session), JobWorker(lambda: session)
+    job_id = first._claim()
+    assert job_id is not None
+    assert second._claim() is None
+
+
+def test_delete_list_runs_in_chunks(session, todo_data, statements):
+    list_id = todo_data[0].list_id
+    statements.clear()
+
+    assert JOB_HANDLERS["delete_list"](session, list_id, chunk_size=2) == {"todos_deleted": 3}
+    deletes = [statement for statement in statements if statement.startswith("DELETE FROM todos")]
+    # A full chunk, then a short one that is deleted along with the list.
+    assert len(deletes) == 2
+    assert session.scalar(select(func.count()).select_from(TodoDB).where(TodoDB.list_id == list_id)) == 0
+
+    # Running it again, as a retry would, changes nothing.
+    assert JOB_HANDLERS["delete_list"](session, list_id) == {"todos_deleted": 0}
+
+
+@pytest.mark.parametrize("kind", ["vacuum", "analyze"])
+def test_maintenance_jobs(committed, client, session, run_jobs, kind):
+    response = client.post("/jobs/", json={"kind": kind})
+    assert response.status_code == 202
+    assert client.post("/jobs/", json={"kind": kind}).json()["id"] == response.json()["id"]
+
+    assert run_jobs() == 1
+    assert client.get(response.headers["Location"]).json()["status"] == "succeeded"
+
+
+def test_only_maintenance_jobs_can_be_requested(client):
+    assert client.post("/jobs/", json={"kind": "delete_list"}).status_code == 422
+    assert client.get("/jobs/999").status_code == 404
+
+
+def test_worker_thread_runs_queued_jobs(committed, session, todo_data):
+    list_id = todo_data[0].list_id
+    job_id = enqueue(session, JobKindEnum.DELETE_LIST, {"list_id": list_id}).id
+    session.commit()
+
+    done = threading.Event()
+    worker = JobWorker(session_factory=lambda: session, poll_interval=60)
+    run = worker._run
+    worker._run = lambda job_id: (run(job_id), done.set())
+    worker.start()
+    try:
+        worker.wake()
+        assert done.wait(5)
+    finally:
+        worker.stop(5)
+    assert session.get(JobDB, job_id).status == "succeeded"
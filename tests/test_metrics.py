@@ -0,0 +1,64 @@
+import logging
+
+import pytest
+
+from app import metrics
+from app.metrics import MetricsRegistry, RequestStats, metrics_registry
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics_registry.clear()
+
+
+def samples(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = [line for line in response.text.splitlines() if not line.startswith("#")]
+    return {name: float(value) for name, value in (line.rsplit(" ", 1) for line in lines)}
+
+
+def test_records_per_route_template(committed, client, todo_data):
+    client.get("/todos/")
+    client.get(f"/todos/{todo_data[0].id}")
+    client.get(f"/todos/{todo_data[1].id}")
+    client.get("/todos/999")
+
+    values = samples(client)
+    item = 'method="GET",route="/todos/{todo_id}"'
+    assert values[f"todo_api_request_duration_seconds_count{{{item}}}"] == 3
+    assert values[f'todo_api_request_duration_seconds_bucket{{{item},le="+Inf"}}'] == 3
+    assert values[f'todo_api_requests_total{{{item},status="200"}}'] == 2
+    assert values[f'todo_api_requests_total{{{item},status="404"}}'] == 1
+
+    collection = 'method="GET",route="/todos/"'
+    assert values[f"todo_api_db_queries_total{{{collection}}}"] == 1
+    assert values[f"todo_api_db_rows_total{{{collection}}}"] == len(todo_data)
+    assert values[f"todo_api_db_query_duration_seconds_total{{{collection}}}"] > 0
+    assert values[f"todo_api_serialization_duration_seconds_total{{{collection}}}"] > 0
+
+
+def test_unmatched_routes_share_a_label(client):
+    client.get("/nothing/here")
+    client.get("/or/here")
+    assert samples(client)['todo_api_requests_total{method="GET",route="<unmatched>",status="404"}'] == 2
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    for duration in (0.005, 0.05, 0.05, 1.0):
+        registry.observe("GET", "/todos/", 200, duration, RequestStats())
+
+    text = registry.render()
+    assert 'todo_api_request_duration_seconds_bucket{method="GET",route="/todos/",le="0.01"} 1' in text
+    assert 'todo_api_request_duration_seconds_bucket{method="GET",route="/todos/",le="0.1"} 3' in text
+    assert 'todo_api_request_duration_seconds_bucket{method="GET",route="/todos/",le="+Inf"} 4' in text
+
+
+def test_slow_query_log(client, todo_data, monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 1e-6)
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        client.get(f"/todos/{todo_data[0].id}")
+
+    assert any("FROM todos" in record.getMessage() and str(todo_data[0].id) in record.getMessage() for record in caplog.records)
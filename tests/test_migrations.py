@@ -0,0 +1,194 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    event,
+    func,
+    inspect,
+    text,
+)
+
+from app import main
+from app.database import Base
+from app.migrations import alembic_heads, current_heads, ensure_schema
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def alembic(*args: str, url: str) -> str:
+    command = [sys.executable, "-m", "alembic", "-x", f"url={url}", *args]
+    return subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    alembic("upgrade", "head", url=url)
+
+    inspector = inspect(create_engine(url))
+    for table in Base.metadata.sorted_tables:
+        assert {column["name"] for column in inspector.get_columns(table.name)} == set(table.columns.keys()), table.name
+        assert {index["name"] for index in inspector.get_indexes(table.name)} >= {index.name for index in table.indexes}, table.name
+
+    alembic("downgrade", "base", url=url)
+    assert inspect(create_engine(url)).get_table_names() == ["alembic_version"]
+
+
+def test_orphaned_todos_are_deleted(tmp_path):
+    url = f"sqlite:///{tmp_path / 'orphans.db'}"
+    alembic("upgrade", "7e5a0c2d9f31", url=url)
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO lists (id, title) VALUES (1, 'Kept')"))
+        connection.execute(
+            text(
+                "INSERT INTO todos (id, title, list_id, priority, completed, version, updated_at) VALUES "
+                "(1, 'Kept', 1, 'medium', 0, 1, CURRENT_TIMESTAMP), "
+                "(2, 'Deleted list', 2, 'medium', 0, 1, CURRENT_TIMESTAMP), "
+                "(3, 'No list', NULL, 'medium', 0, 1, CURRENT_TIMESTAMP)"
+            )
+        )
+
+    alembic("upgrade", "head", url=url)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT id FROM todos")).scalars().all() == [1]
+        changes = connection.execute(text("SELECT entity_id, op, list_id FROM changes ORDER BY seq")).all()
+        assert changes == [(2, "deleted", 2), (3, "deleted", None)]
+        assert connection.execute(text("SELECT list_id, total FROM todo_stats")).all() == [(1, 1)]
+
+
+def test_alembic_heads_match_the_script_directory():
+    from alembic.script import ScriptDirectory
+
+    from app.migrations import _config
+
+    assert alembic_heads() == frozenset(ScriptDirectory.from_config(_config()).get_heads())
+
+
+def test_ensure_schema_migrates_only_when_behind(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        ensure_schema(engine, auto_migrate=False)
+
+    assert ensure_schema(engine, auto_migrate=True)
+    assert current_heads(engine) == alembic_heads()
+
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: executed.append(statement))
+    assert not ensure_schema(engine, auto_migrate=False)
+    assert executed and all(statement.startswith(("PRAGMA", "SELECT")) for statement in executed)
+
+
+def create_legacy_tables(engine) -> None:
+    # The tables create_all made on import before Alembic owned the schema.
+    metadata = MetaData()
+    Table(
+        "lists",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, index=True, nullable=False),
+        Column("description", String),
+        Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        Column("updated_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    )
+    Table(
+        "todos",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, index=True, nullable=False),
+        Column("details", String),
+        Column("completed", Boolean, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        Column("due_date", DateTime(timezone=True)),
+        Column("priority", Enum("low", "medium", "high", name="priority"), nullable=False),
+        Column("list_id", Integer, ForeignKey("lists.id", ondelete="CASCADE")),
+    )
+    metadata.create_all(engine)
+
+
+def test_ensure_schema_asks_to_stamp_tables_created_without_alembic(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    create_legacy_tables(engine)
+    with pytest.raises(RuntimeError, match="alembic stamp 1613c3341f78` and then `alembic upgrade head"):
+        ensure_schema(engine, auto_migrate=False)
+
+
+def test_ensure_schema_upgrades_tables_created_without_alembic(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    create_legacy_tables(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO lists (id, title) VALUES (1, 'Kept')"))
+        connection.execute(text("INSERT INTO todos (id, title, completed, priority, list_id) VALUES (1, 'Kept', 0, 'high', 1)"))
+
+    assert ensure_schema(engine, auto_migrate=True)
+    assert current_heads(engine) == alembic_heads()
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        assert {column["name"] for column in inspector.get_columns(table.name)} == set(table.columns.keys()), table.name
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT title, priority_rank FROM todos")).all() == [("Kept", 3)]
+
+
+def test_lifespan_checks_the_schema_on_startup(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'lifespan.db'}")
+    monkeypatch.setattr(main, "engine", engine)
+
+    with pytest.raises(RuntimeError):
+        with TestClient(main.create_app(auto_migrate=False, jobs_worker_enabled=False)):
+            pass
+
+    with TestClient(main.create_app(auto_migrate=True, jobs_worker_enabled=False)) as client:
+        assert client.get("/").status_code == 200
+    assert current_heads(engine) == alembic_heads()
+
+
+def test_postgres_migrations_create_the_priority_type():
+    sql = alembic("upgrade", "head", "--sql", url="postgresql://todo@localhost/todo")
+
+    assert sql.count("CREATE TYPE priority AS ENUM ('low', 'medium', 'high')") == 1
+    assert sql.index("CREATE TYPE priority") < sql.index("ADD COLUMN priority priority")
+    assert "GENERATED ALWAYS AS (CASE priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 ELSE 1 END) STORED" in sql
+    assert "fts5" not in sql and "todo_stats" not in sql
+
+
+@pytest.mark.skipif("TEST_POSTGRES_URL" not in os.environ, reason="set TEST_POSTGRES_URL to run against Postgres")
+def test_postgres_round_trip():
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import create_db_engine, get_db
+    from app.main import create_app
+
+    url = os.environ["TEST_POSTGRES_URL"]
+    alembic("downgrade", "base", url=url)
+    alembic("upgrade", "head", url=url)
+    SessionLocal = sessionmaker(autoflush=False, bind=create_db_engine(url))
+
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    app = create_app(async_db=False, metrics_enabled=False)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    list_id = client.post("/lists/", json={"title": "Postgres"}).json()["id"]
+    todo = client.post("/todos/", json={"title": "Enum", "list_id": list_id, "priority": "high"}).json()
+    assert todo["priority"] == "high"
+    assert client.get("/todos/", params={"sort_by": "priority"}).json()["items"][0]["id"] == todo["id"]
+    assert client.post("/todos/", json={"title": "Orphan", "list_id": 999}).status_code == 400
+    assert client.get(f"/lists/{list_id}/stats").json()["by_priority"]["high"] == 1
+    assert [change["op"] for change in client.get("/changes/").json()["changes"]] == ["created", "created"]
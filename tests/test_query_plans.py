@@ -0,0 +1,101 @@
+import itertools
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import delete, func, select, text
+
+from app import stats
+from app.models import ChangeDB, TodoDB
+from app.pagination import encode_cursor
+from app.todo_manager import BucketEnum, OrderEnum, PriorityEnum, SortByEnum, TodoManager
+
+FILTERS = list(itertools.product(
+    [None, datetime(2024, 10, 21)],
+    [None, PriorityEnum.HIGH],
+    [None, True],
+))
+
+
+def query_plan(session, query) -> list[str]:
+    statement = query.statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    return [row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {statement}"))]
+
+
+def build_query(session, filters, sort_by, order, with_cursor):
+    manager = TodoManager(session)
+    due_date, priority, completed = filters
+
+    query = manager._apply_filters(session.query(TodoDB), due_date, priority, None, completed)
+    if with_cursor:
+        value = 2 if sort_by == SortByEnum.PRIORITY else datetime(2024, 10, 21)
+        query = manager._apply_cursor(query, sort_by, order, encode_cursor(f"{sort_by.value}:{order.value}", value, 5))
+    return manager._apply_sorting(query, sort_by, order).limit(51)
+
+
+@pytest.mark.parametrize("with_cursor", [False, True])
+@pytest.mark.parametrize("order", list(OrderEnum))
+@pytest.mark.parametrize("sort_by", [SortByEnum.CREATED_AT, SortByEnum.DUE_DATE, SortByEnum.PRIORITY])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_todo_queries_use_an_index(session, filters, sort_by, order, with_cursor):
+    plan = query_plan(session, build_query(session, filters, sort_by, order, with_cursor))
+
+    assert not [step for step in plan if step.startswith("SCAN todos") and "INDEX" not in step], plan
+
+
+@pytest.mark.parametrize("order", list(OrderEnum))
+@pytest.mark.parametrize("sort_by", [SortByEnum.CREATED_AT, SortByEnum.DUE_DATE, SortByEnum.PRIORITY])
+@pytest.mark.parametrize("completed", [None, True])
+def test_todo_sorts_walk_an_index(session, completed, sort_by, order):
+    plan = query_plan(session, build_query(session, (None, None, completed), sort_by, order, False))
+
+    assert not [step for step in plan if "TEMP B-TREE" in step], plan
+
+
+@pytest.mark.parametrize("with_cursor", [False, True])
+@pytest.mark.parametrize("order", list(OrderEnum))
+@pytest.mark.parametrize("sort_by", [SortByEnum.CREATED_AT, SortByEnum.DUE_DATE, SortByEnum.PRIORITY])
+@pytest.mark.parametrize("completed", [None, True, False])
+def test_list_todo_queries_walk_a_list_index(session, completed, sort_by, order, with_cursor):
+    manager = TodoManager(session)
+    query = manager._apply_filters(session.query(TodoDB), completed=completed, list_id=1)
+    if with_cursor:
+        value = 2 if sort_by == SortByEnum.PRIORITY else datetime(2024, 10, 21)
+        query = manager._apply_cursor(query, sort_by, order, encode_cursor(f"{sort_by.value}:{order.value}", value, 5))
+    plan = query_plan(session, manager._apply_sorting(query, sort_by, order).limit(51))
+
+    # One seek into the list's entries, read in page order: the cost is the page, not the table.
+    assert len(plan) == 1 and plan[0].startswith("SEARCH todos USING INDEX ix_todos_list_id_"), plan
+    assert "list_id=?" in plan[0] and ("completed=?" in plan[0]) == (completed is not None), plan
+
+
+@pytest.mark.parametrize("list_id", [None, 1])
+def test_overdue_count_seeks_an_index(session, list_id):
+    statement = select(func.count()).select_from(TodoDB).where(stats.overdue_filter(datetime(2024, 10, 21)))
+    if list_id is not None:
+        statement = statement.where(TodoDB.list_id == list_id)
+    compiled = statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = [row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+    assert len(plan) == 1 and plan[0].startswith("SEARCH todos USING COVERING INDEX"), plan
+    assert "due_date<" in plan[0], plan
+
+
+@pytest.mark.parametrize("bucket", list(BucketEnum))
+@pytest.mark.parametrize("completed", [None, False])
+def test_agenda_counts_are_read_from_an_index(session, bucket, completed):
+    statement = TodoManager(session).agenda_counts(date(2024, 1, 1), date(2024, 12, 31), bucket, completed)
+    compiled = statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = [row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+    assert plan[0].startswith("SEARCH todos USING COVERING INDEX") and "due_date>? AND due_date<?" in plan[0], plan
+    if completed is None:
+        assert "ix_todos_due_date_completed" in plan[0], plan
+
+
+def test_change_log_reads_and_compaction_seek_an_index(session):
+    read = select(ChangeDB.__table__).where(ChangeDB.seq > 10).order_by(ChangeDB.seq).limit(501)
+    purge = delete(ChangeDB).where(ChangeDB.created_at < datetime(2024, 10, 21), ChangeDB.seq < 100)
+    for statement in (read, purge):
+        compiled = statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+        plan = [row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+        assert len(plan) == 1 and plan[0].startswith("SEARCH changes USING"), plan
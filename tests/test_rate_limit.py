@@ -0,0 +1,78 @@
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import create_app
+from app.metrics import metrics_registry
+from app.ratelimit import RATE_LIMIT_BURST, RATE_LIMIT_RATE, MemoryRateLimitStore, memory_rate_limit_store
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_a_burst_then_refills():
+    clock = Clock()
+    store = MemoryRateLimitStore(clock=clock)
+
+    assert [store.acquire("key", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert store.acquire("key", rate=2, burst=3) == 0.5
+    assert store.acquire("other", rate=2, burst=3) == 0
+
+    clock.now = 0.5
+    assert store.acquire("key", rate=2, burst=3) == 0
+    assert store.acquire("key", rate=2, burst=3) == 0.5
+
+    # Idle time never fills the bucket beyond the burst.
+    clock.now = 100
+    assert [store.acquire("key", rate=2, burst=3) for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_least_recently_used_buckets_are_dropped():
+    store = MemoryRateLimitStore(max_keys=2, clock=Clock())
+    store.acquire("a", rate=1, burst=1)
+    store.acquire("b", rate=1, burst=1)
+    store.acquire("c", rate=1, burst=1)
+
+    assert store.acquire("a", rate=1, burst=1) == 0
+    assert store.acquire("c", rate=1, burst=1) == 1
+
+
+@pytest.fixture()
+def limited_client(session, monkeypatch):
+    def override_get_db():
+        yield session
+
+    # The clock stands still, so no tokens are added during the test.
+    monkeypatch.setattr(memory_rate_limit_store, "clock", Clock())
+    memory_rate_limit_store.clear()
+    metrics_registry.clear()
+    app = create_app(metrics_enabled=True, rate_limit_enabled=True)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    memory_rate_limit_store.clear()
+
+
+def test_requests_over_the_limit_get_429(limited_client, list_data):
+    list_id = list_data[0].id
+    statuses = [limited_client.get(f"/lists/{list_id}").status_code for _ in range(RATE_LIMIT_BURST)]
+    assert statuses == [200] * RATE_LIMIT_BURST
+
+    response = limited_client.get(f"/lists/{list_id}")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == math.ceil(1 / RATE_LIMIT_RATE)
+    assert response.json() == {"detail": "Too many requests."}
+
+    # Buckets are per route template, so other lists share the same bucket and other routes do not.
+    assert limited_client.get(f"/lists/{list_data[1].id}").status_code == 429
+    assert limited_client.get("/lists/").status_code == 200
+    assert limited_client.get("/lists/999").status_code == 429
+
+    metrics = limited_client.get("/metrics").text
+    assert 'todo_api_requests_total{method="GET",route="/lists/{id}",status="429"} 3' in metrics
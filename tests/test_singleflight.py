@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.cache import response_cache
+from app.routers import list as list_router
+from app.singleflight import SingleFlight
+from app.todo_manager import TodoManager
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def produce():
+        calls.append(1)
+        release.wait(5)
+        return b"body"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("key", produce))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flights.shared == 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [b"body"] * 8
+    # The flight is over, so the next call runs again.
+    assert flights.do("key", lambda: b"new") == b"new"
+
+
+def test_errors_are_shared_with_waiting_calls():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def produce():
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("key", produce)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flights.shared == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+
+
+def test_async_calls_share_one_run_and_survive_a_cancelled_leader():
+    flights = SingleFlight()
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"body"
+
+    async def run():
+        leader = asyncio.ensure_future(flights.do_async("key", produce))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flights.do_async("key", produce)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    # One follower takes over from the cancelled leader and the others join it.
+    assert asyncio.run(run()) == [b"body"] * 3
+    assert calls == [1, 1]
+
+
+@pytest.mark.parametrize("path", ["/todos/?limit=5", "/lists/{list_id}", "/lists/{list_id}?include=todos"])
+def test_thundering_herd_runs_one_query(concurrent_client, todo_data, statements, monkeypatch, path):
+    monkeypatch.setattr(response_cache, "enabled", False)
+    url = path.format(list_id=todo_data[0].list_id)
+    get_todos, read_list = TodoManager.get_todos, list_router._read_list
+    # The first read waits until every other request has joined it.
+    def joined(read):
+        return lambda *args, **kwargs: (wait_for(lambda: response_cache.flights.shared == 9), read(*args, **kwargs))[1]
+
+    monkeypatch.setattr(TodoManager, "get_todos", joined(get_todos))
+    monkeypatch.setattr(list_router, "_read_list", joined(read_list))
+
+    with ThreadPoolExecutor(10) as executor:
+        responses = list(executor.map(lambda _: concurrent_client.get(url), range(10)))
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.content for response in responses}) == 1
+    assert response_cache.stats()["coalesced"] == 9
+    # Only item reads look up the version their ETag is built from, once per request.
+    reads = [statement for statement in statements if not statement.startswith("SELECT lists.version")]
+    assert len(reads) == (2 if "include" in path else 1)
+
+
+def test_async_thundering_herd_runs_one_query(async_client, todo_data, monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", False)
+
+    async def herd():
+        transport = httpx.ASGITransport(app=async_client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/todos/?limit=5") for _ in range(20)))
+
+    responses = asyncio.run(herd())
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.content for response in responses}) == 1
+    assert response_cache.stats()["coalesced"] == 19
@@ -0,0 +1,63 @@
+import pytest
+
+from app import stats
+
+
+def test_stats(client, todo_data):
+    response = client.get("/stats")
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 9,
+        "completed": 3,
+        "pending": 6,
+        "overdue": 3,
+        "by_priority": {"low": 2, "medium": 4, "high": 3},
+        "completion_rate": pytest.approx(1 / 3),
+    }
+
+
+def test_list_stats(client, todo_data):
+    response = client.get(f"/lists/{todo_data[0].list_id}/stats")
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 3,
+        "completed": 1,
+        "pending": 2,
+        "overdue": 1,
+        "by_priority": {"low": 1, "medium": 1, "high": 1},
+        "completion_rate": pytest.approx(1 / 3),
+    }
+
+
+def test_list_stats_empty_and_missing(client, list_data):
+    assert client.get(f"/lists/{list_data[-1].id}/stats").json()["completion_rate"] == 0.0
+    assert client.get("/lists/999/stats").status_code == 404
+
+
+def test_stats_read_the_summary(client, todo_data, statements):
+    client.get(f"/lists/{todo_data[0].list_id}/stats")
+    assert any("FROM todo_stats" in statement for statement in statements)
+    assert not any("GROUP BY" in statement for statement in statements)
+
+
+def test_summary_follows_mutations(client, todo_data, monkeypatch, run_jobs):
+    first, second = todo_data[0].list_id, todo_data[3].list_id
+    client.post("/todos/", json={"title": "New", "list_id": first, "priority": "high"})
+    client.put(f"/todos/{todo_data[1].id}", json={"title": "Moved", "list_id": second, "priority": "low"})
+    client.patch(f"/todos/{todo_data[2].id}/complete")
+    client.patch("/todos/bulk", json=[{"id": todo_data[4].id, "completed": True, "list_id": first}])
+    client.delete(f"/todos/{todo_data[5].id}")
+    client.post("/todos/import", content=f'{{"title": "Imported", "list_id": {second}, "priority": "low"}}\n')
+    client.delete(f"/lists/{todo_data[6].list_id}")
+    run_jobs()
+
+    urls = ["/stats", f"/lists/{first}/stats", f"/lists/{second}/stats"]
+    from_summary = [client.get(url).json() for url in urls]
+    monkeypatch.setattr(stats, "STATS_SUMMARY", False)
+    assert [client.get(url).json() for url in urls] == from_summary
+    assert from_summary[0]["total"] == 7
+
+
+def test_async_stats(async_client, todo_data):
+    assert async_client.get("/stats").json()["total"] == 9
+    assert async_client.get(f"/lists/{todo_data[0].list_id}/stats").json()["total"] == 3
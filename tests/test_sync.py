@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models import ChangeDB
+from app.sync import compact_changes
+
+
+def test_snapshot(client, todo_data):
+    body = client.get("/sync/").json()
+    assert [todo["id"] for todo in body["todos"]] == sorted(todo.id for todo in todo_data)
+    assert len(body["lists"]) == 11
+    assert body["deleted"] == {"lists": [], "todos": []}
+    assert body["token"] == 0
+    assert client.get("/sync/", params={"since": body["token"]}).json()["todos"] == []
+
+
+def test_snapshot_pages(client, todo_data):
+    token = client.get("/sync/").json()["token"]
+    client.patch(f"/todos/{todo_data[0].id}/complete")
+
+    lists, todos, cursor, pages = [], [], None, 0
+    while True:
+        page = client.get("/sync/", params={"limit": 4, **({"cursor": cursor} if cursor else {})}).json()
+        assert len(page["lists"]) + len(page["todos"]) <= 4
+        assert page["token"] == token + 1
+        lists += [list_["id"] for list_ in page["lists"]]
+        todos += [todo["id"] for todo in page["todos"]]
+        pages += 1
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        cursor = page["next_cursor"]
+
+    assert pages > 1
+    assert len(lists) == 11
+    assert todos == sorted(todo.id for todo in todo_data)
+    assert client.get("/sync/", params={"cursor": cursor, "since": 0}).status_code == 400
+    assert client.get("/sync/", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_delta(client, todo_data):
+    token = client.get("/sync/").json()["token"]
+    todo = todo_data[0]
+    client.put(f"/todos/{todo.id}", json={"title": "Updated", "list_id": todo.list_id})
+    client.patch(f"/todos/{todo_data[1].id}/complete")
+    client.delete(f"/todos/{todo_data[2].id}")
+    new_list = client.post("/lists/", json={"title": "New"}).json()
+
+    delta = client.get("/sync/", params={"since": token}).json()
+    assert [(t["id"], t["title"]) for t in delta["todos"]] == [(todo.id, "Updated"), (todo_data[1].id, todo_data[1].title)]
+    assert delta["todos"][1]["completed"]
+    assert [l["id"] for l in delta["lists"]] == [new_list["id"]]
+    assert delta["deleted"] == {"lists": [], "todos": [todo_data[2].id]}
+    assert not delta["has_more"]
+
+    assert client.get("/sync/", params={"since": delta["token"]}).json()["token"] == delta["token"]
+
+
+def test_deleted_list_is_a_tombstone(client, list_data, run_jobs):
+    list_id = list_data[0].id
+    token = client.get("/sync/").json()["token"]
+    client.delete(f"/lists/{list_id}")
+    run_jobs()
+
+    delta = client.get("/sync/", params={"since": token}).json()
+    assert delta["deleted"] == {"lists": [list_id], "todos": []}
+    assert delta["lists"] == []
+
+
+def test_delta_pages(client, list_data):
+    list_id = list_data[0].id
+    for i in range(5):
+        client.post("/todos/", json={"title": f"Todo {i}", "list_id": list_id})
+
+    first = client.get("/sync/", params={"since": 0, "limit": 3}).json()
+    assert len(first["todos"]) == 3
+    assert first["has_more"]
+    rest = client.get("/sync/", params={"since": first["token"], "limit": 3}).json()
+    assert len(rest["todos"]) == 2
+    assert not rest["has_more"]
+
+
+def test_compaction_expires_old_tokens(client, session, list_data):
+    list_id = list_data[0].id
+    todo_ids = [client.post("/todos/", json={"title": f"Todo {i}", "list_id": list_id}).json()["id"] for i in range(3)]
+    client.delete(f"/todos/{todo_ids[0]}")
+    assert compact_changes(session) == 0
+
+    session.execute(update(ChangeDB).values(created_at=datetime.now() - timedelta(days=60)))
+    session.commit()
+    # The newest change is kept so the log still marks where it starts.
+    assert compact_changes(session, timedelta(days=30)) == 3
+    assert session.query(ChangeDB.seq).all() == [(4,)]
+
+    assert client.get("/sync/", params={"since": 1}).status_code == 410
+    assert client.get("/sync/", params={"since": 3}).json()["deleted"]["todos"] == [todo_ids[0]]
+    assert client.get("/sync/").status_code == 200